@@ -1,9 +1,14 @@
+from resources.lib.utils.startup_profiler import startup_profiler
+startup_profiler.start()  # Before the other imports, so that they are timed
 import xbmcaddon
+import resources.lib.utils.global_config as global_config
 from resources.lib.utils.log_message import log_message
 from resources.lib.ui.now_playing import NowPlaying
+from resources.lib.ui.dashboard import Dashboard
 from resources.lib.utils.addon_monitor import AddonMonitor
 from resources.lib.utils.shutdown_handler import shutdown_addon  # Import the shutdown function
-from resources.lib.utils.constants import LOG_LEVEL_ERROR, NOW_PLAYING_XML
+from resources.lib.utils.constants import DASHBOARD_MODE_KEY, DASHBOARD_XML, LOG_LEVEL_ERROR, NOW_PLAYING_XML
+startup_profiler.mark("imports")
 
 def main():
     """
@@ -11,7 +16,12 @@ def main():
     This function determines the action to take based on the arguments passed to the script.
     """
     addon = xbmcaddon.Addon()
-    window = NowPlaying(NOW_PLAYING_XML, addon.getAddonInfo('path'))
+    settings = global_config.settings or {}
+    if settings.get(DASHBOARD_MODE_KEY) == 'true':
+        window = Dashboard(DASHBOARD_XML, addon.getAddonInfo('path'))
+    else:
+        window = NowPlaying(NOW_PLAYING_XML, addon.getAddonInfo('path'))
+    startup_profiler.mark("window created")
     window.doModal()
     del window
 
@@ -20,6 +30,7 @@ def run_addon():
     Initialize the addon, run the main functionality, and handle shutdown.
     """
     monitor = AddonMonitor()
+    startup_profiler.mark("addon initialised")
     try:
         # Call the main function to execute the addon's primary functionality
         main()
@@ -0,0 +1,479 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import resources.lib.utils.global_config as global_config
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.profile_paths import get_profile_dir
+from resources.lib.utils.read_settings import get_int_setting
+from resources.lib.utils.lazy_import import LazyModule
+from resources.lib.api.fetch_lms_status import get_requests_session
+from resources.lib.utils.constants import (
+    ARTWORK_CACHE_DIR,
+    ARTWORK_CACHE_INDEX_FILE,
+    ARTWORK_CACHE_MB_KEY,
+    ARTWORK_FETCH_TIMEOUT,
+    ARTWORK_PREFETCH_CHUNK_SIZE,
+    ARTWORK_REVALIDATE_INTERVAL,
+    DEFAULT_ARTWORK_CACHE_MB,
+    LOG_LEVEL_DEBUG,
+    LOG_LEVEL_INFO,
+    LOG_LEVEL_WARNING
+)
+
+# Loaded with the shared session, on the first download
+requests = LazyModule('requests')
+
+# Characters allowed in cache file names
+UNSAFE_KEY_CHARS = re.compile(r'[^A-Za-z0-9_-]')
+
+class ArtworkCache:
+    """
+    On-disk LRU cache of cover art, keyed by LMS cover ID and bounded by total size in bytes.
+
+    Cached entries are served immediately. Entries older than the revalidation interval
+    are served as well, while a conditional request (ETag / Last-Modified) refreshes them
+    in the background. On a miss the URL is returned for Kodi to load, and the image is
+    downloaded into the cache in the background. Prefetches wait while such a foreground
+    download is in progress and stop between chunks when one starts, unless it is for the
+    same image.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, ARTWORK_CACHE_INDEX_FILE)
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> entry dict, least recently used first
+        self.total_bytes = 0
+        self.revalidating = set()
+        self.inflight = {}  # key -> threading.Event set when the download finishes
+        self.foreground_keys = set()  # Keys of foreground downloads in progress; prefetches wait for none
+        self.foreground_idle = threading.Condition(self.lock)
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.errors = 0
+        self.prefetched = 0
+        self.prefetch_interrupted = 0
+
+        self.load_index()
+
+    @staticmethod
+    def make_key(url, cover_id=None):
+        """
+        Build the cache key for a piece of artwork.
+
+        Args:
+            url (str): The artwork URL.
+            cover_id (str): The LMS cover ID, if known.
+
+        Returns:
+            str: A key that is safe to use as a file name.
+        """
+        if cover_id:
+            return UNSAFE_KEY_CHARS.sub('_', str(cover_id))
+        return 'url_' + hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def is_valid_entry(entry):
+        """
+        Check that an index entry read from disk has every field the cache relies on.
+
+        Args:
+            entry: The entry as decoded from the index file.
+
+        Returns:
+            bool: True if the entry can be used, False otherwise.
+        """
+        return (
+            isinstance(entry, dict)
+            and isinstance(entry.get('key'), str)
+            and isinstance(entry.get('file'), str)
+            and isinstance(entry.get('size'), int) and entry['size'] >= 0
+            and isinstance(entry.get('validated'), (int, float))
+        )
+
+    def load_index(self):
+        """
+        Load the cache index from disk, dropping invalid entries and entries whose files are missing.
+        """
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(stored, list):
+            return
+
+        skipped = 0
+        for entry in stored:
+            if not self.is_valid_entry(entry):
+                skipped += 1
+                continue
+            if os.path.exists(os.path.join(self.cache_dir, entry['file'])):
+                old = self.entries.pop(entry['key'], None)
+                if old is not None:
+                    self.total_bytes -= old['size']
+                self.entries[entry['key']] = entry
+                self.total_bytes += entry['size']
+        if skipped:
+            log_message(f"Skipped {skipped} invalid artwork cache index entries", LOG_LEVEL_WARNING)
+
+    def save_index(self):
+        """
+        Write the cache index to disk atomically. Caller must hold the lock.
+        """
+        temp_path = self.index_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(list(self.entries.values()), f)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            log_message(f"Failed to save artwork cache index: {e}", LOG_LEVEL_WARNING)
+
+    def resolve(self, url, cover_id=None):
+        """
+        Return a local path for the artwork, or the URL on a cache miss while it is downloaded in the background.
+
+        Args:
+            url (str): The artwork URL.
+            cover_id (str): The LMS cover ID, if known.
+
+        Returns:
+            str: The local file path, or the original URL if the artwork is not cached yet.
+        """
+        if not url:
+            return url
+        key = self.make_key(url, cover_id)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                stale = time.time() - entry['validated'] > ARTWORK_REVALIDATE_INTERVAL
+                path = os.path.join(self.cache_dir, entry['file'])
+            else:
+                self.misses += 1
+                downloading = key in self.foreground_keys
+                self.foreground_keys.add(key)
+
+        if entry is not None:
+            if stale:
+                self.revalidate_async(key, url)
+            return path
+        if not downloading:
+            self.download_async(key, url)
+        return url
+
+    def download_async(self, key, url):
+        """
+        Download artwork for the screen in the background. Prefetches give way until it finishes.
+
+        Args:
+            key (str): The cache key, already added to the foreground keys.
+            url (str): The artwork URL.
+        """
+        def download():
+            try:
+                self.download(key, url)
+            finally:
+                with self.lock:
+                    self.foreground_keys.discard(key)
+                    if not self.foreground_keys:
+                        self.foreground_idle.notify_all()
+
+        thread = threading.Thread(target=download)
+        thread.daemon = True
+        thread.start()
+
+    def prefetch(self, url, cover_id=None, is_cancelled=None):
+        """
+        Download artwork ahead of time, waiting while any foreground download is in progress.
+
+        Args:
+            url (str): The artwork URL.
+            cover_id (str): The LMS cover ID, if known.
+            is_cancelled (callable): Returns True if the prefetch is no longer wanted.
+        """
+        key = self.make_key(url, cover_id)
+        with self.lock:
+            while self.foreground_keys:
+                self.foreground_idle.wait()
+            if key in self.entries:
+                return
+
+        def should_stop():
+            # A foreground download of this image waits for the prefetch instead of competing with it
+            if self.foreground_keys and key not in self.foreground_keys:
+                return True
+            return is_cancelled is not None and is_cancelled()
+
+        if should_stop():
+            return
+        if self.download(key, url, should_stop):
+            with self.lock:
+                self.prefetched += 1
+
+    def download(self, key, url, should_stop=None):
+        """
+        Download artwork into the cache, sharing a download already in progress for the same key.
+
+        Args:
+            key (str): The cache key.
+            url (str): The artwork URL.
+            should_stop (callable): For prefetches, returns True if the download should give way.
+
+        Returns:
+            str: The local file path, or None if the download failed or was stopped.
+        """
+        with self.lock:
+            pending = self.inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self.inflight[key] = threading.Event()
+
+        if not owner:
+            # Another thread (usually a prefetch) is already downloading it
+            pending.wait(ARTWORK_FETCH_TIMEOUT)
+            with self.lock:
+                entry = self.entries.get(key)
+                return os.path.join(self.cache_dir, entry['file']) if entry is not None else None
+
+        try:
+            return self.fetch(key, url, should_stop=should_stop)
+        finally:
+            with self.lock:
+                del self.inflight[key]
+            pending.set()
+
+    def contains(self, url, cover_id=None):
+        """
+        Check whether artwork is cached, without touching the LRU order or counters.
+
+        Args:
+            url (str): The artwork URL.
+            cover_id (str): The LMS cover ID, if known.
+
+        Returns:
+            bool: True if the artwork is cached, False otherwise.
+        """
+        with self.lock:
+            return self.make_key(url, cover_id) in self.entries
+
+    def fetch(self, key, url, entry=None, should_stop=None):
+        """
+        Download artwork and store it, using a conditional request if an entry exists.
+
+        Args:
+            key (str): The cache key.
+            url (str): The artwork URL.
+            entry (dict): The existing entry to revalidate, or None for a fresh download.
+            should_stop (callable): Checked between chunks; returns True to abandon the download.
+
+        Returns:
+            str: The local file path, or None if the download failed or was stopped.
+        """
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = get_requests_session().get(url, headers=headers, timeout=ARTWORK_FETCH_TIMEOUT, stream=should_stop is not None)
+            if entry is not None and response.status_code == 304:
+                with self.lock:
+                    entry['validated'] = time.time()
+                    self.not_modified += 1
+                    self.save_index()
+                return os.path.join(self.cache_dir, entry['file'])
+            response.raise_for_status()
+            content = self.read_content(response, should_stop)
+        except requests.RequestException as e:
+            with self.lock:
+                self.errors += 1
+            log_message(f"Failed to fetch artwork {url}: {e}", LOG_LEVEL_WARNING)
+            return None
+
+        if content is None:
+            with self.lock:
+                self.prefetch_interrupted += 1
+            log_message("Stopped prefetching %s part way", LOG_LEVEL_DEBUG, url)
+            return None
+        return self.store(key, response, content)
+
+    @staticmethod
+    def read_content(response, should_stop):
+        """
+        Read the response body, in chunks when the download may have to stop part way.
+
+        Args:
+            response (requests.Response): The successful response.
+            should_stop (callable): Returns True to abandon the download, or None to read it in one go.
+
+        Returns:
+            bytes: The body, or None if the download was stopped.
+        """
+        if should_stop is None:
+            return response.content
+        chunks = []
+        try:
+            for chunk in response.iter_content(ARTWORK_PREFETCH_CHUNK_SIZE):
+                if should_stop():
+                    return None
+                chunks.append(chunk)
+        finally:
+            response.close()
+        return b''.join(chunks)
+
+    def store(self, key, response, content):
+        """
+        Write a downloaded image to disk and add it to the index, evicting old entries as needed.
+
+        Args:
+            key (str): The cache key.
+            response (requests.Response): The successful response.
+            content (bytes): The image data.
+
+        Returns:
+            str: The local file path, or None if the image could not be written.
+        """
+        extension = '.png' if 'png' in response.headers.get('Content-Type', '') else '.jpg'
+        file_name = key + extension
+        path = os.path.join(self.cache_dir, file_name)
+        temp_path = path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except OSError as e:
+            log_message(f"Failed to write artwork cache file {path}: {e}", LOG_LEVEL_WARNING)
+            return None
+
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old['size']
+                if old['file'] != file_name:
+                    self.remove_file(old['file'])
+            self.entries[key] = {
+                'key': key,
+                'file': file_name,
+                'size': len(content),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'validated': time.time()
+            }
+            self.total_bytes += len(content)
+            self.evict()
+            self.save_index()
+        return path
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits its size bound. Caller must hold the lock.
+        """
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, entry = self.entries.popitem(last=False)
+            self.total_bytes -= entry['size']
+            self.evictions += 1
+            self.remove_file(entry['file'])
+
+    def remove_file(self, file_name):
+        """
+        Delete a cache file, ignoring files that are already gone.
+
+        Args:
+            file_name (str): The file name inside the cache directory.
+        """
+        try:
+            os.remove(os.path.join(self.cache_dir, file_name))
+        except OSError:
+            pass
+
+    def revalidate_async(self, key, url):
+        """
+        Revalidate a stale entry in the background, at most once at a time per key.
+
+        Args:
+            key (str): The cache key.
+            url (str): The artwork URL.
+        """
+        with self.lock:
+            if key in self.revalidating:
+                return
+            self.revalidating.add(key)
+            self.revalidations += 1
+
+        def revalidate():
+            try:
+                with self.lock:
+                    entry = self.entries.get(key)
+                if entry is not None:
+                    self.fetch(key, url, entry)
+            finally:
+                with self.lock:
+                    self.revalidating.discard(key)
+
+        thread = threading.Thread(target=revalidate)
+        thread.daemon = True
+        thread.start()
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: Hit/miss counts and ratio, revalidation and eviction counts, and the cache size.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'revalidations': self.revalidations,
+                'not_modified': self.not_modified,
+                'evictions': self.evictions,
+                'errors': self.errors,
+                'prefetched': self.prefetched,
+                'prefetch_interrupted': self.prefetch_interrupted,
+                'entries': len(self.entries),
+                'bytes': self.total_bytes
+            }
+
+    def close(self):
+        """
+        Persist the index, including the latest LRU order, and log the counters.
+        """
+        with self.lock:
+            self.save_index()
+        log_message(f"Artwork cache stats: {self.stats()}", LOG_LEVEL_INFO)
+
+artwork_cache = None
+artwork_cache_lock = threading.Lock()
+
+def get_artwork_cache():
+    """
+    Return the shared artwork cache, creating it in the addon profile on first use.
+
+    Returns:
+        ArtworkCache: The shared cache instance.
+    """
+    global artwork_cache
+    with artwork_cache_lock:
+        if artwork_cache is None:
+            settings = global_config.settings or {}
+            max_bytes = get_int_setting(settings, ARTWORK_CACHE_MB_KEY, DEFAULT_ARTWORK_CACHE_MB) * 1024 * 1024
+            artwork_cache = ArtworkCache(get_profile_dir(ARTWORK_CACHE_DIR), max_bytes)
+        return artwork_cache
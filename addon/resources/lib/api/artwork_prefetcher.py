@@ -0,0 +1,141 @@
+import threading
+import resources.lib.utils.global_config as global_config
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.error_handling import log_exception
+from resources.lib.utils.read_settings import get_int_setting
+from resources.lib.api.artwork_cache import get_artwork_cache
+from resources.lib.utils.lazy_import import LazyModule
+from resources.lib.utils.constants import (
+    ARTWORK_PREFETCH_COUNT_KEY,
+    ARTWORK_PREFETCH_WORKERS,
+    DEFAULT_ARTWORK_PREFETCH_COUNT,
+    LOG_LEVEL_ERROR
+)
+
+# Imported when the prefetcher is created, on the first playlist update
+futures = LazyModule('concurrent.futures')
+
+class ArtworkPrefetcher:
+    """
+    Warms the artwork cache for the upcoming playlist entries on a small background pool.
+
+    Every new playlist starts a new generation; queued work from older generations is
+    cancelled or skips itself, and workers give way to foreground downloads in the cache.
+    The worker pool starts on first use, and start() reopens the prefetcher after shutdown().
+    """
+
+    def __init__(self, cache, count, max_workers=ARTWORK_PREFETCH_WORKERS):
+        self.cache = cache
+        self.count = count
+        self.max_workers = max_workers
+        self.executor = None
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.futures = []
+        self.last_keys = None
+        self.closed = False
+
+        # Counters
+        self.scheduled = 0
+        self.cancelled = 0
+
+    def start(self):
+        """
+        Reopen the prefetcher after shutdown(). The worker pool starts on the next prefetch.
+        """
+        with self.lock:
+            self.closed = False
+            self.last_keys = None  # Schedule the next playlist even if it did not change meanwhile
+
+    def prefetch(self, playlist):
+        """
+        Schedule artwork downloads for the entries after the current track.
+
+        Args:
+            playlist (list): The TrackRecord of each playlist entry, current track first.
+        """
+        upcoming = [item for item in playlist[1:self.count + 1] if item.artwork_url]
+        keys = tuple(self.cache.make_key(item.artwork_url, item.cover_id) for item in upcoming)
+
+        with self.lock:
+            if self.closed or keys == self.last_keys:
+                return  # Same upcoming artwork: let the current generation finish
+            self.last_keys = keys
+            self.generation += 1
+            generation = self.generation
+            self.cancel_pending()
+            if self.executor is None:
+                self.executor = futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="klms-prefetch")
+
+            for item in upcoming:
+                if self.cache.contains(item.artwork_url, item.cover_id):
+                    continue
+                future = self.executor.submit(self.fetch, generation, item.artwork_url, item.cover_id)
+                self.futures.append(future)
+                self.scheduled += 1
+
+    def fetch(self, generation, url, cover_id):
+        """
+        Worker: prefetch one image unless its generation has been superseded.
+
+        Args:
+            generation (int): The generation the work was scheduled in.
+            url (str): The artwork URL.
+            cover_id (str): The LMS cover ID.
+        """
+        is_cancelled = lambda: generation != self.generation or self.closed
+        if is_cancelled():
+            return
+        try:
+            self.cache.prefetch(url, cover_id, is_cancelled)
+        except Exception as e:
+            log_message(f"Artwork prefetch failed for {url}: {e}", LOG_LEVEL_ERROR)
+            log_exception(e)
+
+    def cancel_pending(self):
+        """
+        Cancel queued work that has not started yet. Caller must hold the lock.
+        """
+        for future in self.futures:
+            if future.cancel():
+                self.cancelled += 1
+        self.futures = [future for future in self.futures if not future.done()]
+
+    def stats(self):
+        """
+        Return the prefetch counters.
+
+        Returns:
+            dict: Scheduled and cancelled prefetch counts and the current generation.
+        """
+        with self.lock:
+            return {'scheduled': self.scheduled, 'cancelled': self.cancelled, 'generation': self.generation}
+
+    def shutdown(self):
+        """
+        Cancel queued work and stop the worker pool. Running downloads stop at their next chunk.
+        """
+        with self.lock:
+            self.closed = True
+            self.cancel_pending()
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+artwork_prefetcher = None
+artwork_prefetcher_lock = threading.Lock()
+
+def get_artwork_prefetcher():
+    """
+    Return the shared artwork prefetcher, creating it on first use.
+
+    Returns:
+        ArtworkPrefetcher: The shared prefetcher instance.
+    """
+    global artwork_prefetcher
+    with artwork_prefetcher_lock:
+        if artwork_prefetcher is None:
+            settings = global_config.settings or {}
+            count = get_int_setting(settings, ARTWORK_PREFETCH_COUNT_KEY, DEFAULT_ARTWORK_PREFETCH_COUNT)
+            artwork_prefetcher = ArtworkPrefetcher(get_artwork_cache(), count)
+        return artwork_prefetcher
@@ -0,0 +1,476 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import resources.lib.utils.global_config as global_config
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.error_handling import log_exception
+from resources.lib.utils.latency_tracer import latency_tracer, STAGE_SENT, STAGE_RESPONSE
+from resources.lib.utils.trace_recorder import trace_recorder
+from resources.lib.api.fetch_lms_status import FetchResult, fetch_lms_status_result
+from resources.lib.api.cli_status import cli_line_key, cli_request_key, construct_cli_status_command, parse_cli_status_response
+from resources.lib.utils.constants import (
+    CLI_LINE_LIMIT,
+    CLI_QUERY_TIMEOUT,
+    LMS_PLAYER_ID_KEY,
+    LOG_LEVEL_ERROR,
+    LOG_LEVEL_INFO,
+    LOG_LEVEL_WARNING,
+    SOCKET_TIMEOUT,
+    STATUS_FETCH_BUDGET,
+    STATUS_QUERY_PARAMS,
+    STATUS_TRANSPORT_CLI,
+    STATUS_TRANSPORT_PUSH
+)
+
+class AsyncEventEngine:
+    """
+    Runs the LMS connection, subscription, status fetching and UI dispatch on a single asyncio loop.
+
+    The engine is driven by a TelnetHandler and shares its coalescer, status model and
+    UI callback. Reads block on the socket without timeouts and the dispatcher only
+    wakes for events or debounce deadlines, so the loop is fully idle between events.
+    The UI callback paints controls and may download artwork, so it runs on a dedicated
+    UI thread; the loop only does I/O and parsing and keeps reading while it paints.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.loop = None
+        self.thread = None
+        self.main_task = None
+        self.writer = None
+        self.event_signal = None
+        self.connected = None  # asyncio.Event set while the CLI connection is open
+        self.pending_replies = {}  # cli_request_key -> deque of futures, in request order
+        self.ui_executor = None  # One thread, so updates are painted in order
+        self.started = threading.Event()
+
+    def start(self):
+        """
+        Start the event loop in its own thread and wait until it is ready to accept requests.
+        """
+        self.ui_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lms-ui")
+        self.thread = threading.Thread(target=self.run, name="lms-asyncio")
+        self.thread.daemon = True
+        self.thread.start()
+        self.started.wait(timeout=5)
+
+    def run(self):
+        """
+        Thread entry point: run the engine until it is cancelled.
+        """
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.main())
+        except Exception as e:
+            log_message(f"Asyncio engine stopped with an error: {e}", LOG_LEVEL_ERROR)
+            log_exception(e)
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def is_running(self):
+        """
+        Check whether the event loop thread is running.
+
+        Returns:
+            bool: True if the engine can accept requests, False otherwise.
+        """
+        return self.thread is not None and self.thread.is_alive() and self.loop is not None
+
+    async def main(self):
+        """
+        Run the subscription reader and the event dispatcher until cancelled.
+        """
+        self.main_task = asyncio.current_task()
+        self.event_signal = asyncio.Event()
+        self.connected = asyncio.Event()
+        self.started.set()
+
+        tasks = [asyncio.ensure_future(self.read_events()), asyncio.ensure_future(self.dispatch_events())]
+        try:
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.disconnect()
+
+    async def connect(self):
+        """
+        Open the CLI connection and subscribe, retrying until it succeeds or the engine is cancelled.
+
+        Returns:
+            asyncio.StreamReader: The reader for the new connection.
+        """
+        health = self.handler.health
+        scheduler = self.handler.reconnect_scheduler
+        retry_now = asyncio.Event()
+        scheduler.on_wakeup = lambda: self.loop.call_soon_threadsafe(retry_now.set)
+        try:
+            while True:
+                host, port = self.handler.get_cli_address()  # Discovery may have moved the server
+                if health.allow_request():
+                    try:
+                        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, limit=CLI_LINE_LIMIT), SOCKET_TIMEOUT)
+                        writer.write(self.handler.get_subscribe_command())
+                        await writer.drain()
+                        health.record_success()
+                        scheduler.connected()
+                        self.writer = writer
+                        self.connected.set()
+                        log_message(f"Connected to LMS {host} via asyncio CLI connection.", LOG_LEVEL_INFO)
+                        if self.handler.player_tracker is not None:
+                            self.handler.player_tracker.on_connected()
+                        return reader
+                    except (OSError, asyncio.TimeoutError) as e:
+                        health.record_failure(e)
+                        self.handler.on_connect_failed()
+                        log_message(f"Connection to {host} failed. Error: {e}", LOG_LEVEL_ERROR)
+
+                delay = scheduler.next_delay(health.time_until_probe())
+                log_message(f"Retrying connection in {delay:.1f} seconds...")
+                try:
+                    await asyncio.wait_for(retry_now.wait(), delay)  # Cancellation interrupts the wait immediately
+                except asyncio.TimeoutError:
+                    pass
+                retry_now.clear()
+        finally:
+            scheduler.on_wakeup = None
+
+    async def disconnect(self):
+        """
+        Unsubscribe and close the CLI connection if it is open.
+        """
+        writer = self.writer
+        self.writer = None
+        self.connected.clear()
+        self.fail_pending_replies()
+        if writer is None:
+            return
+        try:
+            writer.write(self.handler.get_unsubscribe_command())
+            await asyncio.wait_for(writer.drain(), SOCKET_TIMEOUT)
+            writer.close()
+            await asyncio.wait_for(writer.wait_closed(), SOCKET_TIMEOUT)
+            log_message("Asyncio CLI connection closed and unsubscribed from events.", LOG_LEVEL_INFO)
+        except (OSError, asyncio.TimeoutError) as e:
+            log_message(f"Error closing asyncio CLI connection: {e}", LOG_LEVEL_ERROR)
+
+    async def read_events(self):
+        """
+        Read lines from the CLI connection, resolving query replies and queueing events.
+        """
+        push_mode = self.handler.get_status_transport() == STATUS_TRANSPORT_PUSH
+        reader = await self.connect()
+        while True:
+            try:
+                line = await reader.readline()  # No timeout: the loop sleeps until data arrives
+            except (OSError, asyncio.IncompleteReadError):
+                line = b""
+            except (ValueError, asyncio.LimitOverrunError) as e:
+                # The rest of the line is still buffered, so the stream cannot be resynchronised
+                log_message(f"CLI line longer than {CLI_LINE_LIMIT} bytes: {e}", LOG_LEVEL_ERROR)
+                line = b""
+
+            if not line:
+                log_message("Connection lost, reconnecting...", LOG_LEVEL_WARNING)
+                self.handler.reconnect_scheduler.connection_lost()
+                self.fail_pending_replies()
+                self.handler.status_model.clear()
+                self.connected.clear()
+                writer, self.writer = self.writer, None
+                if writer is not None:
+                    writer.close()
+                reader = await self.connect()
+                continue
+
+            if self.resolve_reply(line):
+                trace_recorder.record_cli_line(line, reply=True)
+                continue
+            trace_recorder.record_cli_line(line)
+            if self.handler.handle_line(line, push_mode, latency_tracer.start()):
+                self.event_signal.set()
+
+    async def dispatch_events(self):
+        """
+        Wait for coalesced events and handle the latest event of each burst.
+        """
+        coalescer = self.handler.coalescer
+        while True:
+            await self.event_signal.wait()
+            self.event_signal.clear()
+
+            # Trailing-edge debounce: sleep until the burst's deadline, extended by any new event
+            release_at = coalescer.release_deadline()
+            while release_at is not None and release_at > time.monotonic():
+                try:
+                    await asyncio.wait_for(self.event_signal.wait(), release_at - time.monotonic())
+                    self.event_signal.clear()
+                except asyncio.TimeoutError:
+                    pass
+                release_at = coalescer.release_deadline()
+
+            event_data = coalescer.take()
+            if event_data is not None:
+                latency_tracer.resume(coalescer.released_trace)
+                try:
+                    await self.handle_event(event_data)
+                finally:
+                    latency_tracer.finish()
+
+    async def handle_event(self, event_data):
+        """
+        Fetch the latest status and pass it to the UI callback.
+
+        Args:
+            event_data (CliEvent): The latest event of the burst.
+        """
+        result = await self.fetch_status_result(is_superseded=self.handler.coalescer.has_pending)
+        if not self.handler.record_fetch_result(result):
+            return
+        if self.handler.update_ui_callback:
+            # Painted on the UI thread, in a copy of the context to keep the active trace; the next
+            # event waits for it, but replies and pushes are still read meanwhile
+            context = contextvars.copy_context()
+            await self.loop.run_in_executor(self.ui_executor, context.run, self.run_ui_callback, result.data)
+
+    def run_ui_callback(self, lms_data):
+        """
+        UI thread: pass the status to the UI callback.
+
+        Args:
+            lms_data (dict): The status data.
+        """
+        try:
+            self.handler.update_ui_callback(lms_data)
+        except Exception as e:
+            log_message(f"Error in UI update callback: {e}", LOG_LEVEL_ERROR)
+            log_exception(e)
+
+    async def fetch_status_result(self, params=None, budget=STATUS_FETCH_BUDGET, is_superseded=None):
+        """
+        Fetch the player status using the transport selected in the settings, within a time budget.
+
+        Args:
+            params (list): Status query parameters for a custom window, or None for the default query.
+            budget (float): The overall time budget in seconds, covering the CLI query and the HTTP fallback.
+            is_superseded (callable): Returns True if a newer event makes this fetch obsolete.
+
+        Returns:
+            FetchResult: The status data and how the fetch went.
+        """
+        deadline = time.monotonic() + budget
+        transport = self.handler.get_status_transport()
+
+        if transport == STATUS_TRANSPORT_PUSH:
+            if params is None and self.handler.status_model.has_data():
+                return FetchResult(self.handler.status_model.snapshot())
+            transport = STATUS_TRANSPORT_CLI
+
+        timed_out = False
+        if transport == STATUS_TRANSPORT_CLI:
+            lms_data, timed_out = await self.query_status_cli(params, min(CLI_QUERY_TIMEOUT, budget))
+            if lms_data is not None:
+                return FetchResult(lms_data)
+            if is_superseded is not None and is_superseded():
+                return FetchResult(superseded=True)
+            log_message("CLI status query failed, falling back to HTTP.", LOG_LEVEL_WARNING)
+
+        # The HTTP client is blocking, so it runs in the loop's executor, in a copy of the context to keep the active trace
+        context = contextvars.copy_context()
+        result = await self.loop.run_in_executor(None, context.run, fetch_lms_status_result, params, deadline - time.monotonic(), is_superseded)
+        result.timed_out = result.timed_out or timed_out
+        return result
+
+    async def query_status_cli(self, params=None, timeout=CLI_QUERY_TIMEOUT):
+        """
+        Send a status query over the CLI connection and await the matching reply.
+
+        Args:
+            params (list): Status query parameters, or None for the default query.
+            timeout (float): The maximum time to wait for the reply in seconds.
+
+        Returns:
+            tuple: The parsed status in the JSON-RPC response layout, or None if no reply arrived,
+                and whether the query timed out.
+        """
+        if self.writer is None and self.handler.health.is_available():
+            # Still connecting, e.g. when the window opens right after startup: waiting is faster than the HTTP fallback
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(self.connected.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            timeout -= time.monotonic() - started
+        if self.writer is None or timeout <= 0:
+            return None, False
+
+        player_id = global_config.settings[LMS_PLAYER_ID_KEY]
+        params = params or STATUS_QUERY_PARAMS
+        key = cli_request_key(player_id, params)
+        future = self.loop.create_future()
+        self.pending_replies.setdefault(key, deque()).append(future)
+        try:
+            self.writer.write(construct_cli_status_command(player_id, params))
+            await self.writer.drain()
+            latency_tracer.mark(STAGE_SENT)
+            reply = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            log_message(f"CLI status query failed: {e}", LOG_LEVEL_WARNING)
+            self.discard_reply(key, future)
+            return None, isinstance(e, asyncio.TimeoutError)
+
+        if reply is None:
+            return None, False
+        latency_tracer.mark(STAGE_RESPONSE)
+        return parse_cli_status_response(reply), False
+
+    async def query_status_batch(self, player_ids, params, timeout=CLI_QUERY_TIMEOUT):
+        """
+        Send status queries for several players in one write and await all replies.
+
+        Args:
+            player_ids (list): The player IDs.
+            params (list): The status query parameters.
+            timeout (float): The maximum time to wait for all replies in seconds.
+
+        Returns:
+            dict: The parsed status of each player, or None for players whose reply did not arrive.
+        """
+        results = dict.fromkeys(player_ids)
+        if self.writer is None or not player_ids:
+            return results
+
+        queries = []
+        for player_id in player_ids:
+            key = cli_request_key(player_id, params)
+            future = self.loop.create_future()
+            self.pending_replies.setdefault(key, deque()).append(future)
+            queries.append((player_id, key, future))
+        try:
+            self.writer.write(b"".join(construct_cli_status_command(player_id, params) for player_id in player_ids))
+            await self.writer.drain()
+            await asyncio.wait([future for _, _, future in queries], timeout=timeout)
+        except OSError as e:
+            log_message(f"CLI status queries failed: {e}", LOG_LEVEL_WARNING)
+
+        for player_id, key, future in queries:
+            if future.done() and not future.cancelled() and future.result() is not None:
+                results[player_id] = parse_cli_status_response(future.result())
+            else:
+                self.discard_reply(key, future)
+        return results
+
+    def request_status_batch(self, player_ids, params, timeout=CLI_QUERY_TIMEOUT):
+        """
+        Query the status of several players from another thread.
+
+        Args:
+            player_ids (list): The player IDs.
+            params (list): The status query parameters.
+            timeout (float): The maximum time to wait for all replies in seconds.
+
+        Returns:
+            dict: The parsed status of each player, or None for players whose reply did not arrive.
+        """
+        future = asyncio.run_coroutine_threadsafe(self.query_status_batch(player_ids, params, timeout), self.loop)
+        try:
+            return future.result(timeout + SOCKET_TIMEOUT)
+        except Exception as e:
+            future.cancel()
+            log_message(f"Status batch request to asyncio engine failed: {e}", LOG_LEVEL_ERROR)
+            return dict.fromkeys(player_ids)
+
+    def resolve_reply(self, line):
+        """
+        Resolve the oldest pending query whose key matches the line.
+
+        Args:
+            line (bytes): The raw line read from the CLI connection.
+
+        Returns:
+            bool: True if the line was a reply to a pending query, False otherwise.
+        """
+        key = cli_line_key(line)
+        if key is None:
+            return False
+        futures = self.pending_replies.get(key)
+        if not futures:
+            return False
+        future = futures.popleft()
+        if not futures:
+            del self.pending_replies[key]
+        if not future.done():
+            future.set_result(line)
+        return True
+
+    def discard_reply(self, key, future):
+        """
+        Forget a pending query that timed out or failed.
+
+        Args:
+            key (tuple): The reply key of the query.
+            future (asyncio.Future): The future waiting for the reply.
+        """
+        futures = self.pending_replies.get(key)
+        if futures and future in futures:
+            futures.remove(future)
+            if not futures:
+                del self.pending_replies[key]
+        future.cancel()
+
+    def fail_pending_replies(self):
+        """
+        Resolve every pending query without a reply, e.g. when the connection drops.
+        """
+        for futures in self.pending_replies.values():
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+        self.pending_replies.clear()
+
+    def request_status(self, params=None, budget=STATUS_FETCH_BUDGET, is_superseded=None):
+        """
+        Fetch the player status from another thread, e.g. the Kodi UI thread.
+
+        Args:
+            params (list): Status query parameters for a custom window, or None for the default query.
+            budget (float): The overall time budget in seconds.
+            is_superseded (callable): Returns True if a newer event makes this fetch obsolete.
+
+        Returns:
+            FetchResult: The status data and how the fetch went.
+        """
+        future = asyncio.run_coroutine_threadsafe(self.fetch_status_result(params, budget, is_superseded), self.loop)
+        try:
+            return future.result(budget + SOCKET_TIMEOUT)
+        except Exception as e:
+            future.cancel()
+            log_message(f"Status request to asyncio engine failed: {e}", LOG_LEVEL_ERROR)
+            return FetchResult(timed_out=True)
+
+    def stop(self, timeout=5):
+        """
+        Cancel all engine tasks, close the connection and wait for the loop thread to finish.
+
+        Args:
+            timeout (float): The maximum time to wait for the thread in seconds.
+        """
+        if self.loop is not None and self.main_task is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.main_task.cancel)
+            except RuntimeError:
+                pass  # The loop has already finished
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+            if self.thread.is_alive():
+                log_message("Warning: asyncio engine thread did not terminate within the timeout.", LOG_LEVEL_WARNING)
+        if self.ui_executor is not None:
+            self.ui_executor.shutdown(wait=False)
@@ -0,0 +1,214 @@
+"""
+Parser for LMS CLI notification lines.
+
+Notifications have the form '<player id> <command path...> <arguments...>', with every
+token percent-encoded, or '<command path...> <arguments...>' for server-level
+notifications such as 'rescan done'. A line is split once, into at most the player ID,
+the command path and the rest; only the command path is decoded. The player ID and the
+arguments stay raw bytes, and the arguments are split further and percent-decoded only
+on access, without copying the rest of the line again.
+"""
+
+from urllib.parse import unquote_to_bytes
+
+# Commands whose path is two tokens long; any other command is a single token
+TWO_TOKEN_COMMANDS = frozenset((
+    b"playlist",  # playlist newsong <title> <index>, playlist pause 1, playlist clear, ...
+    b"mixer",     # mixer volume <value>
+    b"client",    # client new|disconnect|reconnect|forget
+    b"prefset",   # prefset <namespace> <pref> <value>
+))
+
+# Player IDs are MAC addresses, percent-encoded by the CLI ('00%3A04%3A20%3A12%3A34%3A56'),
+# or UUIDs for some software players. A line whose first token is anything else is a
+# server-level notification, e.g. 'rescan done' or 'favorites changed'
+ENCODED_MAC_LENGTH = 27
+MAC_LENGTH = 17
+UUID_LENGTHS = (32, 36)
+HEX_DIGITS = b"0123456789abcdefABCDEF"
+
+# Bound on the caches below, against arbitrary server input
+PARSER_CACHE_SIZE = 256
+
+# Decoded command paths, so each path is decoded only once: keyed by the raw command token, with
+# a dict keyed by the second token for two-token commands
+_command_cache = {}
+
+# Whether a first token is a player ID, so each player's ID is checked only once
+_player_token_cache = {}
+
+class CliEvent:
+    """
+    Compact record of one CLI notification.
+
+    Attributes:
+        raw_player_id (bytes): The raw, still percent-encoded player ID, or None for server-level notifications.
+        command (tuple): The command path, e.g. ('playlist', 'newsong').
+        tokens (list): The raw tokens of the line, as split by the parser.
+        tail_index (int): The index of the first argument token.
+    """
+
+    __slots__ = ('raw_player_id', 'command', 'tokens', 'tail_index')
+
+    def __init__(self, raw_player_id, command, tokens, tail_index):
+        self.raw_player_id = raw_player_id
+        self.command = command
+        self.tokens = tokens
+        self.tail_index = tail_index
+
+    @property
+    def player_id(self):
+        """
+        The decoded player ID.
+
+        Returns:
+            str: The player ID, or None for server-level notifications.
+        """
+        if self.raw_player_id is None:
+            return None
+        return decode_token(self.raw_player_id)
+
+    @property
+    def raw_tail(self):
+        """
+        The arguments as they appear in the line.
+
+        Returns:
+            bytes: The raw, still percent-encoded arguments, separated by spaces.
+        """
+        return b" ".join(self.tokens[self.tail_index:])
+
+    @property
+    def raw_args(self):
+        """
+        The arguments as raw, still percent-encoded tokens.
+
+        Returns:
+            list: The raw argument tokens.
+        """
+        tokens = self.tokens
+        if self.tail_index >= len(tokens):
+            return []
+        # Only the last token of the split can still contain spaces
+        return tokens[self.tail_index:-1] + tokens[-1].split(b" ")
+
+    def arg(self, index, default=None):
+        """
+        Return a single percent-decoded argument.
+
+        Args:
+            index (int): The argument position.
+            default (str): The value to return if the argument is missing.
+
+        Returns:
+            str: The decoded argument, or the default.
+        """
+        raw_args = self.raw_args
+        if index >= len(raw_args):
+            return default
+        return decode_token(raw_args[index])
+
+    @property
+    def args(self):
+        """
+        All arguments, percent-decoded.
+
+        Returns:
+            tuple: The decoded arguments.
+        """
+        return tuple(decode_token(token) for token in self.raw_args)
+
+    def __repr__(self):
+        return f"CliEvent({self.player_id!r}, {' '.join(self.command)!r}, {len(self.raw_args)} args)"
+
+def decode_token(token):
+    """
+    Percent-decode a raw CLI token, replacing invalid UTF-8 instead of raising.
+
+    Args:
+        token (bytes): The raw token.
+
+    Returns:
+        str: The decoded token.
+    """
+    if b"%" in token:
+        token = unquote_to_bytes(token)
+    return token.decode('utf-8', errors='replace')
+
+def decode_command(token):
+    """
+    Decode a command token, which is plain ASCII.
+
+    Args:
+        token (bytes): The raw token.
+
+    Returns:
+        str: The decoded token.
+    """
+    return token.decode('ascii', errors='replace')
+
+def is_player_token(token):
+    """
+    Check whether the first token of a line is a player ID: a MAC address, percent-encoded or not, or a UUID.
+
+    Args:
+        token (bytes): The raw token.
+
+    Returns:
+        bool: True if the token is a player ID, False if the line is a server-level notification.
+    """
+    if len(token) == ENCODED_MAC_LENGTH:
+        token = token.replace(b"%3A", b":").replace(b"%3a", b":")
+    if len(token) == MAC_LENGTH:
+        return token[2::3] == b":::::" and not token.translate(None, HEX_DIGITS + b":")
+    return len(token) in UUID_LENGTHS and not token.translate(None, HEX_DIGITS + b"-")
+
+def parse_cli_line(line):
+    """
+    Parse a raw CLI line into a CliEvent.
+
+    Args:
+        line (bytes): The raw line read from the CLI connection.
+
+    Returns:
+        CliEvent: The parsed event, or None if the line is empty or has a player ID but no command.
+    """
+    # One split covers the player ID and a two-token command path; the rest stays in the last token
+    tokens = line.rstrip(b"\r\n").split(b" ", 3)
+    first = tokens[0]
+    is_player = _player_token_cache.get(first)
+    if is_player is None:
+        is_player = is_player_token(first)
+        if len(_player_token_cache) < PARSER_CACHE_SIZE:
+            _player_token_cache[first] = is_player
+
+    if is_player:
+        if len(tokens) == 1:
+            return None
+        name = tokens[1]
+        index = 2
+    elif first:
+        name = first
+        first = None
+        index = 1
+    else:
+        return None
+
+    command = _command_cache.get(name)
+    if command is None:
+        command = {} if name in TWO_TOKEN_COMMANDS else (decode_command(name),)
+        if len(_command_cache) < PARSER_CACHE_SIZE:
+            _command_cache[name] = command
+    if command.__class__ is dict:
+        if len(tokens) > index:
+            sub = tokens[index]
+            index += 1
+            sub_commands = command
+            command = sub_commands.get(sub)
+            if command is None:
+                command = (decode_command(name), decode_command(sub))
+                if len(sub_commands) < PARSER_CACHE_SIZE:
+                    sub_commands[sub] = command
+        else:
+            command = (decode_command(name),)  # e.g. a bare 'playlist'
+    return CliEvent(first, command, tokens, index)
@@ -0,0 +1,212 @@
+import threading
+from collections import deque
+from urllib.parse import quote, unquote
+from resources.lib.utils.constants import (
+    LMS_RESULT_KEY,
+    LMS_PLAYLIST_LOOP_KEY,
+    LMS_PLAYLIST_INDEX_KEY,
+    STATUS_QUERY_PARAMS,
+    CLI_REPLY_KEY_PARAMS,
+    CLI_ECHOED_PARAM_KEYS,
+    CLI_SUBSCRIBE_MARKERS,
+    CLI_FLOAT_FIELDS,
+    CLI_INT_FIELDS
+)
+
+def construct_cli_status_command(player_id, params=STATUS_QUERY_PARAMS):
+    """
+    Construct the CLI command line for a player status query.
+
+    Args:
+        player_id (str): The LMS player ID.
+        params (list): The status query parameters, as used in the JSON-RPC payload.
+
+    Returns:
+        bytes: The encoded command line, terminated by a newline.
+    """
+    tokens = [quote(str(player_id), safe='')] + [quote(str(param), safe=':') for param in params]
+    return (' '.join(tokens) + '\n').encode('utf-8')
+
+def cli_request_key(player_id, params=STATUS_QUERY_PARAMS):
+    """
+    Build the key used to match a CLI reply to the request that caused it.
+    The key covers the command and its first two positional parameters, so replies
+    for different playlist windows are not mixed up.
+
+    Args:
+        player_id (str): The LMS player ID.
+        params (list): The query parameters, e.g. ['status', '-', 10, 'tags:acdKl'].
+
+    Returns:
+        tuple: The normalised key.
+    """
+    head = [str(param) for param in params[:CLI_REPLY_KEY_PARAMS]]
+    head += [''] * (CLI_REPLY_KEY_PARAMS - len(head))
+    return (str(player_id).lower(),) + tuple(head)
+
+def cli_line_key(line):
+    """
+    Build the reply key of a line read from the CLI connection.
+    Status pushes echo the query of the subscription, which has the same key as the
+    default status query, so lines carrying a 'subscribe:' parameter get no key and
+    always go to the push handler.
+
+    Args:
+        line (bytes): The raw line.
+
+    Returns:
+        tuple: The key, comparable with cli_request_key(), or None if the line is too short or a status push.
+    """
+    if any(marker in line for marker in CLI_SUBSCRIBE_MARKERS):
+        return None
+    parts = line.rstrip(b"\r\n").split(b' ', CLI_REPLY_KEY_PARAMS + 1)
+    if len(parts) < 2:
+        return None
+    head = [unquote(part.decode('utf-8', errors='replace')) for part in parts[1:CLI_REPLY_KEY_PARAMS + 1]]
+    head += [''] * (CLI_REPLY_KEY_PARAMS - len(head))
+    return (unquote(parts[0].decode('utf-8', errors='replace')).lower(),) + tuple(head)
+
+def convert_cli_value(key, value):
+    """
+    Convert a CLI tag value to the type the JSON-RPC interface would return.
+
+    Args:
+        key (str): The tag name.
+        value (str): The decoded tag value.
+
+    Returns:
+        The converted value, or the original string if it is not numeric.
+    """
+    try:
+        if key in CLI_INT_FIELDS:
+            return int(value)
+        if key in CLI_FLOAT_FIELDS:
+            return float(value)
+    except ValueError:
+        pass
+    return value
+
+def parse_cli_status_response(line):
+    """
+    Parse a CLI status reply into the same structure as a JSON-RPC status response.
+
+    Args:
+        line (bytes): The raw reply line read from the CLI connection.
+
+    Returns:
+        dict: A dictionary with the status under the 'result' key, or None if the line is not a status reply.
+    """
+    tokens = line.decode('utf-8', errors='replace').strip().split(' ')
+    if len(tokens) < 2 or tokens[1] != 'status':
+        return None
+
+    result = {}
+    playlist_loop = []
+    current = result
+    for token in tokens[2:]:
+        key, sep, value = unquote(token).partition(':')
+        if not sep or key in CLI_ECHOED_PARAM_KEYS:
+            continue  # Parameters echoed from the request ('-', '10', 'tags:...')
+        if key == LMS_PLAYLIST_INDEX_KEY:
+            # Each 'playlist index' tag starts a new playlist entry
+            current = {}
+            playlist_loop.append(current)
+        current[key] = convert_cli_value(key, value)
+
+    if playlist_loop:
+        result[LMS_PLAYLIST_LOOP_KEY] = playlist_loop
+    return {LMS_RESULT_KEY: result}
+
+class CliRequestTracker:
+    """
+    Matches replies read from the CLI connection to the requests waiting for them.
+
+    The LMS CLI answers commands in the order they were sent and echoes the player ID,
+    command and parameters at the start of each reply, so waiters are kept in a FIFO
+    per key built from that prefix.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def register(self, key):
+        """
+        Register a waiter for the next reply with the given key.
+
+        Args:
+            key (tuple): The key returned by cli_request_key().
+
+        Returns:
+            dict: The waiter, to pass to wait() or cancel().
+        """
+        waiter = {'event': threading.Event(), 'reply': None}
+        with self.lock:
+            self.pending.setdefault(key, deque()).append(waiter)
+        return waiter
+
+    def deliver(self, line):
+        """
+        Hand a CLI line to the oldest waiter with a matching key.
+
+        Args:
+            line (bytes): The raw line read from the CLI connection.
+
+        Returns:
+            bool: True if the line was a reply to a pending request, False otherwise.
+        """
+        key = cli_line_key(line)
+        if key is None:
+            return False
+
+        with self.lock:
+            waiters = self.pending.get(key)
+            if not waiters:
+                return False
+            waiter = waiters.popleft()
+            if not waiters:
+                del self.pending[key]
+
+        waiter['reply'] = line
+        waiter['event'].set()
+        return True
+
+    def wait(self, waiter, timeout):
+        """
+        Wait for the reply to a registered request.
+
+        Args:
+            waiter (dict): The waiter returned by register().
+            timeout (float): The maximum time to wait in seconds.
+
+        Returns:
+            bytes: The reply line, or None if no reply arrived in time.
+        """
+        if not waiter['event'].wait(timeout):
+            self.cancel(waiter)
+        return waiter['reply']
+
+    def cancel(self, waiter):
+        """
+        Remove a waiter that is no longer interested in its reply.
+
+        Args:
+            waiter (dict): The waiter returned by register().
+        """
+        with self.lock:
+            for key, waiters in list(self.pending.items()):
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self.pending[key]
+                    break
+
+    def fail_all(self):
+        """
+        Release every pending waiter without a reply, e.g. when the connection drops.
+        """
+        with self.lock:
+            waiters = [waiter for queue in self.pending.values() for waiter in queue]
+            self.pending.clear()
+        for waiter in waiters:
+            waiter['event'].set()
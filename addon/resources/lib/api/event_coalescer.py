@@ -0,0 +1,174 @@
+import threading
+import time
+from resources.lib.utils.constants import DEBOUNCE_TIME, DEBOUNCE_MAX_WAIT
+
+class EventCoalescer:
+    """
+    Latest-wins coalescing stage between the telnet subscriber and the event processor.
+
+    Events pushed while a burst is in progress replace the pending event instead of
+    queueing behind it. A burst is released once no new event has arrived for the
+    quiet period (trailing-edge debounce), or once the max-wait ceiling measured from
+    the first event of the burst has passed, whichever comes first.
+
+    A latency trace can ride along with each event. The trace of the first event of a
+    burst is kept, so traced latency includes the time spent waiting for the burst to
+    settle, and is available as released_trace once the burst is released.
+    """
+
+    def __init__(self, quiet_period=DEBOUNCE_TIME, max_wait=DEBOUNCE_MAX_WAIT):
+        self.quiet_period = quiet_period
+        self.max_wait = max(max_wait, quiet_period)
+        self.condition = threading.Condition()
+        self.pending_event = None
+        self.pending_trace = None
+        self.released_trace = None
+        self.burst_started = None
+        self.last_event_time = None
+        self.burst_size = 0
+        self.closed = False
+
+        # Counters
+        self.events_received = 0
+        self.events_merged = 0
+        self.bursts_released = 0
+        self.largest_burst = 0
+
+    def push(self, event_data, trace=None):
+        """
+        Record a new event, replacing any event still waiting to be released.
+
+        Args:
+            event_data: The event to record: a CliEvent, or a player ID for the dashboard tracker.
+            trace (Trace): The latency trace of the event, or None.
+        """
+        now = time.monotonic()
+        with self.condition:
+            if self.pending_event is None:
+                self.burst_started = now
+                self.burst_size = 0
+                self.pending_trace = trace
+            else:
+                self.events_merged += 1
+            self.pending_event = event_data
+            self.last_event_time = now
+            self.burst_size += 1
+            self.events_received += 1
+            self.condition.notify()
+
+    def has_pending(self):
+        """
+        Check whether an event is waiting to be released.
+
+        Returns:
+            bool: True if an event arrived since the last release, False otherwise.
+        """
+        with self.condition:
+            return self.pending_event is not None
+
+    def wait_for_event(self):
+        """
+        Block until a burst is released or the coalescer is closed.
+
+        Returns:
+            CliEvent or str: The latest event of the released burst, or None if the coalescer was closed.
+        """
+        with self.condition:
+            while not self.closed:
+                release_at = self._release_deadline()
+                if release_at is None:
+                    # Nothing pending: sleep until push() or close() notifies
+                    self.condition.wait()
+                    continue
+
+                now = time.monotonic()
+                if now >= release_at:
+                    return self._release()
+                self.condition.wait(timeout=release_at - now)
+            return None
+
+    def release_deadline(self):
+        """
+        Return when the pending burst is due for release, for consumers that do their own waiting.
+
+        Returns:
+            float: The time.monotonic() value at which to call take(), or None if nothing is pending.
+        """
+        with self.condition:
+            return self._release_deadline()
+
+    def take(self):
+        """
+        Release the pending burst without waiting.
+
+        Returns:
+            CliEvent or str: The latest event of the burst, or None if nothing is pending.
+        """
+        with self.condition:
+            if self.pending_event is None:
+                return None
+            return self._release()
+
+    def _release_deadline(self):
+        """
+        Compute the release time of the pending burst. Caller must hold the condition.
+
+        Returns:
+            float: The release time, or None if nothing is pending.
+        """
+        if self.pending_event is None:
+            return None
+        return min(self.last_event_time + self.quiet_period, self.burst_started + self.max_wait)
+
+    def _release(self):
+        """
+        Hand out the pending event and reset the burst state. Caller must hold the condition.
+
+        Returns:
+            CliEvent or str: The latest event of the burst.
+        """
+        event_data = self.pending_event
+        self.pending_event = None
+        self.released_trace = self.pending_trace
+        self.pending_trace = None
+        self.burst_started = None
+        self.bursts_released += 1
+        self.largest_burst = max(self.largest_burst, self.burst_size)
+        self.burst_size = 0
+        return event_data
+
+    def close(self):
+        """
+        Wake up any waiting consumer and stop releasing events.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def reset(self):
+        """
+        Reopen a closed coalescer and drop any pending event.
+        """
+        with self.condition:
+            self.closed = False
+            self.pending_event = None
+            self.pending_trace = None
+            self.released_trace = None
+            self.burst_started = None
+            self.last_event_time = None
+            self.burst_size = 0
+
+    def stats(self):
+        """
+        Return the coalescing counters.
+
+        Returns:
+            dict: Received, merged and released event counts and the largest burst seen.
+        """
+        with self.condition:
+            return {
+                'events_received': self.events_received,
+                'events_merged': self.events_merged,
+                'bursts_released': self.bursts_released,
+                'largest_burst': self.largest_burst
+            }
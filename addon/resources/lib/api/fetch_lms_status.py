@@ -1,49 +1,182 @@
-import requests
 import json
+import threading
+import time
 import resources.lib.utils.global_config as global_config
 from resources.lib.utils.log_message import log_message
 from resources.lib.utils.error_handling import log_exception
-from resources.lib.utils.network_utils import create_requests_session, is_port_open, log_network_issue
+from resources.lib.utils.network_utils import create_requests_session, log_network_issue
+from resources.lib.utils.lazy_import import LazyModule
+from resources.lib.utils.connection_health import connection_health
+from resources.lib.utils.latency_tracer import latency_tracer, STAGE_SENT, STAGE_RESPONSE
+from resources.lib.utils.trace_recorder import trace_recorder
 from resources.lib.utils.constants import (
     LMS_SERVER_KEY,
     LMS_PORT_KEY,
     LMS_PLAYER_ID_KEY,
+    LOG_LEVEL_DEBUG,
     LOG_LEVEL_INFO,
     JSON_RPC_URL_TEMPLATE,
     JSON_RPC_PAYLOAD_TEMPLATE,
+    STATUS_QUERY_PARAMS,
+    STATUS_FETCH_BUDGET,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    RETRY_COUNT,
+    BACKOFF_FACTOR,
+    STATUS_FORCE_LIST,
     CONTENT_TYPE_HEADER
 )
 
-# Create a global session object with retry logic
-requests_session = create_requests_session()
+# requests is loaded with the session, on the first HTTP request
+requests = LazyModule('requests')
 
-def fetch_lms_status():
+# Global session object, created on first use; status fetches retry themselves, within their time budget
+requests_session = None
+requests_session_lock = threading.Lock()
+
+def get_requests_session():
+    """
+    Return the shared requests session, creating it on first use.
+
+    Returns:
+        requests.Session: The session shared by status fetches and artwork downloads.
+    """
+    global requests_session
+    with requests_session_lock:
+        if requests_session is None:
+            requests_session = create_requests_session(retries=0)
+        return requests_session
+
+def close_requests_session():
+    """
+    Close the shared requests session, if it was created.
+    """
+    global requests_session
+    with requests_session_lock:
+        session, requests_session = requests_session, None
+    if session is not None:
+        session.close()
+
+class FetchResult:
+    """
+    Outcome of a status fetch.
+
+    Attributes:
+        data (dict): The status response data, or None if it could not be fetched.
+        timed_out (bool): Whether an attempt hit a deadline or the fetch ran out of budget.
+        retried (bool): Whether more than one attempt was made.
+        superseded (bool): Whether a newer event arrived, making the result obsolete.
+    """
+
+    __slots__ = ('data', 'timed_out', 'retried', 'superseded')
+
+    def __init__(self, data=None, timed_out=False, retried=False, superseded=False):
+        self.data = data
+        self.timed_out = timed_out
+        self.retried = retried
+        self.superseded = superseded
+
+    def __repr__(self):
+        return f"FetchResult(ok={self.data is not None}, timed_out={self.timed_out}, retried={self.retried}, superseded={self.superseded})"
+
+def fetch_lms_status(params=None):
     """
     Fetch the JSON data from the Logitech Media Server (LMS) using JSON-RPC.
 
-    This function makes an HTTP POST request to the LMS to retrieve the current data.
-    It handles potential errors and logs the response to the Kodi log.
+    Args:
+        params (list): Status query parameters for a custom window, or None for the default query.
 
     Returns:
         dict: A dictionary containing the JSON response data.
     """
+    return fetch_lms_status_result(params).data
+
+def fetch_lms_status_result(params=None, budget=STATUS_FETCH_BUDGET, is_superseded=None, player_id=None, server=None):
+    """
+    Fetch the JSON data from the Logitech Media Server (LMS) using JSON-RPC, within a time budget.
+
+    This function makes an HTTP POST request to the LMS to retrieve the current data.
+    Each attempt has its own connect and read deadline, and failed attempts are retried
+    with backoff only while the overall budget allows it. The fetch is abandoned as soon
+    as is_superseded() reports a newer event.
+
+    Args:
+        params (list): Status query parameters for a custom window, or None for the default query.
+        budget (float): The overall time budget in seconds, covering all attempts.
+        is_superseded (callable): Returns True if a newer event makes this fetch obsolete.
+        player_id (str): The player to query, '' for server-level queries, or None for the configured player.
+        server (LmsServer): An additional server to query, or None for the server in the settings.
+
+    Returns:
+        FetchResult: The response data and how the fetch went.
+    """
     settings = global_config.settings
-    if not is_port_open(settings[LMS_SERVER_KEY], int(settings[LMS_PORT_KEY])):
-        log_network_issue("LMS server port is not open.")
-        return None
-
-    url = construct_url(settings)
-    payload = construct_payload(settings[LMS_PLAYER_ID_KEY])
-
-    try:
-        response = send_request(url, payload)
-        data = parse_response(response)
-        log_message("New 'now playing' received", LOG_LEVEL_INFO)
-        return data
-    except (requests.RequestException, KeyError, IndexError) as e:
-        log_network_issue(f"Failed to fetch LMS status: {e}")
-        log_exception(e)
-        return None
+    result = FetchResult()
+    url = construct_url(settings) if server is None else server.url
+    health = connection_health if server is None else server.health
+    payload = construct_payload(settings[LMS_PLAYER_ID_KEY] if player_id is None else player_id, params)
+    deadline = time.monotonic() + budget
+
+    for attempt in range(RETRY_COUNT + 1):
+        if is_superseded is not None and is_superseded():
+            result.superseded = True
+            return result
+        if not health.allow_request():
+            log_network_issue(f"LMS server {url} is unreachable, skipping status request.")
+            return result
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            result.timed_out = True
+            return result
+        result.retried = attempt > 0
+
+        try:
+            latency_tracer.mark(STAGE_SENT)
+            try:
+                response = send_request(url, payload, (min(HTTP_CONNECT_TIMEOUT, remaining), min(HTTP_READ_TIMEOUT, remaining)))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                health.record_failure(e)
+                raise
+            except requests.RequestException:
+                health.record_success()  # The server answered, e.g. with an HTTP error status
+                raise
+            health.record_success()
+            latency_tracer.mark(STAGE_RESPONSE)
+            result.data = parse_response(response)
+            trace_recorder.record_response(payload["params"][1], result.data)
+            result.superseded = is_superseded is not None and is_superseded()
+            log_message("New 'now playing' received", LOG_LEVEL_DEBUG)
+            return result
+        except (requests.RequestException, KeyError, IndexError) as e:
+            log_network_issue(f"Failed to fetch LMS status: {e}")
+            log_exception(e)
+            if isinstance(e, requests.Timeout):
+                result.timed_out = True
+            if not is_retryable(e):
+                return result
+
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        if time.monotonic() + delay >= deadline:
+            result.timed_out = True
+            return result
+        time.sleep(delay)
+    return result
+
+def is_retryable(error):
+    """
+    Check whether a failed status request is worth retrying.
+
+    Args:
+        error (Exception): The error raised by the request.
+
+    Returns:
+        bool: True for connection errors, timeouts and the HTTP statuses in STATUS_FORCE_LIST.
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code in STATUS_FORCE_LIST
 
 def construct_url(settings):
     """
@@ -57,32 +190,34 @@ def construct_url(settings):
     """
     return JSON_RPC_URL_TEMPLATE.format(server=settings[LMS_SERVER_KEY], port=settings[LMS_PORT_KEY])
 
-def construct_payload(player_id):
+def construct_payload(player_id, params=None):
     """
     Construct the payload for the JSON-RPC request.
 
     Args:
         player_id (str): The LMS player ID.
+        params (list): Status query parameters, or None for the default query.
 
     Returns:
         dict: The JSON-RPC payload.
     """
     payload = JSON_RPC_PAYLOAD_TEMPLATE.copy()
-    payload["params"] = [player_id, ["status", "-", 10, "tags:adKl"]]
+    payload["params"] = [player_id, list(params or STATUS_QUERY_PARAMS)]
     return payload
 
-def send_request(url, payload):
+def send_request(url, payload, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)):
     """
     Send the HTTP POST request to the LMS.
 
     Args:
         url (str): The URL for the request.
         payload (dict): The JSON-RPC payload.
+        timeout (tuple): The connect and read timeouts in seconds.
 
     Returns:
         requests.Response: The response from the server.
     """
-    response = requests_session.post(url, json=payload, headers=CONTENT_TYPE_HEADER)
+    response = get_requests_session().post(url, json=payload, headers=CONTENT_TYPE_HEADER, timeout=timeout)
     response.raise_for_status()
     return response
 
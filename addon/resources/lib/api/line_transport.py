@@ -0,0 +1,138 @@
+"""
+Line-oriented transport for the LMS CLI.
+
+The CLI is a plain newline-terminated text protocol without telnet option negotiation,
+so lines are split straight out of a bytearray receive buffer instead of passing every
+byte through telnetlib's IAC state machine.
+"""
+
+import socket
+import selectors
+from time import monotonic
+
+# Size of the receive buffer handed to recv_into()
+RECV_BUFFER_SIZE = 65536
+
+class LineConnection:
+    """
+    Buffered, selector-driven line reader and writer over a raw TCP socket.
+
+    Exposes the subset of the telnetlib.Telnet interface used by TelnetHandler
+    (read_until, write, close, fileno), so either can be used as the CLI connection.
+    """
+
+    def __init__(self, host, port, timeout=None, recv_size=RECV_BUFFER_SIZE):
+        """
+        Connect to the CLI port.
+
+        Args:
+            host (str): The host address.
+            port (int): The port number.
+            timeout (float): The timeout for the connection attempt in seconds, or None to block.
+            recv_size (int): The size of the receive buffer in bytes.
+        """
+        self.host = host
+        self.port = port
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.settimeout(None)  # Reads wait in the selector, so recv_into never blocks
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.sock, selectors.EVENT_READ)
+        self.buffer = bytearray()
+        self.scanned = 0  # Bytes of the buffer already searched for a newline
+        self.chunk = bytearray(recv_size)
+        self.chunk_view = memoryview(self.chunk)
+        self.eof = False
+
+    def fileno(self):
+        """
+        Return the socket's file descriptor, so the connection can be passed to a selector.
+
+        Returns:
+            int: The file descriptor.
+        """
+        return self.sock.fileno()
+
+    def read_line(self, timeout=None):
+        """
+        Read one complete line, including the trailing newline.
+
+        Args:
+            timeout (float): The maximum time to wait in seconds, or None to wait indefinitely.
+
+        Returns:
+            bytes: The line, or b'' if no complete line arrived before the timeout.
+
+        Raises:
+            EOFError: If the connection was closed and no complete line is buffered.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            index = self.buffer.find(b"\n", self.scanned)
+            if index >= 0:
+                line = bytes(self.buffer[:index + 1])
+                del self.buffer[:index + 1]
+                self.scanned = 0
+                return line
+            self.scanned = len(self.buffer)  # Don't rescan what we already searched
+
+            if self.eof:
+                raise EOFError("CLI connection closed")
+
+            if deadline is None:
+                ready = self.selector.select()
+            else:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return b""
+                ready = self.selector.select(remaining)
+            if ready:
+                self.fill_buffer()
+
+    def fill_buffer(self):
+        """
+        Receive whatever is available on the socket into the line buffer.
+        """
+        received = self.sock.recv_into(self.chunk_view)
+        if received == 0:
+            self.eof = True
+            return
+        self.buffer += self.chunk_view[:received]
+
+    def read_until(self, match, timeout=None):
+        """
+        Read until a newline, for compatibility with telnetlib.Telnet.read_until().
+        Unlike telnetlib, a timeout never returns a partial line.
+
+        Args:
+            match (bytes): The terminator; only b'\\n' is supported.
+            timeout (float): The maximum time to wait in seconds, or None to wait indefinitely.
+
+        Returns:
+            bytes: The line, or b'' if no complete line arrived before the timeout.
+        """
+        if match != b"\n":
+            raise ValueError("LineConnection only supports newline-terminated reads")
+        return self.read_line(timeout)
+
+    def write(self, data):
+        """
+        Send data on the connection.
+
+        Args:
+            data (bytes): The data to send.
+        """
+        self.sock.sendall(data)
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        sock = self.sock
+        if sock is None:
+            return
+        self.sock = None
+        try:
+            self.selector.close()
+        finally:
+            sock.close()
@@ -1,13 +1,15 @@
 from resources.lib.utils.log_message import log_message
 import resources.lib.utils.global_config as global_config
 from resources.lib.utils.error_handling import log_exception
+from resources.lib.api.lms_records import StatusRecord, tracks_from_loop
+from resources.lib.utils.latency_tracer import latency_tracer, STAGE_PARSED
 from resources.lib.utils.constants import (
     LMS_SERVER_KEY,
     LMS_PORT_KEY,
+    LOG_LEVEL_DEBUG,
     LOG_LEVEL_ERROR,
     LMS_RESULT_KEY,
-    LMS_PLAYLIST_LOOP_KEY,
-    LMS_TIME_KEY
+    LMS_PLAYLIST_LOOP_KEY
 )
 
 def get_now_playing(data):
@@ -18,29 +20,34 @@ def get_now_playing(data):
         data (dict): The JSON response data.
     
     Returns:
-        dict: A dictionary containing the organized 'now playing' information.
+        StatusRecord: The player status and current track, or None if nothing is playing.
     """
-    settings = global_config.settings
-    
     try:
-        track_info = data[LMS_RESULT_KEY][LMS_PLAYLIST_LOOP_KEY][0]
-        now_playing = {
-            'title': track_info['title'],
-            'artist': track_info['artist'],
-            'album': track_info['album'],
-            'duration': track_info['duration'],
-            'time': data[LMS_RESULT_KEY][LMS_TIME_KEY],
-            'artwork_url': f"http://{settings[LMS_SERVER_KEY]}:{settings[LMS_PORT_KEY]}{track_info['artwork_url']}"
-        }
+        now_playing = StatusRecord.from_result(data[LMS_RESULT_KEY], get_server_url(global_config.settings))
+        if now_playing is None:
+            raise IndexError("playlist is empty")
+        latency_tracer.mark(STAGE_PARSED)
         
-        log_message("Processed 'now playing' data")
+        log_message("Processed 'now playing' data", LOG_LEVEL_DEBUG)
 
         return now_playing
-    except (KeyError, IndexError) as e:
+    except (KeyError, IndexError, TypeError) as e:
         log_message(f"Error processing now playing data: {e}", LOG_LEVEL_ERROR)
         log_exception(e)
         return None
 
+def get_server_url(settings):
+    """
+    Build the base URL of the LMS web server.
+
+    Args:
+        settings (dict): The settings dictionary containing LMS server details.
+
+    Returns:
+        str: The base URL, e.g. 'http://192.168.1.2:9000'.
+    """
+    return f"http://{settings[LMS_SERVER_KEY]}:{settings[LMS_PORT_KEY]}"
+
 def get_playlist(data):
     """
     Organizes the playlist data from the JSON response.
@@ -49,25 +56,15 @@ def get_playlist(data):
         data (dict): The JSON response data.
     
     Returns:
-        list: A list of dictionaries containing organized playlist information.
+        list: A TrackRecord for each playlist entry.
     """
     try:
-        playlist_loop = data[LMS_RESULT_KEY][LMS_PLAYLIST_LOOP_KEY]
-        playlist = [
-            {
-                'title': item['title'],
-                'artist': item['artist'],
-                'album': item['album'],
-                'duration': item['duration']
-            }
-            for item in playlist_loop
-        ]
+        playlist = tracks_from_loop(data[LMS_RESULT_KEY][LMS_PLAYLIST_LOOP_KEY], get_server_url(global_config.settings))
 
-        log_message("Processed 'playlist' data")
+        log_message("Processed 'playlist' data", LOG_LEVEL_DEBUG)
 
         return playlist
-    except (KeyError, IndexError) as e:
+    except (KeyError, IndexError, TypeError) as e:
         log_message(f"Error processing playlist data: {e}", LOG_LEVEL_ERROR)
         log_exception(e)
         return []
-
@@ -0,0 +1,168 @@
+"""
+Compact records for the track and player status data shown by the addon.
+
+Records are built in one pass straight from the decoded status response and use
+__slots__, so each one holds its fields in fixed slots instead of a per-instance
+dict with repeated string keys.
+"""
+
+from resources.lib.utils.constants import (
+    LMS_ARTWORK_URL_KEY,
+    LMS_COVER_ID_KEY,
+    LMS_COVER_PATH_TEMPLATE,
+    LMS_DURATION_KEY,
+    LMS_MODE_KEY,
+    LMS_PLAYLIST_INDEX_KEY,
+    LMS_PLAYLIST_LOOP_KEY,
+    LMS_RATE_KEY,
+    LMS_TIME_KEY,
+    LMS_TRACK_ID_KEY,
+    STATUS_RECEIVED_AT_KEY
+)
+
+class TrackRecord:
+    """
+    One playlist entry.
+
+    Attributes:
+        id (int): The LMS track ID, or None for entries without one.
+        playlist_index (int): The position in the playlist.
+        title (str): The track title.
+        artist (str): The artist.
+        album (str): The album.
+        duration (float): The duration in seconds, or 0 if unknown.
+        cover_id (str): The LMS cover ID, or None.
+        artwork_url (str): The absolute artwork URL, or None if the track has no artwork.
+    """
+
+    __slots__ = ('id', 'playlist_index', 'title', 'artist', 'album', 'duration', 'cover_id', 'artwork_url')
+
+    def __init__(self, id, playlist_index, title, artist, album, duration, cover_id, artwork_url):
+        self.id = id
+        self.playlist_index = playlist_index
+        self.title = title
+        self.artist = artist
+        self.album = album
+        self.duration = duration
+        self.cover_id = cover_id
+        self.artwork_url = artwork_url
+
+    @classmethod
+    def from_item(cls, item, server_url):
+        """
+        Build a record from a playlist_loop entry.
+
+        Args:
+            item (dict): The playlist_loop entry.
+            server_url (str): The LMS base URL, e.g. 'http://192.168.1.2:9000'.
+
+        Returns:
+            TrackRecord: The record.
+        """
+        get = item.get
+        return cls(
+            get(LMS_TRACK_ID_KEY),
+            get(LMS_PLAYLIST_INDEX_KEY),
+            get('title', ''),
+            get('artist', ''),
+            get('album', ''),
+            get(LMS_DURATION_KEY) or 0,
+            get(LMS_COVER_ID_KEY),
+            resolve_artwork_url(get(LMS_ARTWORK_URL_KEY), get(LMS_COVER_ID_KEY), server_url)
+        )
+
+    def __repr__(self):
+        return f"TrackRecord({self.playlist_index!r}, {self.id!r}, {self.title!r})"
+
+class StatusRecord:
+    """
+    The player status needed by the 'now playing' display.
+
+    Attributes:
+        track (TrackRecord): The current track.
+        mode (str): The player mode: 'play', 'pause' or 'stop'.
+        time (float): The elapsed time in seconds reported by LMS.
+        rate (float): The playback rate.
+        received_at (float): The monotonic time the elapsed time was received, or None if it is fresh.
+    """
+
+    __slots__ = ('track', 'mode', 'time', 'rate', 'received_at')
+
+    def __init__(self, track, mode, time, rate, received_at):
+        self.track = track
+        self.mode = mode
+        self.time = time
+        self.rate = rate
+        self.received_at = received_at
+
+    @classmethod
+    def from_result(cls, result, server_url):
+        """
+        Build a record from the 'result' part of a status response.
+
+        Args:
+            result (dict): The status result.
+            server_url (str): The LMS base URL.
+
+        Returns:
+            StatusRecord: The record, or None if the playlist is empty.
+
+        Raises:
+            KeyError: If the result has no elapsed time.
+        """
+        playlist_loop = result.get(LMS_PLAYLIST_LOOP_KEY)
+        if not playlist_loop:
+            return None
+        return cls(
+            TrackRecord.from_item(playlist_loop[0], server_url),
+            result.get(LMS_MODE_KEY),
+            result[LMS_TIME_KEY],
+            result.get(LMS_RATE_KEY, 1),
+            result.get(STATUS_RECEIVED_AT_KEY)
+        )
+
+    @property
+    def duration(self):
+        """
+        The duration of the current track in seconds, or 0 if unknown.
+        """
+        return self.track.duration
+
+    def __repr__(self):
+        return f"StatusRecord({self.mode!r}, {self.time!r}, {self.track!r})"
+
+def resolve_artwork_url(artwork_url, cover_id, server_url):
+    """
+    Build the absolute artwork URL for a track.
+
+    Args:
+        artwork_url (str): The artwork URL reported by LMS, absolute or relative to the server.
+        cover_id (str): The LMS cover ID, used when no artwork URL is reported.
+        server_url (str): The LMS base URL.
+
+    Returns:
+        str: The artwork URL, or None if the track has no artwork.
+    """
+    if not artwork_url:
+        if not cover_id:
+            return None
+        artwork_url = LMS_COVER_PATH_TEMPLATE.format(cover_id=cover_id)
+    if artwork_url.startswith(('http://', 'https://')):
+        return artwork_url  # Remote artwork, e.g. from a streaming service
+    if not artwork_url.startswith('/'):
+        artwork_url = '/' + artwork_url
+    return server_url + artwork_url
+
+def tracks_from_loop(playlist_loop, server_url):
+    """
+    Build track records for all entries of a playlist_loop.
+
+    Args:
+        playlist_loop (list): The playlist_loop entries.
+        server_url (str): The LMS base URL.
+
+    Returns:
+        list: The TrackRecord for each entry.
+    """
+    from_item = TrackRecord.from_item
+    return [from_item(item, server_url) for item in playlist_loop]
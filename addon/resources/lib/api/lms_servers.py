@@ -0,0 +1,168 @@
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.connection_health import ConnectionHealth
+from resources.lib.utils.read_settings import get_int_setting
+from resources.lib.api.telnet_handler import TelnetHandler
+from resources.lib.api.player_tracker import PlayerTracker
+from resources.lib.api.worker_pool import worker_pool
+from resources.lib.utils.constants import (
+    DEFAULT_LMS_PORT,
+    DEFAULT_LMS_TELNET_PORT,
+    JSON_RPC_URL_TEMPLATE,
+    LMS_EXTRA_SERVERS_KEY,
+    LMS_PORT_KEY,
+    LMS_SERVER_KEY,
+    LMS_TELNET_PORT_KEY,
+    LOG_LEVEL_INFO,
+    LOG_LEVEL_WARNING,
+    MAX_EXTRA_SERVERS
+)
+
+class LmsServer:
+    """
+    One LMS instance the addon connects to, besides the one in the General settings.
+
+    Attributes:
+        host (str): The server address.
+        http_port (int): The HTTP (JSON-RPC) port.
+        cli_port (int): The CLI port.
+        health (ConnectionHealth): The server's own circuit breaker.
+    """
+
+    __slots__ = ('host', 'http_port', 'cli_port', 'health')
+
+    def __init__(self, host, http_port, cli_port):
+        self.host = host
+        self.http_port = http_port
+        self.cli_port = cli_port
+        self.health = ConnectionHealth()
+
+    @property
+    def name(self):
+        """
+        The server address and CLI port, as shown in the log and on the dashboard.
+        """
+        return f"{self.host}:{self.cli_port}"
+
+    @property
+    def url(self):
+        """
+        The JSON-RPC URL of the server.
+        """
+        return JSON_RPC_URL_TEMPLATE.format(server=self.host, port=self.http_port)
+
+    def __repr__(self):
+        return f"LmsServer({self.host!r}, {self.http_port!r}, {self.cli_port!r})"
+
+def parse_server_list(value, http_port=DEFAULT_LMS_PORT, cli_port=DEFAULT_LMS_TELNET_PORT):
+    """
+    Parse the additional servers setting.
+
+    Args:
+        value (str): Comma-separated 'host[:port[:telnet port]]' entries.
+        http_port (int): The HTTP port for entries without one.
+        cli_port (int): The CLI port for entries without one.
+
+    Returns:
+        list: An LmsServer for each valid entry, without duplicates, at most MAX_EXTRA_SERVERS.
+    """
+    servers = []
+    seen = set()
+    for entry in (value or '').replace(';', ',').split(','):
+        parts = entry.strip().split(':')
+        if not parts[0] or len(parts) > 3:
+            if entry.strip():
+                log_message(f"Ignoring invalid server entry '{entry.strip()}'.", LOG_LEVEL_WARNING)
+            continue
+        try:
+            ports = [int(part) for part in parts[1:]]
+        except ValueError:
+            log_message(f"Ignoring invalid server entry '{entry.strip()}'.", LOG_LEVEL_WARNING)
+            continue
+        ports += [http_port, cli_port][len(ports):]
+        if (parts[0], ports[1]) in seen:
+            continue
+        seen.add((parts[0], ports[1]))
+        servers.append(LmsServer(parts[0], ports[0], ports[1]))
+
+    if len(servers) > MAX_EXTRA_SERVERS:
+        log_message(f"Following only the first {MAX_EXTRA_SERVERS} additional servers.", LOG_LEVEL_WARNING)
+    return servers[:MAX_EXTRA_SERVERS]
+
+class ServerManager:
+    """
+    Runs the additional servers shown on the dashboard.
+
+    Each server gets its own TelnetHandler, with its own connection, subscription,
+    circuit breaker, reconnect backoff and counters, and its own PlayerTracker. The
+    trackers of all servers refresh on the shared worker pool and send their HTTP
+    requests through the shared requests session, so the thread and socket count stays
+    bounded, and a server that is slow or down only delays its own rows.
+    """
+
+    def __init__(self):
+        self.servers = []  # (LmsServer, TelnetHandler, PlayerTracker) of each additional server
+
+    def start(self, settings):
+        """
+        Connect to the additional servers in the settings.
+
+        Args:
+            settings (dict): The addon settings.
+        """
+        main_server = (settings.get(LMS_SERVER_KEY), get_int_setting(settings, LMS_TELNET_PORT_KEY, DEFAULT_LMS_TELNET_PORT))
+        servers = parse_server_list(
+            settings.get(LMS_EXTRA_SERVERS_KEY),
+            get_int_setting(settings, LMS_PORT_KEY, DEFAULT_LMS_PORT),
+            main_server[1]
+        )
+        for server in servers:
+            if (server.host, server.cli_port) == main_server:
+                continue  # Already followed as the main server
+            handler = TelnetHandler(server)
+            tracker = PlayerTracker()
+            handler.player_tracker = tracker
+            handler.start_telnet_subscriber()  # Connects in the background
+            tracker.start(handler)
+            self.servers.append((server, handler, tracker))
+        if self.servers:
+            log_message(f"Following {len(self.servers)} additional servers.", LOG_LEVEL_INFO)
+
+    def trackers(self):
+        """
+        Return the player trackers of the additional servers.
+
+        Returns:
+            list: The PlayerTracker of each server.
+        """
+        return [tracker for _, _, tracker in self.servers]
+
+    def stats(self):
+        """
+        Return the health and counters of each additional server.
+
+        Returns:
+            dict: The stats of each server, keyed by server name.
+        """
+        return {
+            server.name: {
+                'health': server.health.stats(),
+                'reconnects': handler.get_reconnect_stats(),
+                'players': tracker.stats(),
+                'worker': worker_pool.stats(tracker),
+            }
+            for server, handler, tracker in self.servers
+        }
+
+    def stop(self):
+        """
+        Stop refreshing and close the connections of all additional servers.
+        """
+        for _, handler, tracker in self.servers:
+            tracker.stop()
+            handler.close_telnet_connection()
+        for name, stats in self.stats().items():
+            log_message(f"Server {name} stats: {stats}", LOG_LEVEL_INFO)
+        self.servers = []
+
+# Instantiate the ServerManager class
+server_manager = ServerManager()
@@ -0,0 +1,341 @@
+import threading
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.error_handling import log_exception
+from resources.lib.api.event_coalescer import EventCoalescer
+from resources.lib.api.status_model import StatusModel
+from resources.lib.api.fetch_lms_status import fetch_lms_status_result
+from resources.lib.api.worker_pool import worker_pool
+from resources.lib.utils.constants import (
+    DASHBOARD_EVENT_COMMANDS,
+    DASHBOARD_STATUS_PARAMS,
+    LMS_MODE_KEY,
+    LMS_PLAYER_CONNECTED_KEY,
+    LMS_PLAYER_NAME_KEY,
+    LMS_PLAYERS_LOOP_KEY,
+    LMS_POWER_KEY,
+    LMS_RESULT_KEY,
+    LOG_LEVEL_DEBUG,
+    LOG_LEVEL_ERROR,
+    LOG_LEVEL_INFO,
+    PLAYBACK_MODE_PLAY,
+    PLAYER_LIST_EVENT_COMMANDS,
+    SERVERSTATUS_PARAMS
+)
+
+def to_flag(value, default=False):
+    """
+    Convert a 0/1 flag from a JSON-RPC or CLI response to a bool.
+
+    Args:
+        value: The flag, as a number or a string, or None if it is missing.
+        default (bool): The value to use when the flag is missing or invalid.
+
+    Returns:
+        bool: The flag.
+    """
+    try:
+        return bool(int(value))
+    except (TypeError, ValueError):
+        return default
+
+class PlayerEntry:
+    """
+    One player of the server, its status model and the fields shown on the dashboard.
+
+    Attributes:
+        player_id (str): The lowercase player ID.
+        name (str): The player name.
+        connected (bool): Whether the player is connected to the server.
+        power (bool): Whether the player is switched on.
+        mode (str): The player mode: 'play', 'pause' or 'stop'.
+        title (str): The title of the current track.
+        artist (str): The artist of the current track.
+        album (str): The album of the current track.
+        model (StatusModel): The player status, kept current by the tracker.
+    """
+
+    __slots__ = ('player_id', 'name', 'connected', 'power', 'mode', 'title', 'artist', 'album', 'model')
+
+    def __init__(self, player_id, name):
+        self.player_id = player_id
+        self.name = name
+        self.connected = False
+        self.power = False
+        self.mode = None
+        self.title = ''
+        self.artist = ''
+        self.album = ''
+        self.model = StatusModel()
+
+    def row_fields(self):
+        """
+        Return the fields shown in the player's dashboard row.
+
+        Returns:
+            tuple: The name, connection, power, mode, title, artist and album.
+        """
+        return (self.name, self.connected, self.power, self.mode, self.title, self.artist, self.album)
+
+    def apply_status(self, lms_data):
+        """
+        Apply a status response to the model and update the row fields from it.
+
+        Args:
+            lms_data (dict): The player status in the JSON-RPC response layout.
+
+        Returns:
+            bool: True if a field shown in the row changed, False otherwise.
+        """
+        before = self.row_fields()
+        self.model.apply(lms_data)
+        with self.model.lock:
+            status = self.model.status
+            track = self.model.playlist[0] if self.model.playlist else {}
+            self.name = status.get(LMS_PLAYER_NAME_KEY) or self.name
+            self.connected = to_flag(status.get(LMS_PLAYER_CONNECTED_KEY), self.connected)
+            self.power = to_flag(status.get(LMS_POWER_KEY), self.power)
+            self.mode = status.get(LMS_MODE_KEY)
+            self.title = track.get('title', '')
+            self.artist = track.get('artist', '')
+            self.album = track.get('album', '')
+        return self.row_fields() != before
+
+    def __repr__(self):
+        return f"PlayerEntry({self.player_id!r}, {self.name!r}, {self.mode!r}, {self.title!r})"
+
+class PlayerTracker:
+    """
+    Follows every player of a server over the CLI subscription the addon already holds.
+
+    The subscriber hands each notification to on_event(), which only marks the player
+    as changed and (re)schedules a refresh on the shared worker pool for when the burst
+    of notifications settles. The refresh queries all changed players in one batch, so
+    neither the number of threads nor the number of round trips grows with the number
+    of players or servers. The player list itself comes from one serverstatus request,
+    repeated only when players join or leave.
+    """
+
+    def __init__(self):
+        self.handler = None
+        self.name = None  # The server name, set by start()
+        self.lock = threading.Lock()
+        self.players = {}  # Lowercase player ID -> PlayerEntry
+        self.dirty = set()  # Players with notifications since the last refresh
+        self.list_changed = False  # Players joined or left since the last refresh
+        self.coalescer = EventCoalescer()  # Only computes when a burst settles; the pool does the waiting
+        self.active = False
+        self.update_callback = None
+        self.counts = {'events': 0, 'list_reloads': 0, 'batches': 0, 'players_queried': 0, 'rows_changed': 0}
+
+    def set_update_callback(self, callback):
+        """
+        Set the function called with the IDs of the players whose rows changed.
+        It is called with None when the player list itself changed.
+
+        Args:
+            callback (function): The callback function to set.
+        """
+        self.update_callback = callback
+
+    def start(self, handler):
+        """
+        Start following the players of the handler's server, beginning with a full snapshot on the worker pool.
+
+        Args:
+            handler (TelnetHandler): The handler whose connection carries the subscription and the queries.
+        """
+        self.handler = handler
+        self.name = handler.get_server_name()
+        self.coalescer.reset()
+        self.coalescer.quiet_period = handler.coalescer.quiet_period
+        self.coalescer.max_wait = handler.coalescer.max_wait
+        with self.lock:
+            self.list_changed = True
+        self.active = True
+        worker_pool.start()
+        worker_pool.submit(self, self.run_refresh)
+
+    def stop(self):
+        """
+        Stop refreshing. A refresh that is already running finishes in the background.
+        """
+        self.active = False
+        self.coalescer.close()
+
+    def on_connected(self):
+        """
+        Reload the player list after the subscription is (re)established, as notifications may have been missed.
+        """
+        with self.lock:
+            self.list_changed = True
+        if self.active:
+            worker_pool.submit(self, self.run_refresh)
+
+    def on_event(self, event):
+        """
+        Mark the player of a notification as changed. Called by the subscriber for every line.
+
+        Args:
+            event (CliEvent): The parsed notification.
+
+        Returns:
+            bool: True if the notification changes a dashboard row, False otherwise.
+        """
+        if event.command not in DASHBOARD_EVENT_COMMANDS or event.raw_player_id is None:
+            return False
+        player_id = event.player_id.lower()
+        with self.lock:
+            self.counts['events'] += 1
+            if event.command in PLAYER_LIST_EVENT_COMMANDS or player_id not in self.players:
+                self.list_changed = True
+            else:
+                self.dirty.add(player_id)
+        self.coalescer.push(player_id)
+        if self.active:
+            worker_pool.schedule(self, self.coalescer.release_deadline(), self.run_refresh)
+        return True
+
+    def run_refresh(self):
+        """
+        Worker pool task: reload the player list if it changed, otherwise refresh the changed players.
+        The pool runs at most one refresh per tracker at a time.
+        """
+        if not self.active:
+            return
+        self.coalescer.take()  # Ends the burst; notifications from now on start a new one
+        with self.lock:
+            player_ids, self.dirty = self.dirty, set()
+            reload_list, self.list_changed = self.list_changed, False
+        if reload_list:
+            self.refresh_all()
+        elif player_ids:
+            self.refresh(player_ids)
+
+    def refresh_all(self):
+        """
+        Reload the player list with one serverstatus request and refresh every player.
+        """
+        if not self.load_players():
+            return
+        with self.lock:
+            player_ids = list(self.players)
+        self.refresh(player_ids, notify=False)
+        self.notify(None)
+
+    def load_players(self):
+        """
+        Reload the player list with one serverstatus request, keeping the state of known players.
+
+        Returns:
+            bool: True if the list was loaded, False if the request failed.
+        """
+        lms_data = fetch_lms_status_result(SERVERSTATUS_PARAMS, player_id='', server=self.handler.server).data
+        if lms_data is None or LMS_RESULT_KEY not in lms_data:
+            log_message(f"Could not load the player list of {self.name}.", LOG_LEVEL_ERROR)
+            with self.lock:
+                self.list_changed = True  # Try again with the next notification
+            return False
+
+        players = {}
+        with self.lock:
+            for item in lms_data[LMS_RESULT_KEY].get(LMS_PLAYERS_LOOP_KEY, []):
+                player_id = str(item.get('playerid', '')).lower()
+                if not player_id:
+                    continue
+                entry = self.players.get(player_id) or PlayerEntry(player_id, item.get('name', player_id))
+                entry.name = item.get('name', entry.name)
+                entry.connected = to_flag(item.get('connected'), entry.connected)
+                entry.power = to_flag(item.get(LMS_POWER_KEY), entry.power)
+                players[player_id] = entry
+            self.players = players
+            self.counts['list_reloads'] += 1
+        log_message(f"Following {len(players)} players on {self.name}.", LOG_LEVEL_INFO)
+        return True
+
+    def refresh(self, player_ids, notify=True):
+        """
+        Query the status of the given players in one batch and apply it to their models.
+
+        Args:
+            player_ids (iterable): The IDs of the players to refresh.
+            notify (bool): Whether to pass the changed rows to the update callback.
+
+        Returns:
+            set: The IDs of the players whose rows changed.
+        """
+        with self.lock:
+            entries = [self.players[player_id] for player_id in sorted(player_ids) if player_id in self.players]
+        if not entries:
+            return set()
+
+        results = self.handler.query_player_statuses([entry.player_id for entry in entries], DASHBOARD_STATUS_PARAMS)
+        changed = {entry.player_id for entry in entries
+                   if results.get(entry.player_id) is not None and entry.apply_status(results[entry.player_id])}
+        with self.lock:
+            self.counts['batches'] += 1
+            self.counts['players_queried'] += len(entries)
+            self.counts['rows_changed'] += len(changed)
+        log_message("Refreshed %d players, %d rows changed", LOG_LEVEL_DEBUG, len(entries), len(changed))
+        if notify and changed:
+            self.notify(changed)
+        return changed
+
+    def notify(self, player_ids):
+        """
+        Pass changed rows to the update callback, if it is set.
+
+        Args:
+            player_ids (set): The IDs of the players whose rows changed, or None if the list changed.
+        """
+        if self.update_callback:
+            try:
+                self.update_callback(player_ids)
+            except Exception as e:
+                log_message(f"Error in dashboard update callback: {e}", LOG_LEVEL_ERROR)
+                log_exception(e)
+
+    def get_players(self):
+        """
+        Return the tracked players, sorted by name.
+
+        Returns:
+            list: The PlayerEntry of each player.
+        """
+        with self.lock:
+            return sorted(self.players.values(), key=lambda entry: (entry.name.lower(), entry.player_id))
+
+    def get_player(self, player_id):
+        """
+        Return a tracked player.
+
+        Args:
+            player_id (str): The player ID.
+
+        Returns:
+            PlayerEntry: The player, or None if it is not tracked.
+        """
+        with self.lock:
+            return self.players.get(str(player_id).lower())
+
+    def count_playing(self):
+        """
+        Return the number of players that are playing.
+
+        Returns:
+            int: The number of tracked players in play mode.
+        """
+        with self.lock:
+            return sum(1 for entry in self.players.values() if entry.mode == PLAYBACK_MODE_PLAY)
+
+    def stats(self):
+        """
+        Return the tracking counters.
+
+        Returns:
+            dict: The number of players, events routed, list reloads, query batches, players queried and rows changed.
+        """
+        with self.lock:
+            return dict(self.counts, players=len(self.players))
+
+# Instantiate the PlayerTracker class
+player_tracker = PlayerTracker()
@@ -0,0 +1,356 @@
+import json
+import os
+import socket
+import threading
+import time
+import resources.lib.utils.global_config as global_config
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.error_handling import log_exception
+from resources.lib.utils.lazy_import import LazyModule
+from resources.lib.api.fetch_lms_status import construct_payload, parse_response, send_request
+from resources.lib.utils.constants import (
+    DISCOVERY_ADDRESS,
+    DISCOVERY_CACHE_FILE,
+    DISCOVERY_CACHE_TTL,
+    DISCOVERY_MIN_INTERVAL,
+    DISCOVERY_PORT,
+    DISCOVERY_REQUEST_TAGS,
+    DISCOVERY_TIMEOUT,
+    JSON_RPC_URL_TEMPLATE,
+    LMS_DISCOVERY_KEY,
+    LMS_PLAYER_ID_KEY,
+    LMS_PLAYERS_LOOP_KEY,
+    LMS_PORT_KEY,
+    LMS_SERVER_KEY,
+    LMS_RESULT_KEY,
+    LMS_TELNET_PORT_KEY,
+    LOG_LEVEL_DEBUG,
+    LOG_LEVEL_ERROR,
+    LOG_LEVEL_INFO,
+    LOG_LEVEL_WARNING,
+    SERVERSTATUS_PARAMS
+)
+
+# Loaded with the shared session, when a discovery has to ask the servers for their players
+requests = LazyModule('requests')
+
+def build_discovery_request(tags=DISCOVERY_REQUEST_TAGS):
+    """
+    Build a discovery request asking for the given tags.
+
+    Args:
+        tags (tuple): The four-byte tags wanted in the reply.
+
+    Returns:
+        bytes: The request datagram.
+    """
+    return b'e' + b''.join(tag + b'\x00' for tag in tags)
+
+def parse_discovery_response(data, sender):
+    """
+    Parse a discovery reply.
+
+    Args:
+        data (bytes): The reply datagram.
+        sender (tuple): The address and port the reply came from.
+
+    Returns:
+        dict: The server name, host, HTTP port, CLI port (None if not reported) and UUID,
+              or None if the datagram is not a valid reply.
+    """
+    if not data.startswith(b'E'):
+        return None
+    fields = {}
+    offset = 1
+    while offset + 5 <= len(data):
+        tag = data[offset:offset + 4]
+        length = data[offset + 4]
+        value = data[offset + 5:offset + 5 + length]
+        if len(value) < length:
+            break  # Truncated reply
+        fields[tag] = value.decode('utf-8', 'replace')
+        offset += 5 + length
+
+    try:
+        http_port = int(fields[b'JSON'])
+        cli_port = int(fields[b'CLIP']) if fields.get(b'CLIP') else None
+    except (KeyError, ValueError):
+        return None
+    host = fields.get(b'IPAD') or sender[0]
+    return {
+        'name': fields.get(b'NAME', host),
+        'host': host,
+        'http_port': http_port,
+        'cli_port': cli_port,
+        'uuid': fields.get(b'UUID')
+    }
+
+def discover_servers(address=DISCOVERY_ADDRESS, port=DISCOVERY_PORT, timeout=DISCOVERY_TIMEOUT, wanted=None):
+    """
+    Broadcast a discovery request and collect the replies.
+
+    Args:
+        address (str): The broadcast address, or the address of a single server.
+        port (int): The discovery port.
+        timeout (float): Seconds to wait for replies.
+        wanted (function): Called with each server found; collecting stops early when it returns True.
+
+    Returns:
+        list: The servers found, in the order they replied, without duplicates.
+    """
+    servers = []
+    seen = set()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.sendto(build_discovery_request(), (address, port))
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
+            try:
+                data, sender = sock.recvfrom(1024)
+            except socket.timeout:
+                break
+            server = parse_discovery_response(data, sender)
+            if server is None or (server['host'], server['http_port']) in seen:
+                continue
+            seen.add((server['host'], server['http_port']))
+            servers.append(server)
+            if wanted is not None and wanted(server):
+                break
+    finally:
+        sock.close()
+    return servers
+
+class ServerDiscovery:
+    """
+    Finds the LMS server on the local network when the configured address stops answering.
+
+    The server found last is cached in the addon profile together with the address it
+    replaced, so later starts connect to it at once without waiting for a broadcast.
+    Discovery itself only runs, in the background, after a connection attempt failed,
+    and at most once per DISCOVERY_MIN_INTERVAL. The cache is ignored once it is older
+    than DISCOVERY_CACHE_TTL, or when the configured address has been changed since.
+
+    With several servers on the network (e.g. one per zone), discovery only switches
+    when the choice is unambiguous: the server in use before, the configured host, the
+    only server that replied, or the only one that knows the configured player.
+    Otherwise it logs the candidates and keeps the configured address.
+    """
+
+    def __init__(self):
+        self.address = DISCOVERY_ADDRESS
+        self.port = DISCOVERY_PORT
+        self.timeout = DISCOVERY_TIMEOUT
+        self.lock = threading.Lock()
+        self.enabled = False
+        self.cache_path = None
+        self.configured = None  # Server address and ports from the settings, as stored in the cache
+        self.current = None  # The server in use, or None for the configured one
+        self.on_found = None
+        self.thread = None
+        self.last_started = None
+        self.counts = {'cache_hits': 0, 'discoveries': 0, 'servers_found': 0, 'address_changes': 0, 'ambiguous': 0}
+
+    def start(self, settings, cache_dir, on_found=None):
+        """
+        Apply the cached server to the settings, if there is a valid one, and enable discovery.
+
+        Args:
+            settings (dict): The addon settings; the server address and ports are updated in place.
+            cache_dir (str): The directory of the cache file.
+            on_found (function): Called when discovery changed the server address.
+        """
+        self.enabled = settings.get(LMS_DISCOVERY_KEY) != 'false'
+        self.cache_path = os.path.join(cache_dir, DISCOVERY_CACHE_FILE)
+        self.configured = [settings.get(LMS_SERVER_KEY), str(settings.get(LMS_PORT_KEY)), str(settings.get(LMS_TELNET_PORT_KEY))]
+        self.on_found = on_found
+        self.current = None
+        if not self.enabled:
+            return
+
+        server = self.load_cache()
+        if server is not None:
+            self.counts['cache_hits'] += 1
+            self.apply(settings, server)
+            log_message(f"Using server {server['name']} at {server['host']} found earlier.", LOG_LEVEL_INFO)
+
+    def load_cache(self):
+        """
+        Read the cached server.
+
+        Returns:
+            dict: The cached server, or None if there is none, it expired or the settings changed since.
+        """
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(stored, dict) or stored.get('configured') != self.configured:
+            return None
+        if not 0 <= time.time() - stored.get('saved_at', 0) < DISCOVERY_CACHE_TTL:
+            return None
+        return stored.get('server')
+
+    def save_cache(self, server):
+        """
+        Write the server to the cache atomically.
+
+        Args:
+            server (dict): The server found.
+        """
+        temp_path = self.cache_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'saved_at': time.time(), 'configured': self.configured, 'server': server}, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            log_message(f"Failed to save the discovered server: {e}", LOG_LEVEL_WARNING)
+
+    def apply(self, settings, server):
+        """
+        Point the settings at a server.
+
+        Args:
+            settings (dict): The addon settings.
+            server (dict): The server to use.
+
+        Returns:
+            bool: True if the address or a port changed, False otherwise.
+        """
+        values = {
+            LMS_SERVER_KEY: server['host'],
+            LMS_PORT_KEY: str(server['http_port']),
+            LMS_TELNET_PORT_KEY: str(server['cli_port'] or settings.get(LMS_TELNET_PORT_KEY))  # Older servers do not report it
+        }
+        changed = any(str(settings.get(key)) != value for key, value in values.items())
+        settings.update(values)
+        self.current = server
+        return changed
+
+    def on_connect_failed(self):
+        """
+        Start a discovery in the background, unless discovery is disabled or ran recently.
+        Called when a connection attempt to the configured server failed.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if not self.enabled or (self.thread is not None and self.thread.is_alive()):
+                return
+            if self.last_started is not None and now - self.last_started < DISCOVERY_MIN_INTERVAL:
+                return
+            self.last_started = now
+            self.thread = threading.Thread(target=self.run_discovery, name="lms-discovery")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def run_discovery(self):
+        """
+        Discovery thread: find the servers, switch to the best match and cache it.
+        """
+        settings = global_config.settings
+        previous = self.current or {}
+        self.counts['discoveries'] += 1
+        try:
+            servers = discover_servers(self.address, self.port, self.timeout, wanted=lambda server: self.is_preferred(server, previous))
+        except OSError as e:
+            log_message(f"Server discovery failed: {e}", LOG_LEVEL_ERROR)
+            log_exception(e)
+            return
+        self.counts['servers_found'] += len(servers)
+        log_message("Discovery found %d servers", LOG_LEVEL_DEBUG, len(servers))
+        if not servers:
+            log_message("No LMS server answered the discovery request.", LOG_LEVEL_WARNING)
+            return
+
+        server = self.choose(servers, previous, settings.get(LMS_PLAYER_ID_KEY))
+        if server is None:
+            self.counts['ambiguous'] += 1
+            candidates = ', '.join(f"{server['name']} at {server['host']}" for server in servers)
+            log_message(f"Found {len(servers)} LMS servers ({candidates}) and none is known to serve the configured player; "
+                        "keeping the configured address.", LOG_LEVEL_WARNING)
+            return
+        if len(servers) > 1:
+            log_message(f"Found {len(servers)} LMS servers, using {server['name']} at {server['host']}.", LOG_LEVEL_INFO)
+        self.save_cache(server)
+        if not self.apply(settings, server):
+            return
+        self.counts['address_changes'] += 1
+        log_message(f"Found LMS server {server['name']} at {server['host']}:{server['http_port']}.", LOG_LEVEL_INFO)
+        if self.on_found is not None:
+            self.on_found()
+
+    def choose(self, servers, previous, player_id):
+        """
+        Pick the server to switch to, if the choice is unambiguous.
+
+        Args:
+            servers (list): The servers found, in the order they replied.
+            previous (dict): The server in use before, or an empty dict.
+            player_id (str): The configured player ID.
+
+        Returns:
+            dict: The server to use, or None if none can be chosen safely.
+        """
+        server = next((server for server in servers if self.is_preferred(server, previous)), None)
+        if server is not None:
+            return server
+        if len(servers) == 1:
+            return servers[0]
+        if not player_id:
+            return None
+        serving = [server for server in servers if self.serves_player(server, player_id)]
+        return serving[0] if len(serving) == 1 else None
+
+    def serves_player(self, server, player_id):
+        """
+        Ask a server, with a serverstatus request, whether the player is connected to it.
+
+        Args:
+            server (dict): A server found.
+            player_id (str): The player ID.
+
+        Returns:
+            bool: True if the server lists the player, False if it does not or did not answer.
+        """
+        url = JSON_RPC_URL_TEMPLATE.format(server=server['host'], port=server['http_port'])
+        try:
+            data = parse_response(send_request(url, construct_payload('', SERVERSTATUS_PARAMS), (self.timeout, self.timeout)))
+            players = data[LMS_RESULT_KEY].get(LMS_PLAYERS_LOOP_KEY) or []
+        except (requests.RequestException, ValueError, KeyError, TypeError, AttributeError) as e:
+            log_message("Could not ask %s for its players: %s", LOG_LEVEL_DEBUG, server['host'], e)
+            return False
+        player_id = player_id.lower()
+        return any(str(item.get('playerid', '')).lower() == player_id for item in players if isinstance(item, dict))
+
+    def is_preferred(self, server, previous):
+        """
+        Check whether a server is the one in use before, or the one in the settings.
+
+        Args:
+            server (dict): A server found.
+            previous (dict): The server in use before, or an empty dict.
+
+        Returns:
+            bool: True if the server should be chosen over any other.
+        """
+        if previous.get('uuid') and server['uuid'] == previous['uuid']:
+            return True
+        return server['host'] == self.configured[0]
+
+    def stats(self):
+        """
+        Return the discovery counters.
+
+        Returns:
+            dict: Cache hits, discoveries run, servers found, address changes, discoveries that found
+                  no unambiguous server and the server in use.
+        """
+        return dict(self.counts, server=(self.current or {}).get('host'))
+
+# Instantiate the ServerDiscovery class
+server_discovery = ServerDiscovery()
@@ -0,0 +1,116 @@
+import threading
+import time
+from resources.lib.utils.constants import LMS_RESULT_KEY, LMS_PLAYLIST_LOOP_KEY, LMS_TIME_KEY, STATUS_RECEIVED_AT_KEY
+
+class StatusModel:
+    """
+    Local copy of a player's status, kept current from status updates pushed by LMS.
+
+    Each update is compared against the current state and only the fields that
+    differ are replaced, so unchanged playlist entries keep their identity between
+    updates and callers can tell exactly what changed.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = {}
+        self.playlist = []
+        self.time_received_at = None  # Monotonic time the current 'time' value was pushed
+        self.updates_applied = 0
+        self.fields_changed = 0
+
+    def apply(self, lms_data):
+        """
+        Apply a status update, replacing only the fields that changed.
+
+        Args:
+            lms_data (dict): A status update in the JSON-RPC response layout.
+
+        Returns:
+            set: The names of the changed fields; 'playlist_loop' if any playlist entry changed.
+        """
+        result = (lms_data or {}).get(LMS_RESULT_KEY)
+        if result is None:
+            return set()
+
+        changed = set()
+        with self.lock:
+            for key, value in result.items():
+                if key == LMS_PLAYLIST_LOOP_KEY:
+                    continue
+                if key not in self.status or self.status[key] != value:
+                    self.status[key] = value
+                    changed.add(key)
+
+            # Fields missing from the update no longer apply (e.g. remote stream metadata)
+            for key in [key for key in self.status if key not in result]:
+                del self.status[key]
+                changed.add(key)
+
+            if self.apply_playlist(result.get(LMS_PLAYLIST_LOOP_KEY, [])):
+                changed.add(LMS_PLAYLIST_LOOP_KEY)
+
+            if LMS_TIME_KEY in result:
+                self.time_received_at = time.monotonic()
+
+            self.updates_applied += 1
+            self.fields_changed += len(changed)
+        return changed
+
+    def apply_playlist(self, playlist_loop):
+        """
+        Replace the playlist entries that differ from the update. Caller must hold the lock.
+
+        Args:
+            playlist_loop (list): The playlist entries from the update.
+
+        Returns:
+            bool: True if any entry was added, replaced or removed, False otherwise.
+        """
+        changed = len(playlist_loop) != len(self.playlist)
+        del self.playlist[len(playlist_loop):]
+
+        for index, item in enumerate(playlist_loop):
+            if index >= len(self.playlist):
+                self.playlist.append(item)
+                changed = True
+            elif self.playlist[index] != item:
+                self.playlist[index] = item
+                changed = True
+        return changed
+
+    def has_data(self):
+        """
+        Check whether at least one status update has been applied.
+
+        Returns:
+            bool: True if the model holds a status, False otherwise.
+        """
+        with self.lock:
+            return self.updates_applied > 0
+
+    def snapshot(self):
+        """
+        Return the current state in the JSON-RPC response layout.
+        The elapsed time in a snapshot may be older than the snapshot itself, so the
+        time it was received is included for the playback clock.
+
+        Returns:
+            dict: A dictionary with the status under the 'result' key.
+        """
+        with self.lock:
+            result = dict(self.status)
+            result[LMS_PLAYLIST_LOOP_KEY] = list(self.playlist)
+            if self.time_received_at is not None:
+                result[STATUS_RECEIVED_AT_KEY] = self.time_received_at
+        return {LMS_RESULT_KEY: result}
+
+    def clear(self):
+        """
+        Forget the current state, e.g. after the subscription is lost.
+        """
+        with self.lock:
+            self.status = {}
+            self.playlist = []
+            self.time_received_at = None
+            self.updates_applied = 0
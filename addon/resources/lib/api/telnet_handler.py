@@ -1,36 +1,86 @@
 import time
 import threading
-from urllib.parse import unquote
-from queue import Queue, Empty
+from urllib.parse import quote
 import resources.lib.utils.global_config as global_config
 from resources.lib.utils.log_message import log_message
 from resources.lib.utils.error_handling import log_exception
-from resources.lib.deps import telnetlib
-from resources.lib.api.fetch_lms_status import fetch_lms_status
-from resources.lib.utils.network_utils import is_port_open, log_network_issue
+from resources.lib.api.line_transport import LineConnection
+from resources.lib.api.fetch_lms_status import FetchResult, fetch_lms_status_result
+from resources.lib.api.event_coalescer import EventCoalescer
+from resources.lib.api.cli_parser import parse_cli_line
+from resources.lib.api.status_model import StatusModel
+from resources.lib.api.server_discovery import server_discovery
+from resources.lib.api.cli_status import (
+    CliRequestTracker,
+    cli_request_key,
+    construct_cli_status_command,
+    parse_cli_status_response
+)
+from resources.lib.utils.read_settings import get_int_setting
+from resources.lib.utils.network_utils import log_network_issue
+from resources.lib.utils.connection_health import connection_health
+from resources.lib.utils.reconnect_scheduler import ReconnectScheduler
+from resources.lib.utils.latency_tracer import latency_tracer, STAGE_ENQUEUED, STAGE_SENT, STAGE_RESPONSE
+from resources.lib.utils.trace_recorder import trace_recorder
+from resources.lib.utils.lazy_import import LazyModule
 from resources.lib.utils.constants import (
-    BATCH_SIZE,
-    EVENT_QUEUE_TIMEOUT,
+    CLI_QUERY_TIMEOUT,
+    CLI_TRANSPORT_TELNETLIB,
+    DASHBOARD_SUBSCRIBE_COMMAND,
+    DEBOUNCE_MAX_WAIT,
+    DEBOUNCE_TIME,
+    EVENT_ENGINE_ASYNCIO,
+    EVENT_ENGINE_THREADS,
+    LMS_CLI_TRANSPORT_KEY,
+    LMS_DEBOUNCE_MAX_WAIT_KEY,
+    LMS_DEBOUNCE_TIME_KEY,
+    LMS_EVENT_ENGINE_KEY,
+    LMS_PLAYER_ID_KEY,
     LMS_SERVER_KEY,
+    LMS_STATUS_TRANSPORT_KEY,
     LMS_TELNET_PORT_KEY,
+    LOG_LEVEL_DEBUG,
     LOG_LEVEL_ERROR,
     LOG_LEVEL_INFO,
     LOG_LEVEL_WARNING,
-    RETRY_INTERVAL,
+    REFRESH_EVENT_COMMANDS,
+    SOCKET_TIMEOUT,
+    STATUS_COMMAND,
+    STATUS_FETCH_BUDGET,
+    STATUS_TRANSPORT_CLI,
+    STATUS_TRANSPORT_HTTP,
+    STATUS_TRANSPORT_PUSH,
+    STATUS_QUERY_PARAMS,
+    STATUS_SUBSCRIBE_INTERVAL,
+    STATUS_TAGS,
+    STATUS_UNSUBSCRIBE_PARAMS,
     TELNET_SUBSCRIBE_COMMAND,
     TELNET_UNSUBSCRIBE_COMMAND
 )
 
+# Loaded only when the settings select them: the telnetlib transport, and the asyncio engine with asyncio itself
+telnetlib = LazyModule('resources.lib.deps.telnetlib')
+async_engine = LazyModule('resources.lib.api.async_engine')
+
 class TelnetHandler:
-    def __init__(self):
+    def __init__(self, server=None):
+        self.server = server  # LmsServer for an additional dashboard server, None for the server in the settings
+        self.health = connection_health if server is None else server.health  # Circuit breaker of this server
         self.telnet_connection = None
+        self.connected = threading.Event()  # Set once the subscriber has connected
         self.subscriber_thread = None
-        self.event_queue = Queue(maxsize=5)  # Bounded queue with max size of 5
-        self.debounce_timer = None
+        self.coalescer = EventCoalescer()  # Collapses event bursts into one fetch of the latest state
         self.update_ui_callback = None
         self.stop_event = threading.Event()
         self.event_processor_thread = None
-        self.event_available = threading.Event()  # Event to signal new data availability
+        self.cli_requests = CliRequestTracker()  # Matches CLI replies to pending status queries
+        self.write_lock = threading.Lock()  # Serialises writes from the subscriber and processor threads
+        self.status_model = StatusModel()  # Local player status kept current by pushed updates
+        self.encoded_player_id = (None, None)  # (player_id, percent-encoded bytes) for matching raw events
+        self.async_engine = None  # Set when the asyncio engine replaces the subscriber and processor threads
+        self.reconnect_scheduler = ReconnectScheduler()  # Backoff between connection attempts
+        self.fetch_counts = {'fetches': 0, 'retried': 0, 'timed_out': 0, 'superseded': 0}
+        self.player_tracker = None  # Set in dashboard mode to receive the events of every player
 
     def set_update_ui_callback(self, callback):
         """
@@ -40,40 +90,176 @@ class TelnetHandler:
         """
         self.update_ui_callback = callback
 
+    def get_cli_address(self):
+        """
+        Return the address of this handler's server.
+
+        Returns:
+            tuple: The server address and CLI port.
+        """
+        if self.server is not None:
+            return self.server.host, self.server.cli_port
+        settings = global_config.settings
+        return settings[LMS_SERVER_KEY], int(settings[LMS_TELNET_PORT_KEY])
+
+    def get_server_name(self):
+        """
+        Return the name of this handler's server, as shown in the log and on the dashboard.
+
+        Returns:
+            str: The server address and CLI port.
+        """
+        return "{}:{}".format(*self.get_cli_address())
+
     def connect_to_lms(self):
         """
         Establish a telnet connection to the LMS server using settings from the configuration.
         Returns:
-            telnetlib.Telnet: A telnet connection instance.
+            LineConnection or telnetlib.Telnet: A CLI connection instance.
         """
-        settings = global_config.settings
-        host = settings[LMS_SERVER_KEY]
-        port = int(settings[LMS_TELNET_PORT_KEY])  # Convert port to integer
         tn = None
 
         while tn is None and not self.stop_event.is_set():
-            if not is_port_open(host, port):
-                log_network_issue(f"LMS server port {port} is not open.")
-                time.sleep(RETRY_INTERVAL)
-                continue
+            host, port = self.get_cli_address()  # Discovery may have moved the server
+            if not self.health.allow_request():
+                log_network_issue(f"LMS server {host} is unreachable, waiting to retry CLI port {port}.")
+            else:
+                try:
+                    tn = self.open_cli_connection(host, port)
+                    tn.write(self.get_subscribe_command())  # Subscribe to playlist events or status pushes
+                    self.health.record_success()
+                    self.reconnect_scheduler.connected()
+                    log_message(f"Connected to LMS {host} via telnet.", LOG_LEVEL_INFO)
+                    break
+                except Exception as e:
+                    if isinstance(e, OSError):
+                        self.health.record_failure(e)
+                        self.on_connect_failed()
+                    log_message(f"Connection to {host} failed. Error: {e}", LOG_LEVEL_ERROR)
+                    log_exception(e)
 
-            try:
-                tn = telnetlib.Telnet(host, port)
-                tn.write(TELNET_SUBSCRIBE_COMMAND)  # Subscribe to playlist events
-                log_message("Connected to LMS via telnet.", LOG_LEVEL_INFO)
-            except Exception as e:
-                log_message(f"Connection failed, retrying in {RETRY_INTERVAL} seconds... Error: {e}", LOG_LEVEL_ERROR)
-                log_exception(e)
-                time.sleep(RETRY_INTERVAL)
+            # Back off, at least until the circuit breaker allows a probe; shutdown ends the wait at once
+            self.reconnect_scheduler.wait(self.stop_event, self.health.time_until_probe())
 
         self.telnet_connection = tn
+        if tn is not None:
+            self.connected.set()
+        if tn is not None and self.player_tracker is not None:
+            self.player_tracker.on_connected()  # Notifications may have been missed while disconnected
         return tn
 
+    def on_connect_failed(self):
+        """
+        Look for the server on the network after a failed connection attempt, if it is the server in the settings.
+        """
+        if self.server is None:
+            server_discovery.on_connect_failed()
+
+    def retry_connect(self):
+        """
+        Retry the connection at once, e.g. after discovery found the server at a new address.
+        """
+        host, port = self.get_cli_address()
+        log_message(f"Reconnecting to LMS at {host}:{port}.", LOG_LEVEL_INFO)
+        self.health.reset()
+        self.reconnect_scheduler.retry_now()
+
+    def open_cli_connection(self, host, port):
+        """
+        Open a CLI connection using the transport selected in the settings.
+
+        Args:
+            host (str): The LMS server address.
+            port (int): The CLI port.
+
+        Returns:
+            LineConnection or telnetlib.Telnet: The open connection.
+        """
+        settings = global_config.settings or {}
+        if settings.get(LMS_CLI_TRANSPORT_KEY) == CLI_TRANSPORT_TELNETLIB:
+            return telnetlib.Telnet(host, port, SOCKET_TIMEOUT)
+        return LineConnection(host, port, SOCKET_TIMEOUT)
+
+    def get_status_transport(self):
+        """
+        Return the status transport selected in the settings.
+
+        Returns:
+            str: One of the STATUS_TRANSPORT_* constants.
+        """
+        settings = global_config.settings or {}
+        return settings.get(LMS_STATUS_TRANSPORT_KEY) or STATUS_TRANSPORT_CLI
+
+    def get_subscribe_command(self):
+        """
+        Build the subscription command for the selected status transport.
+        Push mode subscribes to the player's status; the other modes subscribe to playlist events.
+        In dashboard mode the events of every player are subscribed to as well; additional
+        servers only feed the dashboard.
+
+        Returns:
+            bytes: The encoded subscription command.
+        """
+        if self.server is not None:
+            return DASHBOARD_SUBSCRIBE_COMMAND
+        events_command = TELNET_SUBSCRIBE_COMMAND if self.player_tracker is None else DASHBOARD_SUBSCRIBE_COMMAND
+        if self.get_status_transport() == STATUS_TRANSPORT_PUSH:
+            player_id = global_config.settings[LMS_PLAYER_ID_KEY]
+            status_command = construct_cli_status_command(player_id, STATUS_QUERY_PARAMS + [f"subscribe:{STATUS_SUBSCRIBE_INTERVAL}"])
+            return status_command if self.player_tracker is None else events_command + status_command
+        return events_command
+
+    def get_unsubscribe_command(self):
+        """
+        Build the command that cancels the subscription made by get_subscribe_command().
+
+        Returns:
+            bytes: The encoded unsubscribe command.
+        """
+        if self.get_status_transport() == STATUS_TRANSPORT_PUSH and self.server is None:
+            status_command = construct_cli_status_command(global_config.settings[LMS_PLAYER_ID_KEY], STATUS_UNSUBSCRIBE_PARAMS)
+            return status_command if self.player_tracker is None else TELNET_UNSUBSCRIBE_COMMAND + status_command
+        return TELNET_UNSUBSCRIBE_COMMAND
+
+    def handle_status_push(self, response, event, trace=None):
+        """
+        Apply a status update pushed by LMS to the local model and queue a UI update if anything changed.
+
+        Args:
+            response (bytes): The raw status line read from the telnet connection.
+            event (CliEvent): The parsed status line.
+            trace (Trace): The latency trace started when the line was read, or None.
+
+        Returns:
+            bool: True if a UI update was queued, False otherwise.
+        """
+        lms_data = parse_cli_status_response(response)
+        if lms_data is None:
+            return False
+
+        changed = self.status_model.apply(lms_data)
+        if changed:
+            self.queue_event(event, trace)
+            return True
+        return False
+
+    def queue_event(self, event, trace=None):
+        """
+        Hand an event to the coalescer; the latest event wins within a burst.
+
+        Args:
+            event (CliEvent): The event to queue.
+            trace (Trace): The latency trace of the event, or None.
+        """
+        if trace is not None:
+            trace.mark(STAGE_ENQUEUED)
+        self.coalescer.push(event, trace)
+
     def handle_event(self, event_data):
         """
         Handle the received event data.
         Args:
-            event_data (dict): The event data to handle.
+            event_data (CliEvent): The event data to handle.
         """
         # Ensure xbmc is imported within the thread context
         try:
@@ -81,100 +267,374 @@ class TelnetHandler:
         except ImportError:
             pass
 
-        # Fetch LMS data
-        lms_data = fetch_lms_status()
+        # Fetch LMS data, giving up as soon as a newer event makes this one obsolete
+        result = self.fetch_status_result(is_superseded=self.coalescer.has_pending)
+        if not self.record_fetch_result(result):
+            return
 
         # Trigger the UI update callback if it's set
         if self.update_ui_callback:
-            self.update_ui_callback(lms_data)
+            self.update_ui_callback(result.data)
+
+    def record_fetch_result(self, result):
+        """
+        Count the outcome of an event-driven status fetch and decide whether to show it.
+
+        Args:
+            result (FetchResult): The outcome of the fetch.
+
+        Returns:
+            bool: True if the UI should be updated, False to keep showing the current state.
+        """
+        self.fetch_counts['fetches'] += 1
+        self.fetch_counts['retried'] += result.retried
+        if result.superseded:
+            self.fetch_counts['superseded'] += 1
+            log_message("Status fetch superseded by a newer event, dropping it.")
+            return False
+        if result.timed_out and result.data is None:
+            self.fetch_counts['timed_out'] += 1
+            log_message("Status fetch ran out of time, keeping the current state.", LOG_LEVEL_WARNING)
+            return False
+        return True
+
+    def get_fetch_stats(self):
+        """
+        Return the status fetch counters.
+
+        Returns:
+            dict: The number of event-driven fetches, and how many were retried, timed out or superseded.
+        """
+        return dict(self.fetch_counts)
+
+    def fetch_status(self, params=None):
+        """
+        Fetch the player status using the transport selected in the settings.
+
+        Args:
+            params (list): Status query parameters for a custom window, or None for the default query.
+
+        Returns:
+            dict: A dictionary containing the status response data, or None if it could not be fetched.
+        """
+        return self.fetch_status_result(params).data
 
-        # Clear the debounce timer
-        self.debounce_timer = None
+    def fetch_status_result(self, params=None, budget=STATUS_FETCH_BUDGET, is_superseded=None):
+        """
+        Fetch the player status using the transport selected in the settings, within a time budget.
+        The CLI transport reuses the open telnet connection and falls back to HTTP if it fails.
+        The push transport reads the local status model, querying over the CLI until the first update arrives.
+
+        Args:
+            params (list): Status query parameters for a custom window, or None for the default query.
+            budget (float): The overall time budget in seconds, covering the CLI query and the HTTP fallback.
+            is_superseded (callable): Returns True if a newer event makes this fetch obsolete.
+
+        Returns:
+            FetchResult: The status data and how the fetch went.
+        """
+        if self.async_engine is not None and self.async_engine.is_running():
+            return self.async_engine.request_status(params, budget, is_superseded)
+
+        deadline = time.monotonic() + budget
+        transport = self.get_status_transport()
+
+        if transport == STATUS_TRANSPORT_PUSH:
+            if params is None and self.status_model.has_data():
+                return FetchResult(self.status_model.snapshot())  # Kept current by the subscription, no request needed
+            transport = STATUS_TRANSPORT_CLI
+
+        timed_out = False
+        if transport == STATUS_TRANSPORT_CLI:
+            cli_timeout = min(CLI_QUERY_TIMEOUT, budget)
+            lms_data = self.query_status_cli(params, cli_timeout)
+            if lms_data is not None:
+                return FetchResult(lms_data)
+            if is_superseded is not None and is_superseded():
+                return FetchResult(superseded=True)
+            timed_out = deadline - time.monotonic() <= budget - cli_timeout  # The reply never came
+            log_message("CLI status query failed, falling back to HTTP.", LOG_LEVEL_WARNING)
+        elif transport != STATUS_TRANSPORT_HTTP:
+            log_message(f"Unknown status transport '{transport}', using HTTP.", LOG_LEVEL_WARNING)
+
+        result = fetch_lms_status_result(params, deadline - time.monotonic(), is_superseded)
+        result.timed_out = result.timed_out or timed_out
+        return result
+
+    def fetch_playlist_page(self, start, count):
+        """
+        Fetch a page of the playlist, independent of the current track.
+
+        Args:
+            start (int): The playlist index of the first entry.
+            count (int): The number of entries.
+
+        Returns:
+            dict: A dictionary containing the status response data, or None if it could not be fetched.
+        """
+        return self.fetch_status(["status", start, count, STATUS_TAGS])
+
+    def query_status_cli(self, params=None, timeout=CLI_QUERY_TIMEOUT):
+        """
+        Send a status query over the open telnet connection and wait for the matching reply.
+        The reply itself is read by the subscriber thread and handed over through cli_requests.
+
+        Args:
+            params (list): Status query parameters, or None for the default query.
+            timeout (float): The maximum time to wait for the reply in seconds.
+
+        Returns:
+            dict: The parsed status in the JSON-RPC response layout, or None if no reply arrived.
+        """
+        tn = self.telnet_connection
+        if self.subscriber_thread is None or not self.subscriber_thread.is_alive():
+            return None
+        if tn is None and self.health.is_available():
+            # Still connecting, e.g. when the window opens right after startup: waiting is faster than the HTTP fallback
+            self.connected.wait(timeout)
+            tn = self.telnet_connection
+        if tn is None:
+            return None
+
+        player_id = global_config.settings[LMS_PLAYER_ID_KEY]
+        params = params or STATUS_QUERY_PARAMS
+        waiter = self.cli_requests.register(cli_request_key(player_id, params))
+        try:
+            with self.write_lock:
+                tn.write(construct_cli_status_command(player_id, params))
+        except (OSError, AttributeError) as e:
+            self.cli_requests.cancel(waiter)
+            log_message(f"Failed to send CLI status query: {e}", LOG_LEVEL_ERROR)
+            return None
+        latency_tracer.mark(STAGE_SENT)
+
+        reply = self.cli_requests.wait(waiter, timeout)
+        if reply is None:
+            return None
+        latency_tracer.mark(STAGE_RESPONSE)
+        return parse_cli_status_response(reply)
+
+    def query_player_statuses(self, player_ids, params, timeout=CLI_QUERY_TIMEOUT):
+        """
+        Fetch the status of several players at once, e.g. for the multi-player dashboard.
+        The queries go out over the CLI connection in a single write and share one timeout;
+        players whose reply does not arrive are fetched over HTTP one by one, within one shared budget.
+
+        Args:
+            player_ids (list): The player IDs.
+            params (list): The status query parameters.
+            timeout (float): The maximum time to wait for the CLI replies in seconds.
+
+        Returns:
+            dict: The status of each player in the JSON-RPC response layout, or None if it could not be fetched.
+        """
+        if self.async_engine is not None and self.async_engine.is_running():
+            results = self.async_engine.request_status_batch(player_ids, params, timeout)
+        else:
+            results = self.query_status_cli_batch(player_ids, params, timeout)
+
+        # The fallbacks share one budget, so a server that stopped answering is given up on quickly
+        deadline = time.monotonic() + STATUS_FETCH_BUDGET
+        for player_id in player_ids:
+            remaining = deadline - time.monotonic()
+            if results.get(player_id) is None and remaining > 0:
+                results[player_id] = fetch_lms_status_result(params, remaining, player_id=player_id, server=self.server).data
+        return results
+
+    def query_status_cli_batch(self, player_ids, params, timeout=CLI_QUERY_TIMEOUT):
+        """
+        Send status queries for several players over the open telnet connection in one write,
+        and wait for all replies.
+
+        Args:
+            player_ids (list): The player IDs.
+            params (list): The status query parameters.
+            timeout (float): The maximum time to wait for all replies in seconds.
+
+        Returns:
+            dict: The parsed status of each player, or None for players whose reply did not arrive.
+        """
+        results = dict.fromkeys(player_ids)
+        tn = self.telnet_connection
+        if not player_ids or tn is None or self.subscriber_thread is None or not self.subscriber_thread.is_alive():
+            return results
+
+        waiters = [(player_id, self.cli_requests.register(cli_request_key(player_id, params))) for player_id in player_ids]
+        try:
+            with self.write_lock:
+                tn.write(b"".join(construct_cli_status_command(player_id, params) for player_id in player_ids))
+        except (OSError, AttributeError) as e:
+            for _, waiter in waiters:
+                self.cli_requests.cancel(waiter)
+            log_message(f"Failed to send CLI status queries: {e}", LOG_LEVEL_ERROR)
+            return results
+
+        deadline = time.monotonic() + timeout
+        for player_id, waiter in waiters:
+            reply = self.cli_requests.wait(waiter, max(deadline - time.monotonic(), 0))
+            if reply is not None:
+                results[player_id] = parse_cli_status_response(reply)
+        return results
 
     def process_event(self):
         """
-        Process the most recent event data from the queue.
+        Process the latest event of each burst released by the coalescer.
         """
-        batch_size = BATCH_SIZE
         while not self.stop_event.is_set():
-            self.event_available.wait(timeout=1)  # Wait for the event signal or timeout
-            if self.stop_event.is_set():
+            event_data = self.coalescer.wait_for_event()  # Blocks until a burst settles or we shut down
+            if event_data is None or self.stop_event.is_set():
                 break
-            self.event_available.clear()  # Reset the event
-            
-            batch_events = []
+            latency_tracer.resume(self.coalescer.released_trace)
             try:
-                # Attempt to collect up to batch_size events
-                for _ in range(batch_size):
-                    event_data = self.event_queue.get(timeout=EVENT_QUEUE_TIMEOUT)
-                    batch_events.append(event_data)
-            except Empty:
-                # If the queue is empty before collecting batch_size events, continue
-                pass
-
-            # Process the collected events, even if fewer than batch_size
-            for event_data in batch_events:
                 self.handle_event(event_data)
+            finally:
+                latency_tracer.finish()
+
+    def configure_coalescer(self):
+        """
+        Apply the debounce quiet period and max-wait ceiling from the addon settings.
+        """
+        settings = global_config.settings or {}
+        self.coalescer.quiet_period = get_int_setting(settings, LMS_DEBOUNCE_TIME_KEY, int(DEBOUNCE_TIME * 1000)) / 1000.0
+        max_wait = get_int_setting(settings, LMS_DEBOUNCE_MAX_WAIT_KEY, int(DEBOUNCE_MAX_WAIT * 1000)) / 1000.0
+        self.coalescer.max_wait = max(max_wait, self.coalescer.quiet_period)
+
+    def get_event_stats(self):
+        """
+        Return the event coalescing counters.
+
+        Returns:
+            dict: The counters reported by the coalescer.
+        """
+        return self.coalescer.stats()
+
+    def get_reconnect_stats(self):
+        """
+        Return the reconnection counters and recovery times.
+
+        Returns:
+            dict: The counters reported by the reconnect scheduler.
+        """
+        return self.reconnect_scheduler.stats()
 
-    def format_event_response(self, response):
+    def handle_line(self, response, push_mode, trace=None):
         """
-        Format the raw response into a dictionary with query, param, and data.
+        Handle one line read from the telnet connection, queueing a UI update if it is a relevant event.
         Args:
-            response (bytes): The raw response from the telnet connection.
+            response (bytes): The raw line read from the telnet connection.
+            push_mode (bool): Whether the connection is subscribed to status pushes.
+            trace (Trace): The latency trace started when the line was read, or None.
         Returns:
-            dict: The formatted event data.
+            bool: True if an event was queued, False otherwise.
         """
-        parts = response.decode('utf-8').strip().split(' ')
-        
-        if len(parts) >= 3:
-            query = parts[1]
-            param = parts[2]
-            data = ' '.join(parts[3:])
-            data_decoded = unquote(data)
-            return { 'query': query, 'param': param, 'data': data_decoded }
-        return None
+        event = parse_cli_line(response)
+        if event is None:
+            return False
+        if self.player_tracker is not None:
+            self.player_tracker.on_event(event)  # The dashboard follows every player
+        if self.server is not None or not self.is_own_player(event):
+            return False
+
+        if push_mode:
+            return event.command == STATUS_COMMAND and self.handle_status_push(response, event, trace)
+
+        if event.command in REFRESH_EVENT_COMMANDS:
+            log_message("New event: %s", LOG_LEVEL_DEBUG, event)
+            self.queue_event(event, trace)
+            return True
+        return False
+
+    def is_own_player(self, event):
+        """
+        Check whether an event concerns the configured player.
+        Args:
+            event (CliEvent): The parsed event.
+        Returns:
+            bool: True for events of the configured player and server-level events, False otherwise.
+        """
+        if event.raw_player_id is None:
+            return True
+        settings = global_config.settings or {}
+        player_id = str(settings.get(LMS_PLAYER_ID_KEY, '')).lower()
+        if self.encoded_player_id[0] != player_id:
+            # quote() writes uppercase escapes (%3A); the raw token is compared in lowercase
+            self.encoded_player_id = (player_id, quote(player_id, safe='').lower().encode('ascii'))
+        # Compare the raw token first; only decode it if the encoding differs
+        return event.raw_player_id.lower() == self.encoded_player_id[1] or event.player_id.lower() == player_id
+
+    def run_subscriber(self):
+        """
+        Subscriber thread entry point: connect to the server, then read events until shutdown.
+        """
+        tn = self.connect_to_lms()
+        if tn is not None:
+            self.subscribe_to_events(tn)
 
     def subscribe_to_events(self, tn):
         """
         Subscribe to events from the LMS server and add them to the event queue.
         Args:
-            tn (telnetlib.Telnet): A telnet connection instance.
+            tn (LineConnection or telnetlib.Telnet): A CLI connection instance.
         """
+        push_mode = self.get_status_transport() == STATUS_TRANSPORT_PUSH
         while not self.stop_event.is_set():
             try:
                 response = tn.read_until(b"\n", timeout=1)  # Use timeout to periodically check stop_event
                 if self.stop_event.is_set():
                     break
-                event_dict = self.format_event_response(response)
-
-                if event_dict:
-                    query = event_dict['query']
-                    param = event_dict['param']
-                    data = event_dict['data']
-                
-                    if query == 'playlist' and param == 'newsong':
-                        log_message(f"New response: {query}, {param}, {data}")
-                        self.event_queue.put(event_dict)
-                        self.event_available.set()  # Signal that new data is available
-            except (EOFError, AttributeError):
+                if not response:
+                    continue
+                if self.cli_requests.deliver(response):
+                    trace_recorder.record_cli_line(response, reply=True)
+                    continue  # Reply to a status query, not an event
+                trace_recorder.record_cli_line(response)
+                self.handle_line(response, push_mode, latency_tracer.start())
+            except (EOFError, AttributeError, OSError):
                 if self.stop_event.is_set():
                     break
                 log_message("Connection lost, reconnecting...", LOG_LEVEL_WARNING)
+                self.reconnect_scheduler.connection_lost()
+                self.cli_requests.fail_all()  # Replies will never arrive on the dead connection
+                self.status_model.clear()  # The new subscription starts with a full status push
                 tn = self.connect_to_lms()
 
+    def get_event_engine(self):
+        """
+        Return the event engine selected in the settings.
+
+        Returns:
+            str: One of the EVENT_ENGINE_* constants.
+        """
+        settings = global_config.settings or {}
+        engine = settings.get(LMS_EVENT_ENGINE_KEY) or EVENT_ENGINE_THREADS
+        if engine not in (EVENT_ENGINE_THREADS, EVENT_ENGINE_ASYNCIO):
+            log_message(f"Unknown event engine '{engine}', using threads.", LOG_LEVEL_WARNING)
+            return EVENT_ENGINE_THREADS
+        return engine
+
     def start_telnet_subscriber(self):
         """
         Start threads to subscribe to LMS events via telnet and process them.
+        With the asyncio engine selected, a single event loop thread does both.
+        The connection is made in the background, so an unreachable server does not hold up the caller.
+        Additional servers have no player of their own and need no event processor.
         """
+        if self.get_event_engine() == EVENT_ENGINE_ASYNCIO:
+            if self.async_engine is None or not self.async_engine.is_running():
+                self.configure_coalescer()
+                self.async_engine = async_engine.AsyncEventEngine(self)
+                self.async_engine.start()
+            return
+
         # Start the telnet subscription thread
         if self.subscriber_thread is None or not self.subscriber_thread.is_alive():
-            tn = self.connect_to_lms()
-            self.subscriber_thread = threading.Thread(target=self.subscribe_to_events, args=(tn,))
+            self.subscriber_thread = threading.Thread(target=self.run_subscriber)
             self.subscriber_thread.daemon = True
             self.subscriber_thread.start()
 
         # Start the event processing thread
-        if self.event_processor_thread is None or not self.event_processor_thread.is_alive():
+        if self.server is None and (self.event_processor_thread is None or not self.event_processor_thread.is_alive()):
+            self.configure_coalescer()
             self.event_processor_thread = threading.Thread(target=self.process_event)
             self.event_processor_thread.daemon = True
             self.event_processor_thread.start()
@@ -184,11 +644,20 @@ class TelnetHandler:
         Close the telnet connection and unsubscribe from events.
         Ensure all threads, events, and resources are properly terminated and cleaned up.
         """
-        # Set the stop event to signal all threads to stop
+        # Set the stop event to signal all threads to stop, ending any wait before a reconnection attempt
         self.stop_event.set()
+        self.reconnect_scheduler.retry_now()
+
+        # Stop the asyncio engine; it unsubscribes and closes its own connection
+        if self.async_engine is not None:
+            self.async_engine.stop()
+            self.async_engine = None
         
-        # Signal the event_available to wake up the process_event method if it's waiting
-        self.event_available.set()
+        # Close the coalescer to wake up the process_event method if it's waiting
+        self.coalescer.close()
+
+        # Release any status query still waiting for a CLI reply
+        self.cli_requests.fail_all()
         
         # Join the subscriber_thread to ensure it has completed
         if self.subscriber_thread is not None:
@@ -205,15 +674,17 @@ class TelnetHandler:
         # Close the telnet connection properly
         if self.telnet_connection:
             try:
-                self.telnet_connection.write(TELNET_UNSUBSCRIBE_COMMAND)  # Unsubscribe from playlist events
+                self.telnet_connection.write(self.get_unsubscribe_command())  # Unsubscribe from events
                 self.telnet_connection.close()
                 log_message("Telnet connection closed and unsubscribed from events.", LOG_LEVEL_INFO)
+                log_message(f"Event coalescing stats: {self.get_event_stats()}", LOG_LEVEL_INFO)
             except Exception as e:
                 log_message(f"Error closing telnet connection: {e}", LOG_LEVEL_ERROR)
                 log_exception(e)
         
         # Ensure the telnet connection is set to None
         self.telnet_connection = None
+        self.connected.clear()
 
 # Instantiate the TelnetHandler
 telnet_handler = TelnetHandler()
@@ -0,0 +1,180 @@
+import heapq
+import itertools
+import threading
+import time
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.lazy_import import LazyModule
+from resources.lib.utils.error_handling import log_exception
+from resources.lib.utils.constants import LOG_LEVEL_ERROR, WORKER_POOL_SIZE
+
+# Imported with the first task; the pool is only used in dashboard mode
+futures = LazyModule('concurrent.futures')
+
+class WorkerPool:
+    """
+    Bounded pool of worker threads shared by all servers, with one timer thread for deferred tasks.
+
+    Tasks are submitted under a key, one per server or tracker. At most one task per key
+    runs at a time, and a task submitted while its key is busy replaces any task already
+    waiting for that key. A slow server therefore holds at most one worker, and its
+    backlog collapses into a single follow-up task that queues behind the other servers'
+    tasks instead of in front of them.
+    """
+
+    def __init__(self, max_workers=WORKER_POOL_SIZE):
+        self.max_workers = max_workers
+        self.condition = threading.Condition()
+        self.executor = None
+        self.timer_thread = None
+        self.busy = set()  # Keys with a task running or queued in the executor
+        self.waiting = {}  # Key -> (function, args) submitted while the key was busy
+        self.timers = {}  # Key -> (due time, function, args) of the deferred task
+        self.timer_heap = []  # (due time, sequence, key); entries replaced in timers are skipped
+        self.sequence = itertools.count()
+        self.closed = False
+        self.key_stats = {}  # Key -> counters
+
+    def start(self):
+        """
+        Reopen the pool after shutdown(). The worker and timer threads start on first use.
+        """
+        with self.condition:
+            self.closed = False
+
+    def submit(self, key, function, *args):
+        """
+        Run a task on the pool, after any task of the same key that is already running.
+
+        Args:
+            key: The key the task belongs to, e.g. a server's tracker.
+            function (callable): The task.
+            *args: The arguments for the task.
+
+        Returns:
+            bool: True if the task was accepted, False if the pool is shut down.
+        """
+        with self.condition:
+            if self.closed:
+                return False
+            stats = self.get_key_stats(key)
+            if key in self.busy:
+                if key in self.waiting:
+                    stats['replaced'] += 1
+                self.waiting[key] = (function, args)
+                return True
+            self.busy.add(key)
+            if self.executor is None:
+                self.executor = futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="lms-worker")
+            executor = self.executor
+        executor.submit(self.run_task, key, function, args)
+        return True
+
+    def schedule(self, key, due, function, *args):
+        """
+        Run a task at a later time, replacing any deferred task of the same key.
+
+        Args:
+            key: The key the task belongs to.
+            due (float): The time.monotonic() value at which to submit the task.
+            function (callable): The task.
+            *args: The arguments for the task.
+        """
+        with self.condition:
+            if self.closed:
+                return
+            self.timers[key] = (due, function, args)
+            heapq.heappush(self.timer_heap, (due, next(self.sequence), key))
+            if self.timer_thread is None or not self.timer_thread.is_alive():
+                self.timer_thread = threading.Thread(target=self.run_timers, name="lms-worker-timer")
+                self.timer_thread.daemon = True
+                self.timer_thread.start()
+            self.condition.notify()
+
+    def run_timers(self):
+        """
+        Timer thread: submit deferred tasks when they are due.
+        """
+        while True:
+            with self.condition:
+                task = None
+                while task is None and not self.closed:
+                    while self.timer_heap and self.timers.get(self.timer_heap[0][2], (None,))[0] != self.timer_heap[0][0]:
+                        heapq.heappop(self.timer_heap)  # Replaced or already submitted
+                    if not self.timer_heap:
+                        self.condition.wait()
+                        continue
+                    due, _, key = self.timer_heap[0]
+                    now = time.monotonic()
+                    if due > now:
+                        self.condition.wait(due - now)
+                        continue
+                    heapq.heappop(self.timer_heap)
+                    task = (key,) + self.timers.pop(key)[1:]
+                if task is None:
+                    return
+            key, function, args = task
+            self.submit(key, function, *args)
+
+    def run_task(self, key, function, args):
+        """
+        Worker: run one task, then hand the key's waiting task, if any, back to the executor.
+        """
+        started = time.monotonic()
+        try:
+            function(*args)
+        except Exception as e:
+            log_message(f"Error in pooled task: {e}", LOG_LEVEL_ERROR)
+            log_exception(e)
+        elapsed = time.monotonic() - started
+
+        with self.condition:
+            stats = self.get_key_stats(key)
+            stats['tasks'] += 1
+            stats['busy_s'] += elapsed
+            stats['max_s'] = max(stats['max_s'], elapsed)
+            task = self.waiting.pop(key, None)
+            if task is None or self.closed or self.executor is None:
+                self.busy.discard(key)
+                return
+            executor = self.executor
+        executor.submit(self.run_task, key, task[0], task[1])  # Behind the tasks other keys queued meanwhile
+
+    def get_key_stats(self, key):
+        """
+        Return the counters of a key, creating them if needed. Caller must hold the condition.
+        """
+        stats = self.key_stats.get(key)
+        if stats is None:
+            stats = self.key_stats[key] = {'tasks': 0, 'replaced': 0, 'busy_s': 0.0, 'max_s': 0.0}
+        return stats
+
+    def stats(self, key):
+        """
+        Return the task counters of a key.
+
+        Args:
+            key: The key.
+
+        Returns:
+            dict: The number of tasks run and replaced while waiting, and the total and longest run time in seconds.
+        """
+        with self.condition:
+            return dict(self.get_key_stats(key))
+
+    def shutdown(self):
+        """
+        Stop accepting tasks, drop deferred and waiting ones, and let running tasks finish in the background.
+        """
+        with self.condition:
+            self.closed = True
+            self.timers.clear()
+            self.timer_heap = []
+            self.waiting.clear()
+            self.busy.clear()
+            executor, self.executor = self.executor, None
+            self.condition.notify_all()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+# Instantiate the WorkerPool class
+worker_pool = WorkerPool()
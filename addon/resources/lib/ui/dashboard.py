@@ -0,0 +1,108 @@
+import threading
+import xbmcgui
+from resources.lib.api.player_tracker import player_tracker
+from resources.lib.api.lms_servers import server_manager
+from resources.lib.utils.shutdown_handler import shutdown_addon
+from resources.lib.utils.startup_profiler import startup_profiler
+from resources.lib.utils.constants import CONTROL_ID_DASHBOARD_PLAYERS, CONTROL_ID_DASHBOARD_SUMMARY
+
+class Dashboard(xbmcgui.WindowXML):
+    """
+    Window listing every player of the followed servers with its state and current track.
+
+    The list is built once from the tracked players and rebuilt only when players join
+    or leave; otherwise only the rows of the players that changed are relabelled on
+    their existing ListItems. Rows are grouped by server, the main server first.
+    The trackers of different servers call back on different pool workers, so updates
+    are serialized by a lock.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.players_list = None
+        self.summary = None
+        self.items = {}  # (tracker, player ID) -> ListItem shown for it
+        self.update_lock = threading.Lock()
+        self.trackers = [player_tracker] + server_manager.trackers()
+        for tracker in self.trackers:
+            tracker.set_update_callback(lambda player_ids, tracker=tracker: self.update_players(tracker, player_ids))
+
+    def onInit(self):
+        """
+        Called when the window is initialized.
+        Shows the players tracked so far; the trackers fill in the rest as they refresh.
+        """
+        with self.update_lock:
+            self.players_list = self.getControl(CONTROL_ID_DASHBOARD_PLAYERS)
+            self.summary = self.getControl(CONTROL_ID_DASHBOARD_SUMMARY)
+            self.items = {}
+        self.update_players(None, None)
+        startup_profiler.finish("first render")
+
+    def update_players(self, tracker, player_ids):
+        """
+        Update the rows of the players that changed. Called from the worker pool.
+
+        Args:
+            tracker (PlayerTracker): The tracker of the server the players are on, or None for all servers.
+            player_ids (set): The IDs of the players whose rows changed, or None to rebuild the list.
+        """
+        with self.update_lock:
+            if self.players_list is None:
+                return  # Not initialised yet; onInit shows the current state
+            if player_ids is None or any((tracker, player_id) not in self.items for player_id in player_ids):
+                self.rebuild()
+            else:
+                for player_id in player_ids:
+                    self.fill_item(self.items[(tracker, player_id)], tracker.get_player(player_id), tracker.name)
+            players = sum(len(tracker.get_players()) for tracker in self.trackers)
+            playing = sum(tracker.count_playing() for tracker in self.trackers)
+            self.summary.setLabel(f"{players} players on {len(self.trackers)} servers, {playing} playing")
+
+    def rebuild(self):
+        """
+        Replace all rows of the list with the tracked players, in one batched addItems call.
+        Caller must hold the update lock.
+        """
+        items = {}
+        for tracker in self.trackers:
+            for entry in tracker.get_players():
+                item = xbmcgui.ListItem()
+                self.fill_item(item, entry, tracker.name)
+                items[(tracker, entry.player_id)] = item
+        self.items = items
+        self.players_list.reset()
+        self.players_list.addItems(list(items.values()))
+
+    @staticmethod
+    def fill_item(item, entry, server_name):
+        """
+        Label a row with a player's state and current track.
+
+        Args:
+            item (xbmcgui.ListItem): The row.
+            entry (PlayerEntry): The player, or None if it is no longer tracked.
+            server_name (str): The name of the player's server.
+        """
+        if entry is None:
+            return
+        item.setLabel(entry.name)
+        item.setLabel2(" - ".join(part for part in (entry.artist, entry.title) if part))
+        item.setProperty('album', entry.album)
+        item.setProperty('server', server_name or '')
+        item.setProperty('mode', entry.mode or '')
+        item.setProperty('power', '1' if entry.power else '0')
+        item.setProperty('connected', '1' if entry.connected else '0')
+
+    def onAction(self, action):
+        """
+        Handle action events in the UI.
+
+        Args:
+            action: The action that was performed.
+        """
+        if action == xbmcgui.ACTION_PREVIOUS_MENU or action == xbmcgui.ACTION_NAV_BACK:
+            for tracker in self.trackers:
+                tracker.set_update_callback(None)
+            shutdown_addon()
+            self.close()
@@ -0,0 +1,46 @@
+from resources.lib.utils.latency_tracer import latency_tracer
+
+class LatencyOverlay:
+    """
+    Debug overlay on the NowPlaying window with the latency percentile summary.
+
+    The overlay is hidden by default. Showing it also writes the summary to the log,
+    and while it is visible its text is refreshed after every UI update.
+    """
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self.control = None
+        self.visible = False
+
+    def attach(self, control):
+        """
+        Use a (new) overlay control, keeping the current visibility.
+
+        Args:
+            control (xbmcgui.ControlTextBox): The overlay control.
+        """
+        self.control = control
+        control.setVisible(self.visible)
+        self.refresh()
+
+    def toggle(self):
+        """
+        Show or hide the overlay, logging the summary when it is shown.
+        """
+        self.visible = not self.visible
+        if self.control is not None:
+            self.control.setVisible(self.visible)
+        if self.visible:
+            self.refresh()
+            self.tracer.log_summary()
+
+    def refresh(self):
+        """
+        Update the overlay text if it is visible.
+        """
+        if self.visible and self.control is not None:
+            self.control.setText(self.tracer.format_summary())
+
+# Instantiate the LatencyOverlay class
+latency_overlay = LatencyOverlay(latency_tracer)
@@ -1,8 +1,18 @@
+import threading
 import xbmcgui
-from resources.lib.api.fetch_lms_status import fetch_lms_status
+import resources.lib.utils.global_config as global_config
 from resources.lib.api.telnet_handler import telnet_handler
-from resources.lib.ui.ui_updates import update_now_playing, update_playlist
+from resources.lib.ui.ui_updates import update_now_playing, update_playlist, update_playlist_items
+from resources.lib.ui.playlist_pager import playlist_pager
+from resources.lib.ui.progress_display import progress_display
+from resources.lib.ui.latency_overlay import latency_overlay
+from resources.lib.ui.status_fingerprint import status_fingerprint, SECTION_NOW_PLAYING, SECTION_PROGRESS, SECTION_PLAYLIST
+from resources.lib.ui.state_snapshot import state_snapshot
+import resources.lib.api.artwork_prefetcher as artwork_prefetcher  # Module access, created on first use
 from resources.lib.utils.shutdown_handler import shutdown_addon
+from resources.lib.utils.startup_profiler import startup_profiler
+from resources.lib.utils.profile_paths import get_profile_dir
+from resources.lib.utils.log_message import log_message
 from resources.lib.ui.ui_elements import ui_elements
 from resources.lib.utils.constants import (
     CONTROL_ID_ARTWORK_BACKGROUND,
@@ -10,26 +20,58 @@ from resources.lib.utils.constants import (
     CONTROL_ID_NOW_PLAYING_TITLE,
     CONTROL_ID_NOW_PLAYING_ALBUM,
     CONTROL_ID_NOW_PLAYING_ARTIST,
-    CONTROL_ID_PLAYLIST
+    CONTROL_ID_PLAYLIST,
+    CONTROL_ID_PROGRESS,
+    CONTROL_ID_ELAPSED,
+    CONTROL_ID_LATENCY_OVERLAY,
+    DEFAULT_ARTWORK_PATH,
+    LOG_LEVEL_DEBUG,
+    LOG_LEVEL_WARNING
 )
 
+# Navigation actions that may scroll the playlist towards the edge of the loaded rows
+PLAYLIST_SCROLL_ACTIONS = (
+    xbmcgui.ACTION_MOVE_UP,
+    xbmcgui.ACTION_MOVE_DOWN,
+    xbmcgui.ACTION_PAGE_UP,
+    xbmcgui.ACTION_PAGE_DOWN
+)
+
+# Action that shows or hides the latency overlay: Kodi's codec info key ('o' on a keyboard)
+LATENCY_OVERLAY_ACTION = xbmcgui.ACTION_SHOW_CODEC
+
 class NowPlaying(xbmcgui.WindowXML):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.el = ui_elements  # Use the imported instance
+        self.update_lock = threading.Lock()  # Serializes painting by the event thread and the window's own fetches
+        self.update_generation = 0  # Event updates painted; a fetch started before one is out of date
         telnet_handler.set_update_ui_callback(self.update_ui)
 
     def onInit(self):
         """
         Called when the window is initialized.
-        Fetches and displays 'now playing' information.
+        Paints the last known state at once, then the live 'now playing' information.
+        Without a saved state, the first paint waits for the live information.
         """
-        self.lms_data = fetch_lms_status()
+        playlist_pager.reset()
+        status_fingerprint.reset()  # New controls: paint every section on the first update
+        if artwork_prefetcher.artwork_prefetcher:
+            artwork_prefetcher.artwork_prefetcher.start()  # Reopen it if the window was closed before
         self.init_elems()
+        generation = self.update_generation
+        if self.paint_snapshot(generation):
+            startup_profiler.finish("first render")
+            thread = threading.Thread(target=self.reconcile, args=(generation,), name="klms-reconcile")
+            thread.daemon = True
+            thread.start()
+        else:
+            self.update_ui_since(telnet_handler.fetch_status(), generation)
+            startup_profiler.finish("first render")
 
     def init_elems(self):
         """
-        Initialize UI controls and populate them with data.
+        Initialize UI controls.
         """
         self.el.artwork_background = self.getControl(CONTROL_ID_ARTWORK_BACKGROUND)
         self.el.artwork = self.getControl(CONTROL_ID_ARTWORK)
@@ -37,18 +79,96 @@ class NowPlaying(xbmcgui.WindowXML):
         self.el.now_playing_artist = self.getControl(CONTROL_ID_NOW_PLAYING_ARTIST)
         self.el.now_playing_album = self.getControl(CONTROL_ID_NOW_PLAYING_ALBUM)
         self.el.playlist = self.getControl(CONTROL_ID_PLAYLIST)
+        self.el.progress = self.getControl(CONTROL_ID_PROGRESS)
+        self.el.elapsed = self.getControl(CONTROL_ID_ELAPSED)
+        self.el.latency_overlay = self.getControl(CONTROL_ID_LATENCY_OVERLAY)
+        progress_display.start(self.el)
+        latency_overlay.attach(self.el.latency_overlay)
 
-        self.update_ui(self.lms_data)
+    def paint_snapshot(self, generation):
+        """
+        Paint the state saved when the window last showed live data, without any request.
+
+        Args:
+            generation (int): The update generation when the window was initialized.
+
+        Returns:
+            bool: True if a saved state was painted, or live data already was, False if there is none.
+        """
+        snapshot = state_snapshot.load(global_config.settings or {}, get_profile_dir())
+        if snapshot is None:
+            return False
+        lms_data, artwork = snapshot
+
+        with self.update_lock:
+            if self.update_generation != generation:
+                return True  # An event was painted meanwhile; the saved state is older
+            # Remember what is on screen, so the live update only repaints what changed since
+            status_fingerprint.changed_sections(lms_data)
+            if artwork is None:
+                status_fingerprint.forget(SECTION_NOW_PLAYING)  # The artwork file is gone; the live update fetches it
+            update_now_playing(self.el, lms_data, artwork=artwork or DEFAULT_ARTWORK_PATH)
+            update_playlist_items(self.el, lms_data)
+        return True
+
+    def reconcile(self, generation):
+        """
+        Thread: fetch the live status after the saved state was painted, and repaint what differs.
+
+        Args:
+            generation (int): The update generation when the saved state was painted.
+        """
+        lms_data = telnet_handler.fetch_status()
+        if lms_data is None:
+            log_message("Live status not available, showing the last known state.", LOG_LEVEL_WARNING)
+            return
+        if not self.update_ui_since(lms_data, generation):
+            log_message("Dropped the reconcile status, an event update was painted meanwhile", LOG_LEVEL_DEBUG)
 
     def update_ui(self, lms_data):
         """
-        Update the UI based on the LMS data received.
+        Update the sections of the UI whose data changed. Called for each event.
         
         Args:
             lms_data (dict): The LMS data received from the telnet handler.
         """
-        update_now_playing(self.el, lms_data)
-        update_playlist(self.el, lms_data)
+        with self.update_lock:
+            self.update_generation += 1
+            self.paint(lms_data)
+
+    def update_ui_since(self, lms_data, generation):
+        """
+        Update the UI with data the window fetched itself, unless an event was painted since the fetch started.
+
+        Args:
+            lms_data (dict): The LMS data fetched, or None if it could not be fetched.
+            generation (int): The update generation when the fetch started.
+
+        Returns:
+            bool: True if the data was painted, False if it was out of date.
+        """
+        with self.update_lock:
+            if self.update_generation != generation:
+                return False
+            self.paint(lms_data)
+            return True
+
+    def paint(self, lms_data):
+        """
+        Repaint the sections whose data changed. Caller must hold the update lock.
+
+        Args:
+            lms_data (dict): The LMS data to show.
+        """
+        sections = status_fingerprint.changed_sections(lms_data)
+        artwork = None
+        if SECTION_NOW_PLAYING in sections or SECTION_PROGRESS in sections:
+            artwork = update_now_playing(self.el, lms_data, repaint=SECTION_NOW_PLAYING in sections)
+        if SECTION_PLAYLIST in sections:
+            update_playlist(self.el, lms_data)
+        if SECTION_NOW_PLAYING in sections or SECTION_PLAYLIST in sections:
+            state_snapshot.record(lms_data, artwork)
+        latency_overlay.refresh()  # Shows the summary up to the previous event; this one finishes after the update
 
     def onClick(self, controlId):
         pass
@@ -63,4 +183,8 @@ class NowPlaying(xbmcgui.WindowXML):
         if action == xbmcgui.ACTION_PREVIOUS_MENU or action == xbmcgui.ACTION_NAV_BACK:
             shutdown_addon()
             self.close()
+        elif action in PLAYLIST_SCROLL_ACTIONS and self.getFocusId() == CONTROL_ID_PLAYLIST:
+            playlist_pager.on_scroll()
+        elif action == LATENCY_OVERLAY_ACTION:
+            latency_overlay.toggle()
 
@@ -0,0 +1,288 @@
+import threading
+from collections import OrderedDict
+from resources.lib.api.telnet_handler import telnet_handler
+from resources.lib.api.lms_data_processing import get_playlist
+from resources.lib.ui.playlist_view import playlist_view
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.constants import (
+    LMS_RESULT_KEY,
+    LMS_PLAYLIST_LOOP_KEY,
+    LMS_PLAYLIST_TRACKS_KEY,
+    LMS_PLAYLIST_CUR_INDEX_KEY,
+    LMS_PLAYLIST_TIMESTAMP_KEY,
+    LOG_LEVEL_DEBUG,
+    LOG_LEVEL_WARNING,
+    PLAYLIST_PAGE_SIZE,
+    PLAYLIST_WINDOW_PAGES,
+    PLAYLIST_PAGE_CACHE_SIZE,
+    PLAYLIST_SCROLL_MARGIN
+)
+
+class PlaylistPager:
+    """
+    Windowed loading of the playlist around the visible scroll position.
+
+    The control only ever holds a window of at most PLAYLIST_WINDOW_PAGES pages.
+    While the window follows the current track, the rows of the regular status
+    update are shown as they are. When the selection gets close to either edge of
+    the window, the neighbouring page is requested with a fixed-size status query
+    and the page furthest away is dropped, so memory use and request size stay the
+    same however long the queue is. Loaded pages are kept in a small LRU cache,
+    which is cleared whenever the playlist timestamp shows the queue was edited.
+    Pages are requested without holding the lock, so a status update can be shown
+    while a page loads; a load overtaken by a newer update is dropped.
+    """
+
+    def __init__(self, page_size=PLAYLIST_PAGE_SIZE, window_pages=PLAYLIST_WINDOW_PAGES, cache_pages=PLAYLIST_PAGE_CACHE_SIZE):
+        self.page_size = page_size
+        self.window_rows = window_pages * page_size
+        self.cache_pages = cache_pages
+        self.lock = threading.RLock()  # Status updates and scrolling arrive on different threads
+        self.pages = OrderedDict()  # page number -> playlist_loop rows, least recently used first
+        self.control = None
+        self.total = 0
+        self.current_index = 0
+        self.timestamp = None
+        self.window_start = 0  # Playlist index of the first row in the control
+        self.window_end = 0  # Playlist index after the last row in the control
+        self.following = True  # Whether the window is anchored at the current track
+        self.resync = False  # Select the current track on the next update
+        self.generation = 0  # Counts status updates and resets, so a page load can tell it was overtaken
+
+        # Counters
+        self.pages_loaded = 0
+        self.page_hits = 0
+        self.page_evictions = 0
+
+    def on_status(self, control, lms_data):
+        """
+        Update the playlist control from a status update.
+
+        Args:
+            control (xbmcgui.ControlList): The playlist control.
+            lms_data (dict): The LMS status data.
+
+        Returns:
+            int: The number of rows shown, or None if the control was not updated.
+        """
+        try:
+            result = lms_data[LMS_RESULT_KEY]
+        except (KeyError, TypeError):
+            return None
+
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            self.control = control
+            self.check_timestamp(result.get(LMS_PLAYLIST_TIMESTAMP_KEY))
+            self.total = int(result.get(LMS_PLAYLIST_TRACKS_KEY) or 0)
+            self.current_index = int(result.get(LMS_PLAYLIST_CUR_INDEX_KEY) or 0)
+
+            if self.following:
+                rows = result.get(LMS_PLAYLIST_LOOP_KEY, [])
+                self.window_start = self.current_index
+                self.window_end = self.current_index + len(rows)
+                return self.show(rows)
+
+            # Keep the browsed window, trimmed to the current playlist length
+            self.window_end = min(self.window_end, self.total)
+            self.window_start = min(self.window_start, self.window_end)
+            start, end = self.window_start, self.window_end
+            missing = self.missing_pages(start, end)
+
+        if not self.load_pages(missing, generation):
+            return None
+        with self.lock:
+            if generation != self.generation:
+                return None  # A newer update has shown the window meanwhile
+            rows = self.rows_for_window(start, end)
+            return None if rows is None else self.show(rows)
+
+    def on_scroll(self):
+        """
+        Load the neighbouring page when the selection is close to an edge of the window.
+        Called after a navigation action in the playlist control.
+        """
+        with self.lock:
+            control = self.control
+            if control is None or not self.total:
+                return
+            position = control.getSelectedPosition()
+            if position < 0:
+                return
+            selected_index = self.window_start + position
+
+            if position >= control.size() - PLAYLIST_SCROLL_MARGIN and self.window_end < self.total:
+                new_end = min(self.total, (self.window_end // self.page_size + 1) * self.page_size)
+                new_start = max(self.window_start, new_end - self.window_rows)
+            elif position < PLAYLIST_SCROLL_MARGIN and self.window_start > 0:
+                new_start = (self.window_start - 1) // self.page_size * self.page_size
+                new_end = min(self.window_end, new_start + self.window_rows)
+            else:
+                # Follow the current track again once the selection is back on it
+                following = self.window_start == self.current_index or selected_index == self.current_index
+                self.resync = following and not self.following
+                self.following = following
+                return
+            generation = self.generation
+            missing = self.missing_pages(new_start, new_end)
+
+        # Pages are fetched without the lock, so status updates are not held up by the request
+        if not self.load_pages(missing, generation):
+            return
+        with self.lock:
+            if generation != self.generation:
+                log_message("Dropped a playlist page load, a newer status arrived meanwhile", LOG_LEVEL_DEBUG)
+                return
+            rows = self.rows_for_window(new_start, new_end)
+            if rows is None:
+                return
+            self.window_start = new_start
+            self.window_end = new_start + len(rows)
+            self.following = False
+            self.resync = False
+            self.render(rows)
+            control.selectItem(selected_index - new_start)
+
+    def show(self, rows):
+        """
+        Show the rows of the window, selecting the current track if a resync is due. Caller must hold the lock.
+
+        Args:
+            rows (list): The playlist_loop rows of the window.
+
+        Returns:
+            int: The number of rows shown.
+        """
+        self.render(rows)
+        if self.resync:
+            self.control.selectItem(0)
+            self.resync = False
+        return len(rows)
+
+    def check_timestamp(self, timestamp):
+        """
+        Drop the cached pages if the playlist changed since they were loaded. Caller must hold the lock.
+
+        Args:
+            timestamp (float): The playlist timestamp reported by LMS.
+        """
+        if timestamp is not None and timestamp != self.timestamp:
+            self.pages.clear()
+            self.timestamp = timestamp
+
+    def missing_pages(self, start, end):
+        """
+        Return the pages of a window that are not cached. Caller must hold the lock.
+
+        Args:
+            start (int): The playlist index of the first row.
+            end (int): The playlist index after the last row.
+
+        Returns:
+            list: The page numbers to load.
+        """
+        if end <= start:
+            return []
+        pages = range(start // self.page_size, (end - 1) // self.page_size + 1)
+        missing = [page for page in pages if page not in self.pages]
+        self.page_hits += len(pages) - len(missing)
+        return missing
+
+    def rows_for_window(self, start, end):
+        """
+        Collect the rows of a window from the page cache. Caller must hold the lock.
+
+        Args:
+            start (int): The playlist index of the first row.
+            end (int): The playlist index after the last row.
+
+        Returns:
+            list: The playlist_loop rows, or None if a page is not cached.
+        """
+        if end <= start:
+            return []
+        first_page = start // self.page_size
+        rows = []
+        for page in range(first_page, (end - 1) // self.page_size + 1):
+            page_rows = self.pages.get(page)
+            if page_rows is None:
+                return None
+            self.pages.move_to_end(page)
+            rows.extend(page_rows)
+        offset = start - first_page * self.page_size
+        return rows[offset:offset + end - start]
+
+    def load_pages(self, pages, generation):
+        """
+        Fetch pages from LMS and add them to the cache. Called without the lock, which is
+        only taken to store the pages; they are dropped if a newer status arrived meanwhile.
+
+        Args:
+            pages (list): The page numbers to load.
+            generation (int): The status generation the pages are loaded for.
+
+        Returns:
+            bool: True if every page was loaded, False otherwise.
+        """
+        for page in pages:
+            lms_data = telnet_handler.fetch_playlist_page(page * self.page_size, self.page_size)
+            try:
+                result = lms_data[LMS_RESULT_KEY]
+            except (KeyError, TypeError):
+                log_message(f"Failed to load playlist page {page}", LOG_LEVEL_WARNING)
+                return False
+
+            with self.lock:
+                if generation != self.generation:
+                    return False
+                self.check_timestamp(result.get(LMS_PLAYLIST_TIMESTAMP_KEY))
+                self.pages[page] = result.get(LMS_PLAYLIST_LOOP_KEY, [])
+                self.pages_loaded += 1
+                while len(self.pages) > self.cache_pages:
+                    self.pages.popitem(last=False)
+                    self.page_evictions += 1
+        return True
+
+    def render(self, rows):
+        """
+        Show the rows of the window in the control. Caller must hold the lock.
+
+        Args:
+            rows (list): The playlist_loop rows of the window.
+        """
+        playlist_view.apply(self.control, get_playlist({LMS_RESULT_KEY: {LMS_PLAYLIST_LOOP_KEY: rows}}))
+
+    def reset(self):
+        """
+        Forget the window and cached pages, e.g. when the window is reopened.
+        """
+        with self.lock:
+            self.generation += 1
+            self.pages.clear()
+            self.control = None
+            self.timestamp = None
+            self.window_start = self.window_end = 0
+            self.following = True
+            self.resync = False
+        playlist_view.reset()
+
+    def stats(self):
+        """
+        Return the paging counters.
+
+        Returns:
+            dict: Pages loaded, cache hits and evictions, and the current window.
+        """
+        with self.lock:
+            return {
+                'pages_loaded': self.pages_loaded,
+                'page_hits': self.page_hits,
+                'page_evictions': self.page_evictions,
+                'cached_pages': len(self.pages),
+                'window': (self.window_start, self.window_end),
+                'total': self.total
+            }
+
+# Instantiate the PlaylistPager class
+playlist_pager = PlaylistPager()
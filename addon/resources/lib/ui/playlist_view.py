@@ -0,0 +1,221 @@
+import xbmcgui
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.constants import LISTITEM_ID_PREFIX, LOG_LEVEL_DEBUG
+
+class PlaylistView:
+    """
+    View model for the playlist control that applies playlist updates as minimal changes.
+
+    The rows currently shown are remembered by track identity. A new playlist is
+    compared against them: when the head of the list moved (the usual track change),
+    the rows that scrolled out are removed and only the new tail is appended; rows
+    that changed in place are relabelled on their existing ListItem. The control is
+    only reset and rebuilt, in one batched addItems call, when it is out of sync.
+    """
+
+    def __init__(self):
+        self.control = None
+        self.rows = []  # (identity, fields) for each row in the control
+
+        # Counters
+        self.updates = 0
+        self.full_rebuilds = 0
+        self.items_created = 0
+        self.items_relabelled = 0
+        self.items_removed = 0
+        self.last_created = 0
+
+    @staticmethod
+    def track_identity(item):
+        """
+        Return the identity of a playlist entry.
+
+        Args:
+            item (TrackRecord): The playlist entry.
+
+        Returns:
+            tuple: The track ID and playlist position, or the labels if no ID is known.
+        """
+        if item.id is not None:
+            return (item.id, item.playlist_index)
+        return (item.title, item.artist, item.album)
+
+    @staticmethod
+    def row_fields(item):
+        """
+        Return the fields of a playlist entry that are shown in the control.
+
+        Args:
+            item (TrackRecord): The playlist entry.
+
+        Returns:
+            tuple: The title, artist and album.
+        """
+        return (item.title, item.artist, item.album)
+
+    def apply(self, control, playlist_data):
+        """
+        Bring the control in line with the playlist using as few ListItem operations as possible.
+
+        Args:
+            control (xbmcgui.ControlList): The playlist control.
+            playlist_data (list): The TrackRecord of each playlist entry to show.
+
+        Returns:
+            int: The number of ListItems created for this update.
+        """
+        new_rows = [(self.track_identity(item), self.row_fields(item)) for item in playlist_data]
+        self.updates += 1
+        created = 0
+
+        if control is not self.control or control.size() != len(self.rows):
+            created = self.rebuild(control, new_rows)
+        elif new_rows != self.rows:
+            shift = self.find_head_shift(new_rows)
+            if shift:
+                for _ in range(shift):
+                    control.removeItem(0)
+                self.items_removed += shift
+                del self.rows[:shift]
+                self.renumber(control, 0, len(self.rows))
+            created = self.patch(control, new_rows)
+
+        self.last_created = created
+        self.items_created += created
+        log_message("Playlist updated: %d ListItems created, %d rows", LOG_LEVEL_DEBUG, created, len(new_rows))
+        return created
+
+    def find_head_shift(self, new_rows):
+        """
+        Find how many rows scrolled out at the head, i.e. the smallest k > 0 for which
+        the remaining old rows are a prefix of the new rows.
+
+        Args:
+            new_rows (list): The (identity, fields) rows of the new playlist.
+
+        Returns:
+            int: The number of rows to remove from the head, or 0 if the lists are not a head shift.
+        """
+        old_ids = [identity for identity, _ in self.rows]
+        new_ids = [identity for identity, _ in new_rows]
+        if not new_ids or old_ids[:1] == new_ids[:1]:
+            return 0
+        for shift in range(1, len(old_ids)):
+            if old_ids[shift] == new_ids[0] and old_ids[shift:] == new_ids[:len(old_ids) - shift]:
+                return shift
+        return 0
+
+    def patch(self, control, new_rows):
+        """
+        Relabel changed rows in place, then append or remove rows at the tail.
+
+        Args:
+            control (xbmcgui.ControlList): The playlist control.
+            new_rows (list): The (identity, fields) rows of the new playlist.
+
+        Returns:
+            int: The number of ListItems created.
+        """
+        for index in range(min(len(self.rows), len(new_rows))):
+            if self.rows[index] != new_rows[index]:
+                self.fill_list_item(control.getListItem(index), new_rows[index][1], index)
+                self.items_relabelled += 1
+
+        # Remove surplus rows from the end so the remaining indices stay valid
+        for index in range(len(self.rows) - 1, len(new_rows) - 1, -1):
+            control.removeItem(index)
+            self.items_removed += 1
+
+        new_items = [self.create_list_item(fields, index) for index, (_, fields) in enumerate(new_rows) if index >= len(self.rows)]
+        if new_items:
+            control.addItems(new_items)
+
+        self.rows = new_rows
+        return len(new_items)
+
+    def rebuild(self, control, new_rows):
+        """
+        Reset the control and add all rows in one batch.
+
+        Args:
+            control (xbmcgui.ControlList): The playlist control.
+            new_rows (list): The (identity, fields) rows of the new playlist.
+
+        Returns:
+            int: The number of ListItems created.
+        """
+        control.reset()
+        control.addItems([self.create_list_item(fields, index) for index, (_, fields) in enumerate(new_rows)])
+        self.control = control
+        self.rows = new_rows
+        self.full_rebuilds += 1
+        return len(new_rows)
+
+    def renumber(self, control, start, end):
+        """
+        Update the position property of rows whose index changed.
+
+        Args:
+            control (xbmcgui.ControlList): The playlist control.
+            start (int): The first row to update.
+            end (int): The row after the last row to update.
+        """
+        for index in range(start, end):
+            control.getListItem(index).setProperty("id", str(LISTITEM_ID_PREFIX + index))
+
+    def create_list_item(self, fields, index):
+        """
+        Create a ListItem for a playlist row.
+
+        Args:
+            fields (tuple): The title, artist and album.
+            index (int): The row position.
+
+        Returns:
+            xbmcgui.ListItem: The new ListItem.
+        """
+        li = xbmcgui.ListItem(label=fields[0], offscreen=True)
+        self.fill_list_item(li, fields, index)
+        return li
+
+    def fill_list_item(self, li, fields, index):
+        """
+        Set the label, position property and music info of a ListItem.
+
+        Args:
+            li (xbmcgui.ListItem): The ListItem to fill.
+            fields (tuple): The title, artist and album.
+            index (int): The row position.
+        """
+        title, artist, album = fields
+        li.setLabel(title)
+        li.setProperty("id", str(LISTITEM_ID_PREFIX + index))
+        info_tag = li.getMusicInfoTag()
+        info_tag.setAlbum(album)
+        info_tag.setArtist(artist)
+
+    def reset(self):
+        """
+        Forget the rows shown, forcing a full rebuild on the next update (e.g. after the window is reopened).
+        """
+        self.control = None
+        self.rows = []
+
+    def stats(self):
+        """
+        Return the update counters.
+
+        Returns:
+            dict: Update, rebuild, created, relabelled and removed counts, and the items created by the last update.
+        """
+        return {
+            'updates': self.updates,
+            'full_rebuilds': self.full_rebuilds,
+            'items_created': self.items_created,
+            'items_relabelled': self.items_relabelled,
+            'items_removed': self.items_removed,
+            'last_created': self.last_created
+        }
+
+# Instantiate the PlaylistView class
+playlist_view = PlaylistView()
@@ -0,0 +1,117 @@
+import threading
+from resources.lib.utils.playback_clock import PlaybackClock, format_duration
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.constants import LOG_LEVEL_WARNING, PROGRESS_TICK_INTERVAL
+
+class ProgressDisplay:
+    """
+    Drives the progress bar and the elapsed/remaining label from the local playback clock.
+
+    Status updates only re-anchor the clock; a ticker thread redraws the controls on
+    every whole second of playback, and sleeps without waking while playback is
+    paused or stopped, so position updates never cost a status request.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.el = None
+        self.thread = None
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.last_label = None
+        self.last_percent = None
+        self.redraws = 0
+
+    def start(self, el):
+        """
+        Start the ticker thread for the given UI elements, if it is not running yet.
+
+        Args:
+            el (UIElements): The object containing the UI elements.
+        """
+        self.el = el
+        self.last_label = self.last_percent = None
+        if self.thread is not None and self.thread.is_alive():
+            self.wake.set()
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name="klms-progress")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def on_status(self, now_playing_data):
+        """
+        Re-anchor the clock at the position reported in a status update.
+
+        Args:
+            now_playing_data (StatusRecord): The 'now playing' data, or None if nothing is playing.
+        """
+        if now_playing_data is None:
+            self.clock.stop()
+        else:
+            self.clock.sync(
+                now_playing_data.time,
+                now_playing_data.duration,
+                now_playing_data.mode,
+                now_playing_data.rate,
+                track_key=(now_playing_data.track.id, now_playing_data.track.title),
+                received_at=now_playing_data.received_at
+            )
+        self.wake.set()
+
+    def run(self):
+        """
+        Thread entry point: redraw on each whole second while playing, wait for a status update otherwise.
+        """
+        while not self.stopped.is_set():
+            self.wake.clear()
+            try:
+                self.redraw()
+            except Exception as e:
+                log_message(f"Failed to update playback progress: {e}", LOG_LEVEL_WARNING)
+
+            if self.clock.is_running():
+                position, _ = self.clock.position()
+                self.wake.wait(max(0.05, PROGRESS_TICK_INTERVAL - position % PROGRESS_TICK_INTERVAL))
+            else:
+                self.wake.wait()  # Frozen: nothing to redraw until the next status update
+
+    def redraw(self):
+        """
+        Update the progress bar and the elapsed/remaining label if their values changed.
+        """
+        el = self.el
+        if el is None or el.progress is None or el.elapsed is None:
+            return
+
+        position, duration = self.clock.position()
+        if duration:
+            label = f"{format_duration(position)} / -{format_duration(duration - position)}"
+            percent = round(position * 100.0 / duration, 1)
+        else:
+            label = format_duration(position)  # Streams have no duration
+            percent = 0.0
+
+        if label != self.last_label:
+            el.elapsed.setLabel(label)
+            self.last_label = label
+            self.redraws += 1
+        if percent != self.last_percent:
+            el.progress.setPercent(percent)
+            self.last_percent = percent
+
+    def stop(self, timeout=2):
+        """
+        Stop the ticker thread.
+
+        Args:
+            timeout (float): The maximum time to wait for the thread in seconds.
+        """
+        self.stopped.set()
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+# Instantiate the ProgressDisplay class
+progress_display = ProgressDisplay(PlaybackClock())
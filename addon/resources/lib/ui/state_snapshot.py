@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.constants import (
+    LMS_MODE_KEY,
+    LMS_PLAYER_ID_KEY,
+    LMS_RESULT_KEY,
+    LOG_LEVEL_DEBUG,
+    LOG_LEVEL_WARNING,
+    PLAYBACK_MODE_PAUSE,
+    PLAYBACK_MODE_PLAY,
+    STATE_SNAPSHOT_FILE,
+    STATE_SNAPSHOT_MAX_AGE,
+    STATE_SNAPSHOT_RESULT_KEYS,
+    STATE_SNAPSHOT_WRITE_DELAY
+)
+
+class StateSnapshot:
+    """
+    Keeps the last rendered state of the NowPlaying window in the addon profile, so the
+    window can paint it as soon as it opens, before the first status request returns.
+
+    The snapshot holds the status fields the window shows, the playlist rows around the
+    current track and the local path of the artwork that was on screen. It is only
+    recorded when the track or the playlist changed, not on position updates, and a
+    change waits STATE_SNAPSHOT_WRITE_DELAY before it is written, so a burst of track
+    changes is written once. Writes go to a temporary file that then replaces the
+    snapshot, so it is never left truncated. A snapshot of another player, or one older
+    than STATE_SNAPSHOT_MAX_AGE, is not shown.
+    """
+
+    def __init__(self, write_delay=STATE_SNAPSHOT_WRITE_DELAY):
+        self.write_delay = write_delay
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # The timer and a flush at shutdown may write at the same time
+        self.path = None
+        self.player_id = None
+        self.artwork = None  # The artwork path last shown
+        self.pending = None  # The state waiting to be written
+        self.timer = None
+        self.counts = {'loads': 0, 'records': 0, 'writes': 0, 'coalesced': 0}
+
+    def load(self, settings, profile_dir):
+        """
+        Read the snapshot of the configured player.
+
+        Args:
+            settings (dict): The addon settings.
+            profile_dir (str): The directory of the snapshot file.
+
+        Returns:
+            tuple: The status data to paint and the path of the artwork shown with it (None if
+                   the file is gone), or None if there is no usable snapshot.
+        """
+        self.path = os.path.join(profile_dir, STATE_SNAPSHOT_FILE)
+        self.player_id = settings.get(LMS_PLAYER_ID_KEY)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(stored, dict) or stored.get('player_id') != self.player_id:
+            return None
+        if not 0 <= time.time() - stored.get('saved_at', 0) < STATE_SNAPSHOT_MAX_AGE:
+            return None
+        result = stored.get(LMS_RESULT_KEY)
+        if not isinstance(result, dict):
+            return None
+
+        # The position is out of date: show it without advancing the clock until live data arrives
+        if result.get(LMS_MODE_KEY) == PLAYBACK_MODE_PLAY:
+            result[LMS_MODE_KEY] = PLAYBACK_MODE_PAUSE
+        artwork = stored.get('artwork')
+        with self.lock:
+            self.artwork = artwork
+        self.counts['loads'] += 1
+        log_message("Loaded state snapshot saved %.0f s ago", LOG_LEVEL_DEBUG, time.time() - stored['saved_at'])
+        return {LMS_RESULT_KEY: result}, artwork if artwork and os.path.isfile(artwork) else None
+
+    def record(self, lms_data, artwork=None):
+        """
+        Remember the state just painted and schedule writing it.
+
+        Args:
+            lms_data (dict): The LMS status data that was painted.
+            artwork (str): The artwork path shown, or None if the artwork was not repainted.
+        """
+        if self.path is None:
+            return
+        try:
+            result = lms_data[LMS_RESULT_KEY]
+        except (KeyError, TypeError):
+            return  # Keep the last good state while the server is unreachable
+
+        state = {key: result[key] for key in STATE_SNAPSHOT_RESULT_KEYS if key in result}
+        with self.lock:
+            if artwork is not None:
+                self.artwork = artwork
+            if self.pending is not None:
+                self.counts['coalesced'] += 1
+            self.pending = {'player_id': self.player_id, 'artwork': self.artwork, LMS_RESULT_KEY: state}
+            self.counts['records'] += 1
+            if self.timer is None:
+                self.timer = threading.Timer(self.write_delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """
+        Write the pending state, if there is one. Called by the write timer and at shutdown.
+        """
+        with self.lock:
+            state, self.pending = self.pending, None
+            timer, self.timer = self.timer, None
+        if timer is not None:
+            timer.cancel()  # Does nothing when called from the timer itself
+        if state is None:
+            return
+
+        state['saved_at'] = time.time()
+        temp_path = self.path + '.tmp'
+        with self.write_lock:
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, separators=(',', ':'))
+                os.replace(temp_path, self.path)
+                self.counts['writes'] += 1
+            except OSError as e:
+                log_message(f"Failed to save the state snapshot: {e}", LOG_LEVEL_WARNING)
+
+    def stats(self):
+        """
+        Return the snapshot counters.
+
+        Returns:
+            dict: Snapshots loaded, states recorded, files written and records merged into a later write.
+        """
+        with self.lock:
+            return dict(self.counts)
+
+# Instantiate the StateSnapshot class
+state_snapshot = StateSnapshot()
@@ -0,0 +1,149 @@
+import threading
+from resources.lib.utils.constants import (
+    LMS_RESULT_KEY,
+    LMS_PLAYLIST_LOOP_KEY,
+    LMS_PLAYLIST_TIMESTAMP_KEY,
+    LMS_PLAYLIST_TRACKS_KEY,
+    LMS_PLAYLIST_CUR_INDEX_KEY,
+    LMS_TRACK_ID_KEY,
+    LMS_COVER_ID_KEY,
+    LMS_ARTWORK_URL_KEY,
+    LMS_TIME_KEY,
+    LMS_MODE_KEY,
+    LMS_RATE_KEY,
+    STATUS_RECEIVED_AT_KEY
+)
+
+# UI sections that can be updated independently
+SECTION_NOW_PLAYING = "now_playing"  # Labels and artwork of the current track
+SECTION_PROGRESS = "progress"        # Playback clock
+SECTION_PLAYLIST = "playlist"        # Playlist control
+ALL_SECTIONS = frozenset((SECTION_NOW_PLAYING, SECTION_PROGRESS, SECTION_PLAYLIST))
+
+class StatusFingerprint:
+    """
+    Remembers a small fingerprint of each UI section's input, so a status update
+    only repaints the sections whose data actually changed.
+
+    Duplicate notifications (a repeated 'newsong', sync-group echoes) produce the
+    same fingerprints and are skipped without parsing the status or touching a control.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fingerprints = {}
+
+        # Counters
+        self.checks = 0
+        self.full_skips = 0
+        self.section_updates = dict.fromkeys(ALL_SECTIONS, 0)
+        self.section_skips = dict.fromkeys(ALL_SECTIONS, 0)
+
+    @staticmethod
+    def compute(result):
+        """
+        Compute the fingerprint of each section from a status result.
+
+        Args:
+            result (dict): The 'result' part of the status response.
+
+        Returns:
+            dict: The fingerprint of each section.
+        """
+        playlist_loop = result.get(LMS_PLAYLIST_LOOP_KEY) or []
+        current = playlist_loop[0] if playlist_loop else {}
+        return {
+            SECTION_NOW_PLAYING: (
+                result.get(LMS_PLAYLIST_CUR_INDEX_KEY),
+                current.get(LMS_TRACK_ID_KEY),
+                current.get('title'),
+                current.get('artist'),
+                current.get('album'),
+                current.get(LMS_COVER_ID_KEY),
+                current.get(LMS_ARTWORK_URL_KEY)
+            ),
+            SECTION_PROGRESS: (
+                result.get(LMS_MODE_KEY),
+                result.get(LMS_RATE_KEY),
+                result.get(LMS_TIME_KEY),
+                current.get('duration'),
+                result.get(STATUS_RECEIVED_AT_KEY)
+            ),
+            SECTION_PLAYLIST: (
+                result.get(LMS_PLAYLIST_TIMESTAMP_KEY),
+                result.get(LMS_PLAYLIST_TRACKS_KEY),
+                result.get(LMS_PLAYLIST_CUR_INDEX_KEY),
+                tuple((item.get(LMS_TRACK_ID_KEY), item.get('title')) for item in playlist_loop)
+            )
+        }
+
+    def changed_sections(self, lms_data):
+        """
+        Return the sections whose data changed since the last update and remember the new fingerprints.
+
+        Args:
+            lms_data (dict): The LMS status data, or None if it could not be fetched.
+
+        Returns:
+            frozenset: The names of the sections to update.
+        """
+        try:
+            result = lms_data[LMS_RESULT_KEY]
+        except (KeyError, TypeError):
+            result = None
+
+        with self.lock:
+            self.checks += 1
+            if result is None:
+                # Nothing to compare: update everything now, and again once data is back
+                self.fingerprints = {}
+                changed = ALL_SECTIONS
+            else:
+                fingerprints = self.compute(result)
+                changed = frozenset(section for section in ALL_SECTIONS if self.fingerprints.get(section) != fingerprints[section])
+                self.fingerprints = fingerprints
+
+            if not changed:
+                self.full_skips += 1
+            for section in ALL_SECTIONS:
+                if section in changed:
+                    self.section_updates[section] += 1
+                else:
+                    self.section_skips[section] += 1
+            return changed
+
+    def reset(self):
+        """
+        Forget the fingerprints, so the next update repaints every section (e.g. when the window is reopened).
+        """
+        with self.lock:
+            self.fingerprints = {}
+
+    def forget(self, section):
+        """
+        Forget the fingerprint of one section, so the next update repaints it.
+
+        Args:
+            section (str): The name of the section.
+        """
+        with self.lock:
+            self.fingerprints.pop(section, None)
+
+    def stats(self):
+        """
+        Return the skip counters.
+
+        Returns:
+            dict: Checks, updates skipped entirely, the skip rate, and updates and skips per section.
+        """
+        with self.lock:
+            return {
+                'checks': self.checks,
+                'full_skips': self.full_skips,
+                'skip_rate': self.full_skips / self.checks if self.checks else 0.0,
+                'section_updates': dict(self.section_updates),
+                'section_skips': dict(self.section_skips)
+            }
+
+# Instantiate the StatusFingerprint class
+status_fingerprint = StatusFingerprint()
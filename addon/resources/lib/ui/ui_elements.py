@@ -6,6 +6,9 @@ class UIElements:
         self.now_playing_artist = None
         self.now_playing_album = None
         self.playlist = None
+        self.progress = None
+        self.elapsed = None
+        self.latency_overlay = None
 
 # Instantiate the UIElements class
 ui_elements = UIElements()
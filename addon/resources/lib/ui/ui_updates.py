@@ -1,29 +1,44 @@
-import xbmcgui
+from resources.lib.ui.playlist_pager import playlist_pager
+from resources.lib.ui.progress_display import progress_display
 from resources.lib.api.lms_data_processing import get_now_playing, get_playlist
+from resources.lib.api.artwork_cache import get_artwork_cache
+from resources.lib.api.artwork_prefetcher import get_artwork_prefetcher
 from resources.lib.utils.log_message import log_message
+from resources.lib.utils.latency_tracer import latency_tracer, STAGE_PAINTED
 from resources.lib.utils.constants import (
     LOG_LEVEL_WARNING,
-    DEFAULT_ARTWORK_PATH,
-    LISTITEM_ID_PREFIX
+    DEFAULT_ARTWORK_PATH
 )
 
-def update_now_playing(el, lms_data):
+def update_now_playing(el, lms_data, repaint=True, artwork=None):
     """
     Update the 'now playing' UI elements with the current track's information.
     
     Args:
         el (UIElements): The object containing the UI elements.
         lms_data (dict): The LMS data to use for updating the UI.
+        repaint (bool): Whether to update the labels and artwork, or only the playback clock.
+        artwork (str): The artwork to show instead of resolving the track's artwork, e.g. a saved local path.
+
+    Returns:
+        str: The artwork shown for the track, or None if no track artwork was painted.
     """
     now_playing_data = get_now_playing(lms_data)
+    progress_display.on_status(now_playing_data)
+    if not repaint:
+        return None
     
     if now_playing_data:
         set_now_playing_labels(el, now_playing_data)
-        set_now_playing_artwork(el, now_playing_data['artwork_url'])
-    else:
-        log_message("No 'now playing' information available.", LOG_LEVEL_WARNING)
-        clear_now_playing_labels(el)
-        set_default_artwork(el)
+        if artwork is None:
+            artwork = resolve_artwork(now_playing_data.track.artwork_url, now_playing_data.track.cover_id)
+        set_now_playing_artwork(el, artwork)
+        latency_tracer.mark(STAGE_PAINTED)
+        return artwork
+    log_message("No 'now playing' information available.", LOG_LEVEL_WARNING)
+    clear_now_playing_labels(el)
+    set_default_artwork(el)
+    return None
 
 def update_playlist(el, lms_data):
     """
@@ -36,7 +51,8 @@ def update_playlist(el, lms_data):
     playlist_data = get_playlist(lms_data)
     
     if playlist_data:
-        update_playlist_items(el, playlist_data)
+        update_playlist_items(el, lms_data)
+        get_artwork_prefetcher().prefetch(playlist_data)  # Warm the cache for the next tracks
     else:
         log_message("No playlist information available.", LOG_LEVEL_WARNING)
 
@@ -46,11 +62,27 @@ def set_now_playing_labels(el, now_playing_data):
 
     Args:
         el (UIElements): The object containing the UI elements.
-        now_playing_data (dict): The 'now playing' data to use for updating the UI.
+        now_playing_data (StatusRecord): The 'now playing' data to use for updating the UI.
+    """
+    track = now_playing_data.track
+    el.now_playing_title.setLabel(track.title)
+    el.now_playing_artist.setLabel(track.artist)
+    el.now_playing_album.setLabel(track.album)
+
+def resolve_artwork(artwork_url, cover_id):
     """
-    el.now_playing_title.setLabel(now_playing_data['title'])
-    el.now_playing_artist.setLabel(now_playing_data['artist'])
-    el.now_playing_album.setLabel(now_playing_data['album'])
+    Resolve the artwork URL to a local file through the artwork cache, without waiting for a download.
+
+    Args:
+        artwork_url (str): The URL of the artwork on the LMS server.
+        cover_id (str): The LMS cover ID of the artwork.
+
+    Returns:
+        str: The local path of the cached artwork, or the URL, for Kodi to load, if it is not cached yet.
+    """
+    if not artwork_url:
+        return artwork_url
+    return get_artwork_cache().resolve(artwork_url, cover_id)
 
 def set_now_playing_artwork(el, artwork_url):
     """
@@ -85,23 +117,12 @@ def set_default_artwork(el):
     el.artwork_background.setImage(DEFAULT_ARTWORK_PATH)
     el.artwork.setImage(DEFAULT_ARTWORK_PATH)
 
-def update_playlist_items(el, playlist_data):
+def update_playlist_items(el, lms_data):
     """
-    Update the playlist items in the UI.
+    Update the playlist items in the UI, showing the window around the scroll position.
 
     Args:
         el (UIElements): The object containing the UI elements.
-        playlist_data (list): The playlist data to use for updating the UI.
+        lms_data (dict): The LMS data to use for updating the UI.
     """
-    playlist_control = el.playlist
-    playlist_control.reset()
-    
-    for index, item in enumerate(playlist_data):
-        li = xbmcgui.ListItem(label=item['title'])
-        li.setProperty("id", str(LISTITEM_ID_PREFIX + index))
-        info_tag = li.getMusicInfoTag()
-        info_tag.setAlbum(item['album'])
-        info_tag.setArtist(item['artist'])
-        
-        playlist_control.addItem(li)
-
+    playlist_pager.on_status(el.playlist, lms_data)
@@ -1,10 +1,22 @@
 import xbmc
-from resources.lib.utils.log_message import log_message
+from resources.lib.utils.log_message import log_message, configure_logging
 from resources.lib.api.telnet_handler import telnet_handler
+from resources.lib.api.player_tracker import player_tracker
+from resources.lib.api.lms_servers import server_manager
+from resources.lib.api.server_discovery import server_discovery
 from resources.lib.utils.read_settings import read_settings
 from resources.lib.utils.shutdown_handler import shutdown_addon
+from resources.lib.utils.latency_tracer import latency_tracer
+from resources.lib.utils.trace_recorder import trace_recorder
+from resources.lib.utils.profile_paths import get_profile_dir
 import resources.lib.utils.global_config as global_config
 from resources.lib.utils.constants import (
+    ASYNC_LOGGING_KEY,
+    DASHBOARD_MODE_KEY,
+    LATENCY_TRACING_KEY,
+    LMS_PLAYER_ID_KEY,
+    TRACE_DIR,
+    TRACE_RECORDING_KEY,
     LOG_LEVEL_INFO,
     LOG_LEVEL_ERROR,
     INIT_MSG_START,
@@ -29,10 +41,22 @@ class AddonMonitor(xbmc.Monitor):
         try:
             log_message(INIT_MSG_START, LOG_LEVEL_INFO)
             global_config.settings = read_settings()
+            configure_logging(global_config.settings.get(ASYNC_LOGGING_KEY) == 'true')
+            latency_tracer.enabled = global_config.settings.get(LATENCY_TRACING_KEY) != 'false'
+            if global_config.settings.get(TRACE_RECORDING_KEY) == 'true':
+                trace_recorder.start(get_profile_dir(TRACE_DIR), global_config.settings.get(LMS_PLAYER_ID_KEY))
+            # Connect to the server found by an earlier discovery, if any; failed connects look for it again
+            server_discovery.start(global_config.settings, get_profile_dir(), telnet_handler.retry_connect)
             # Inhibit screensaver to keep the display awake
             xbmc.executebuiltin('InhibitScreensaver(true)')
             # Add other initialization tasks here
+            dashboard_mode = global_config.settings.get(DASHBOARD_MODE_KEY) == 'true'
+            if dashboard_mode:
+                telnet_handler.player_tracker = player_tracker  # Subscribe to the events of every player
             telnet_handler.start_telnet_subscriber()
+            if dashboard_mode:
+                player_tracker.start(telnet_handler)
+                server_manager.start(global_config.settings)  # Additional servers, each with its own subscription
             log_message(INIT_MSG_COMPLETE, LOG_LEVEL_INFO)
         except Exception as e:
             log_message(f"Initialization error: {e}", LOG_LEVEL_ERROR)
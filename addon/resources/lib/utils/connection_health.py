@@ -0,0 +1,158 @@
+import threading
+import time
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.constants import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN_TIME,
+    CIRCUIT_MAX_OPEN_TIME,
+    CIRCUIT_PROBE_TIMEOUT,
+    LOG_LEVEL_INFO,
+    LOG_LEVEL_WARNING
+)
+
+# Circuit states
+STATE_CLOSED = "closed"        # Server reachable, requests go through
+STATE_OPEN = "open"            # Server unreachable, requests fail fast
+STATE_HALF_OPEN = "half_open"  # One probe request is allowed through
+
+class ConnectionHealth:
+    """
+    Circuit breaker that tracks whether the LMS server is reachable.
+
+    Reachability is learned from the outcome of real requests and connection
+    attempts over HTTP and the CLI, instead of probing the port before each request.
+    After CIRCUIT_FAILURE_THRESHOLD consecutive failures the circuit opens and
+    requests fail immediately. Once the open time has passed, a single request is let
+    through as a probe: success closes the circuit, failure opens it again for twice
+    as long, up to CIRCUIT_MAX_OPEN_TIME.
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, open_time=CIRCUIT_OPEN_TIME, max_open_time=CIRCUIT_MAX_OPEN_TIME):
+        self.failure_threshold = failure_threshold
+        self.base_open_time = open_time
+        self.max_open_time = max_open_time
+        self.lock = threading.Lock()
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.open_time = open_time
+        self.retry_at = 0.0  # Monotonic time at which the next probe is allowed
+        self.probe_started = None
+        self.last_error = None
+
+        # Counters
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow_request(self):
+        """
+        Check whether a request may be sent now. In the half-open state only one probe is allowed at a time.
+
+        Returns:
+            bool: True if the request should be sent, False if it should fail fast.
+        """
+        with self.lock:
+            if self.state == STATE_CLOSED:
+                return True
+
+            now = time.monotonic()
+            probe_stuck = self.probe_started is not None and now - self.probe_started > CIRCUIT_PROBE_TIMEOUT
+            if (self.state == STATE_OPEN and now >= self.retry_at) or (self.state == STATE_HALF_OPEN and probe_stuck):
+                self.state = STATE_HALF_OPEN
+                self.probe_started = now
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """
+        Record a request that reached the server, closing the circuit.
+        """
+        with self.lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            if self.state != STATE_CLOSED:
+                log_message("LMS server reachable again, closing circuit.", LOG_LEVEL_INFO)
+            self.state = STATE_CLOSED
+            self.open_time = self.base_open_time
+            self.probe_started = None
+
+    def record_failure(self, error=None):
+        """
+        Record a request that could not reach the server, opening the circuit if needed.
+
+        Args:
+            error (Exception): The error that caused the failure.
+        """
+        with self.lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error) if error is not None else None
+
+            if self.state == STATE_HALF_OPEN:
+                self.open_time = min(self.open_time * 2, self.max_open_time)  # The probe failed: back off further
+            elif self.state == STATE_OPEN or self.consecutive_failures < self.failure_threshold:
+                return
+
+            self.state = STATE_OPEN
+            self.retry_at = time.monotonic() + self.open_time
+            self.probe_started = None
+            self.times_opened += 1
+            log_message(f"LMS server unreachable, opening circuit for {self.open_time:.0f} seconds. Error: {error}", LOG_LEVEL_WARNING)
+
+    def reset(self):
+        """
+        Close the circuit and forget past failures, e.g. after the server address changed.
+        """
+        with self.lock:
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+            self.open_time = self.base_open_time
+            self.probe_started = None
+
+    def time_until_probe(self):
+        """
+        Return how long requests will keep failing fast.
+
+        Returns:
+            float: The number of seconds until the next probe is allowed, 0 if requests are allowed now.
+        """
+        with self.lock:
+            if self.state != STATE_OPEN:
+                return 0.0
+            return max(0.0, self.retry_at - time.monotonic())
+
+    def is_available(self):
+        """
+        Check whether the server is currently considered reachable.
+
+        Returns:
+            bool: True if the circuit is closed, False otherwise.
+        """
+        with self.lock:
+            return self.state == STATE_CLOSED
+
+    def stats(self):
+        """
+        Return the circuit state and counters.
+
+        Returns:
+            dict: The state, failure counts, rejected requests, times opened, the last error and the time until the next probe.
+        """
+        retry_in = self.time_until_probe()
+        with self.lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'successes': self.successes,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened,
+                'last_error': self.last_error,
+                'retry_in': retry_in
+            }
+
+# Shared by the HTTP client and the CLI connection
+connection_health = ConnectionHealth()
@@ -1,5 +1,3 @@
-import xbmc
-
 """
 This module defines constants used throughout the KLMS Addon.
 """
@@ -15,6 +13,19 @@ LMS_SERVER_KEY = "lms_server"
 LMS_PORT_KEY = "lms_port"
 LMS_PLAYER_ID_KEY = "lms_player_id"
 LMS_TELNET_PORT_KEY = "lms_telnet_port"
+LMS_EXTRA_SERVERS_KEY = "lms_extra_servers"
+LMS_DISCOVERY_KEY = "lms_discovery"
+LMS_DEBOUNCE_TIME_KEY = "debounce_time_ms"
+LMS_DEBOUNCE_MAX_WAIT_KEY = "debounce_max_wait_ms"
+LMS_STATUS_TRANSPORT_KEY = "status_transport"
+LMS_EVENT_ENGINE_KEY = "event_engine"
+LMS_CLI_TRANSPORT_KEY = "cli_transport"
+ARTWORK_CACHE_MB_KEY = "artwork_cache_mb"
+ARTWORK_PREFETCH_COUNT_KEY = "artwork_prefetch_count"
+ASYNC_LOGGING_KEY = "async_logging"
+LATENCY_TRACING_KEY = "latency_tracing"
+TRACE_RECORDING_KEY = "trace_recording"
+DASHBOARD_MODE_KEY = "dashboard_mode"
 
 # Default LMS Server Settings
 DEFAULT_LMS_SERVER = "192.168.1.201"
@@ -22,20 +33,75 @@ DEFAULT_LMS_PORT = 9000
 DEFAULT_LMS_PLAYER_ID = "ab:7a:56:8b:fd:0f"
 DEFAULT_LMS_TELNET_PORT = 59090
 
-# Log Levels
-LOG_LEVEL_INFO = xbmc.LOGINFO
-LOG_LEVEL_WARNING = xbmc.LOGWARNING
-LOG_LEVEL_ERROR = xbmc.LOGERROR
+# Server discovery: the LMS answers UDP broadcasts on its SlimProto port. The request is
+# 'e' followed by the tags wanted, each with a zero length; the reply is 'E' followed by
+# each tag with a one-byte length and its value
+DISCOVERY_PORT = 3483
+DISCOVERY_ADDRESS = "255.255.255.255"
+DISCOVERY_REQUEST_TAGS = (b"NAME", b"IPAD", b"JSON", b"CLIP", b"UUID")
+# Seconds to collect replies, and the least time between discoveries triggered by failed connects
+DISCOVERY_TIMEOUT = 1.0
+DISCOVERY_MIN_INTERVAL = 30
+# Discovered server cached in the addon profile, used at startup while younger than the TTL in seconds
+DISCOVERY_CACHE_FILE = "server_discovery.json"
+DISCOVERY_CACHE_TTL = 7 * 24 * 3600
+
+# Log Levels: the values of xbmc.LOGDEBUG to xbmc.LOGERROR since Kodi 19, so that
+# importing the constants does not import xbmc
+LOG_LEVEL_DEBUG = 0
+LOG_LEVEL_INFO = 1
+LOG_LEVEL_WARNING = 2
+LOG_LEVEL_ERROR = 3
 
 # Telnet Commands
 TELNET_SUBSCRIBE_COMMAND = b"subscribe playlist\n"
 TELNET_UNSUBSCRIBE_COMMAND = b"subscribe 0\n"
 
+# CLI notifications that change what the NowPlaying window shows
+REFRESH_EVENT_COMMANDS = frozenset((
+    ("playlist", "newsong"),
+    ("playlist", "pause"),
+    ("playlist", "stop"),
+    ("playlist", "clear"),
+    ("playlist", "delete"),
+    ("playlist", "move"),
+    ("playlist", "addtracks"),
+    ("playlist", "load_done"),
+))
+STATUS_COMMAND = ("status",)
+
+# CLI notifications that add players to, or remove them from, the server's player list
+PLAYER_LIST_EVENT_COMMANDS = frozenset((
+    ("client", "new"),
+    ("client", "disconnect"),
+    ("client", "reconnect"),
+    ("client", "forget"),
+))
+
+# CLI notifications that change a row of the multi-player dashboard
+DASHBOARD_EVENT_COMMANDS = REFRESH_EVENT_COMMANDS | PLAYER_LIST_EVENT_COMMANDS | frozenset((("power",),))
+
+# Dashboard subscription: playlist events plus power and connection changes, for every player
+DASHBOARD_SUBSCRIBE_COMMAND = b"subscribe playlist,power,client\n"
+
 # File Paths
 DEFAULT_ARTWORK_PATH = "special://home/addons/plugin.program.klmsaddon/resources/media/demo-cover.jpg"
 
-# Debounce time in seconds
-DEBOUNCE_TIME = 1.0
+# Artwork cache
+ARTWORK_CACHE_DIR = "artwork"
+ARTWORK_CACHE_INDEX_FILE = "index.json"
+DEFAULT_ARTWORK_CACHE_MB = 100
+ARTWORK_FETCH_TIMEOUT = 5  # Seconds
+ARTWORK_REVALIDATE_INTERVAL = 24 * 60 * 60  # Seconds before a cached image is revalidated
+
+# Artwork prefetch for upcoming playlist entries
+DEFAULT_ARTWORK_PREFETCH_COUNT = 5
+ARTWORK_PREFETCH_WORKERS = 2
+ARTWORK_PREFETCH_CHUNK_SIZE = 16 * 1024  # Bytes read between checks for foreground downloads
+
+# Debounce quiet period and max-wait ceiling in seconds
+DEBOUNCE_TIME = 0.3
+DEBOUNCE_MAX_WAIT = 1.0
 
 # Timeout in seconds for socket connection attempts
 SOCKET_TIMEOUT = 2
@@ -48,6 +114,57 @@ JSON_RPC_PAYLOAD_TEMPLATE = {
     "id": 1
 }
 
+# Status query parameters shared by the JSON-RPC and CLI transports
+STATUS_TAGS = "tags:acdKl"
+STATUS_QUERY_PARAMS = ["status", "-", 10, STATUS_TAGS]
+
+# Multi-player dashboard: the player list comes from one serverstatus request, and each
+# refresh queries the current track of all changed players in one batch
+DASHBOARD_MAX_PLAYERS = 100
+SERVERSTATUS_PARAMS = ["serverstatus", 0, DASHBOARD_MAX_PLAYERS]
+DASHBOARD_STATUS_PARAMS = ["status", "-", 1, "tags:al"]
+
+# Additional servers shown on the dashboard, each with its own connection: the most
+# that are followed, and the worker threads shared by the refreshes of all servers
+MAX_EXTRA_SERVERS = 8
+WORKER_POOL_SIZE = 4
+
+# Status transports
+STATUS_TRANSPORT_HTTP = "http"
+STATUS_TRANSPORT_CLI = "cli"
+STATUS_TRANSPORT_PUSH = "push"
+
+# Status push subscription: 0 pushes on every change, "-" cancels the subscription
+STATUS_SUBSCRIBE_INTERVAL = 0
+STATUS_UNSUBSCRIBE_PARAMS = ["status", "-", 1, "subscribe:-"]
+
+# CLI connection transports
+CLI_TRANSPORT_SOCKET = "socket"
+CLI_TRANSPORT_TELNETLIB = "telnetlib"
+
+# Event engines
+EVENT_ENGINE_THREADS = "threads"
+EVENT_ENGINE_ASYNCIO = "asyncio"
+
+# Leading query parameters echoed in a CLI reply that identify the request it answers
+CLI_REPLY_KEY_PARAMS = 3
+
+# Timeout in seconds for a status query sent over the CLI connection
+CLI_QUERY_TIMEOUT = 2
+
+# Longest CLI line the asyncio engine reads, in bytes; far above a pushed status or a playlist page reply
+CLI_LINE_LIMIT = 4 * 1024 * 1024
+
+# CLI status tags converted to numbers to match the JSON-RPC response
+CLI_INT_FIELDS = frozenset(("id", "playlist index", "playlist_tracks", "playlist_cur_index", "mixer volume", "power"))
+CLI_FLOAT_FIELDS = frozenset(("time", "duration", "rate", "playlist_timestamp"))
+
+# Tagged request parameters the CLI echoes back at the start of a status reply
+CLI_ECHOED_PARAM_KEYS = frozenset(("tags", "subscribe"))
+
+# The 'subscribe:' parameter as echoed in a status push, encoded or not; such lines are never query replies
+CLI_SUBSCRIBE_MARKERS = (b" subscribe%3A", b" subscribe:")
+
 # Content-Type Header
 CONTENT_TYPE_HEADER = {"Content-Type": "application/json"}
 
@@ -55,9 +172,43 @@ CONTENT_TYPE_HEADER = {"Content-Type": "application/json"}
 LMS_RESULT_KEY = "result"
 LMS_PLAYLIST_LOOP_KEY = "playlist_loop"
 LMS_TIME_KEY = "time"
+LMS_PLAYLIST_INDEX_KEY = "playlist index"
+LMS_COVER_ID_KEY = "coverid"
+LMS_TRACK_ID_KEY = "id"
+LMS_PLAYLIST_TRACKS_KEY = "playlist_tracks"
+LMS_PLAYLIST_CUR_INDEX_KEY = "playlist_cur_index"
+LMS_PLAYLIST_TIMESTAMP_KEY = "playlist_timestamp"
+LMS_ARTWORK_URL_KEY = "artwork_url"
+LMS_DURATION_KEY = "duration"
+LMS_MODE_KEY = "mode"
+LMS_RATE_KEY = "rate"
+LMS_PLAYERS_LOOP_KEY = "players_loop"
+LMS_PLAYER_NAME_KEY = "player_name"
+LMS_PLAYER_CONNECTED_KEY = "player_connected"
+LMS_POWER_KEY = "power"
+
+# Artwork path, relative to the LMS server, of tracks without an explicit artwork URL
+LMS_COVER_PATH_TEMPLATE = "/music/{cover_id}/cover.jpg"
 
-# Connection Retry Interval in seconds
-RETRY_INTERVAL = 5
+# Local key added to status snapshots: monotonic time the reported 'time' was received
+STATUS_RECEIVED_AT_KEY = "_received_at"
+
+# Player mode in which the playback position advances
+PLAYBACK_MODE_PLAY = "play"
+PLAYBACK_MODE_PAUSE = "pause"
+
+# Reconnection backoff: delay in seconds before the first retry, the cap on the
+# delay, and how many recovery times are kept for the stats
+RECONNECT_BASE_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30
+RECONNECT_HISTORY_SIZE = 20
+
+# Circuit breaker: consecutive failures before requests fail fast, initial and
+# maximum time in seconds before a probe request, and how long a probe may take
+CIRCUIT_FAILURE_THRESHOLD = 2
+CIRCUIT_OPEN_TIME = 1
+CIRCUIT_MAX_OPEN_TIME = 60
+CIRCUIT_PROBE_TIMEOUT = 30
 
 # Control IDs for UI elements
 CONTROL_ID_ARTWORK_BACKGROUND = 1
@@ -66,6 +217,58 @@ CONTROL_ID_NOW_PLAYING_TITLE = 3
 CONTROL_ID_NOW_PLAYING_ARTIST = 4
 CONTROL_ID_NOW_PLAYING_ALBUM = 5
 CONTROL_ID_PLAYLIST = 6
+CONTROL_ID_PROGRESS = 7
+CONTROL_ID_ELAPSED = 8
+CONTROL_ID_LATENCY_OVERLAY = 9
+
+# Control IDs for the multi-player dashboard
+CONTROL_ID_DASHBOARD_PLAYERS = 20
+CONTROL_ID_DASHBOARD_SUMMARY = 21
+
+# Paged playlist: rows per page, pages kept in the control and in the cache,
+# and how close to the edge of the loaded rows scrolling loads the next page
+PLAYLIST_PAGE_SIZE = 50
+PLAYLIST_WINDOW_PAGES = 3
+PLAYLIST_PAGE_CACHE_SIZE = 6
+PLAYLIST_SCROLL_MARGIN = 5
+
+# Interval in seconds at which the elapsed time is redrawn while playing
+PROGRESS_TICK_INTERVAL = 1.0
+
+# Latency tracing: histogram bucket bounds in milliseconds (0.05 ms to about 3 minutes,
+# each bound sqrt(2) times the previous one) and the percentiles in the summary
+LATENCY_BUCKETS_MS = tuple(0.05 * 2 ** (i / 2) for i in range(44))
+LATENCY_PERCENTILES = (0.5, 0.9, 0.99)
+
+# Trace recording of CLI lines and JSON-RPC responses, in the addon profile
+TRACE_DIR = "traces"
+TRACE_FILE_TEMPLATE = "cli-trace-{timestamp}.jsonl.gz"
+TRACE_FORMAT_VERSION = 1
+TRACE_MAX_RECORDS = 200000
+
+# Cold start, from the first line of default.py to the first render in onInit: the
+# target in milliseconds, the number of slowest imports in the report, and the modules
+# loaded on first use that should not be loaded yet when the window first renders
+COLD_START_TARGET_MS = 300
+STARTUP_REPORT_IMPORTS = 10
+STARTUP_DEFERRED_MODULES = ("requests", "urllib3", "asyncio", "concurrent.futures", "resources.lib.deps.telnetlib")
+
+# Last rendered state of the NowPlaying window, kept in the addon profile and painted when the
+# window opens. Seconds a change waits before it is written, so a burst of changes is written
+# once, and the age in seconds after which the snapshot is no longer shown
+STATE_SNAPSHOT_FILE = "state_snapshot.json"
+STATE_SNAPSHOT_WRITE_DELAY = 2.0
+STATE_SNAPSHOT_MAX_AGE = 30 * 24 * 3600
+# Status fields kept in the snapshot: those the window shows, and the playlist rows around the current track
+STATE_SNAPSHOT_RESULT_KEYS = (
+    LMS_MODE_KEY,
+    LMS_TIME_KEY,
+    LMS_RATE_KEY,
+    LMS_PLAYLIST_TRACKS_KEY,
+    LMS_PLAYLIST_CUR_INDEX_KEY,
+    LMS_PLAYLIST_TIMESTAMP_KEY,
+    LMS_PLAYLIST_LOOP_KEY
+)
 
 # Playlist ListItem Property ID Prefix
 LISTITEM_ID_PREFIX = 100
@@ -85,10 +288,21 @@ TRACEBACK_LOG_MSG = "[KLMS Addon] Traceback: {traceback}"
 LOG_MSG_FORMAT = "[KLMS Addon] {filename}:{lineno} - {message}"
 LOG_ERROR_MSG_FORMAT = "[KLMS Addon] [Error] {error}"
 
+# JSON-RPC request for Kodi's debug logging setting, which decides whether debug messages are written
+KODI_DEBUG_LOGGING_QUERY = '{"jsonrpc": "2.0", "method": "Settings.GetSettingValue", "params": {"setting": "debug.showloginfo"}, "id": 1}'
+
 # Network Constants
+# Status fetches: connect and read deadline per HTTP attempt, and the overall
+# budget in seconds for a fetch, covering retries and the HTTP fallback
+HTTP_CONNECT_TIMEOUT = 1.0
+HTTP_READ_TIMEOUT = 2.0
+STATUS_FETCH_BUDGET = 4.0
 RETRY_COUNT = 3
 BACKOFF_FACTOR = 0.3
 STATUS_FORCE_LIST = (500, 502, 504)
+# Shared HTTP connection pool: hosts kept, one per server, and idle connections kept per host
+HTTP_POOL_HOSTS = MAX_EXTRA_SERVERS + 1
+HTTP_POOL_SIZE = WORKER_POOL_SIZE + 2
 SOCKET_TIMEOUT = 2
 
 # Network Issue Logging Message
@@ -99,6 +313,19 @@ ADDON_SETTING_LMS_SERVER = "lms_server"
 ADDON_SETTING_LMS_PORT = "lms_port"
 ADDON_SETTING_LMS_PLAYER_ID = "lms_player_id"
 ADDON_SETTING_LMS_TELNET_PORT = "lms_telnet_port"
+ADDON_SETTING_LMS_EXTRA_SERVERS = "lms_extra_servers"
+ADDON_SETTING_LMS_DISCOVERY = "lms_discovery"
+ADDON_SETTING_DEBOUNCE_TIME = "debounce_time_ms"
+ADDON_SETTING_DEBOUNCE_MAX_WAIT = "debounce_max_wait_ms"
+ADDON_SETTING_STATUS_TRANSPORT = "status_transport"
+ADDON_SETTING_EVENT_ENGINE = "event_engine"
+ADDON_SETTING_CLI_TRANSPORT = "cli_transport"
+ADDON_SETTING_ARTWORK_CACHE_MB = "artwork_cache_mb"
+ADDON_SETTING_ARTWORK_PREFETCH_COUNT = "artwork_prefetch_count"
+ADDON_SETTING_ASYNC_LOGGING = "async_logging"
+ADDON_SETTING_LATENCY_TRACING = "latency_tracing"
+ADDON_SETTING_TRACE_RECORDING = "trace_recording"
+ADDON_SETTING_DASHBOARD_MODE = "dashboard_mode"
 
 # Settings Error Message
 SETTINGS_ERROR_MSG = "Error reading settings: {error}"
@@ -106,9 +333,6 @@ SETTINGS_ERROR_MSG = "Error reading settings: {error}"
 # NowPlaying Window Filename
 NOW_PLAYING_XML = "NowPlaying.xml"
 
-# Event Queue Timeout in seconds
-EVENT_QUEUE_TIMEOUT = 1
-
-# Batch size for processing events
-BATCH_SIZE = 10
+# Multi-player Dashboard Window Filename
+DASHBOARD_XML = "Dashboard.xml"
 
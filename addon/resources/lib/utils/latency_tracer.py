@@ -0,0 +1,224 @@
+import bisect
+import contextvars
+import threading
+import time
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.constants import (
+    LOG_LEVEL_INFO,
+    LATENCY_BUCKETS_MS,
+    LATENCY_PERCENTILES
+)
+
+# Pipeline stages, in the order an event passes through them
+STAGE_RECEIVED = "received"      # CLI line read from the connection
+STAGE_ENQUEUED = "enqueued"      # Event pushed to the coalescer
+STAGE_DEQUEUED = "dequeued"      # Burst released to the event processor
+STAGE_SENT = "sent"              # Status request sent (CLI or HTTP)
+STAGE_RESPONSE = "response"      # Status response received
+STAGE_PARSED = "parsed"          # Status turned into records
+STAGE_PAINTED = "painted"        # 'Now playing' controls updated
+PIPELINE_STAGES = (STAGE_RECEIVED, STAGE_ENQUEUED, STAGE_DEQUEUED, STAGE_SENT, STAGE_RESPONSE, STAGE_PARSED, STAGE_PAINTED)
+STAGE_TOTAL = "total"            # Received to painted
+
+# The trace of the event being processed by the current thread or asyncio task
+_active_trace = contextvars.ContextVar("klms_active_trace", default=None)
+
+class Trace:
+    """
+    Monotonic timestamps of one event's way through the update pipeline.
+    Only the first time a stage is reached is kept, so retries count towards the stage that follows.
+    """
+
+    __slots__ = ('marks',)
+
+    def __init__(self, received_at):
+        self.marks = {STAGE_RECEIVED: received_at}
+
+    def mark(self, stage):
+        """
+        Record that the event reached a stage.
+
+        Args:
+            stage (str): The pipeline stage.
+        """
+        if stage not in self.marks:
+            self.marks[stage] = time.monotonic()
+
+    def __repr__(self):
+        received = self.marks[STAGE_RECEIVED]
+        return "Trace(" + ", ".join(f"{stage}=+{(self.marks[stage] - received) * 1000:.1f}ms" for stage in PIPELINE_STAGES if stage in self.marks) + ")"
+
+class LatencyHistogram:
+    """
+    Latency distribution in fixed, logarithmically spaced millisecond buckets.
+    Percentiles are reported as the upper bound of the bucket they fall into, capped at the maximum seen.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket holds values above the highest bound
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms):
+        """
+        Add a latency to the histogram.
+
+        Args:
+            value_ms (float): The latency in milliseconds.
+        """
+        self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, fraction):
+        """
+        Return the latency below which the given fraction of the values fall.
+
+        Args:
+            fraction (float): The fraction, e.g. 0.9 for the 90th percentile.
+
+        Returns:
+            float: The latency in milliseconds, or None if the histogram is empty.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self):
+        """
+        Return the count, mean, percentiles and maximum.
+
+        Returns:
+            dict: The summary, with latencies in milliseconds.
+        """
+        summary = {'count': self.count, 'mean': self.total / self.count if self.count else None}
+        for fraction in LATENCY_PERCENTILES:
+            summary[f"p{int(fraction * 100)}"] = self.percentile(fraction)
+        summary['max'] = self.max if self.count else None
+        return summary
+
+class LatencyTracer:
+    """
+    Traces events from the moment their CLI line is read until the 'now playing' controls are updated.
+
+    The subscriber starts a trace for each line and hands it to the coalescer with the
+    event. The processor resumes the trace of the released burst, which binds it to the
+    current thread or asyncio task, so the fetch, parse and paint stages can mark it without
+    passing it around. Finished traces add the time spent in each stage, and from receipt
+    to paint, to per-stage histograms.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.histograms = {stage: LatencyHistogram() for stage in PIPELINE_STAGES[1:] + (STAGE_TOTAL,)}
+        self.traces_finished = 0
+        self.traces_unpainted = 0  # Finished without a repaint, e.g. nothing changed or the fetch failed
+
+    def start(self):
+        """
+        Start a trace for a line just read from the connection.
+
+        Returns:
+            Trace: The new trace, or None if tracing is disabled.
+        """
+        if not self.enabled:
+            return None
+        return Trace(time.monotonic())
+
+    def resume(self, trace):
+        """
+        Mark a trace as released to the event processor and make it the active trace.
+
+        Args:
+            trace (Trace): The trace of the released burst, or None.
+        """
+        if trace is not None:
+            trace.mark(STAGE_DEQUEUED)
+        _active_trace.set(trace)
+
+    def mark(self, stage):
+        """
+        Record that the active trace reached a stage. Does nothing if no trace is active.
+
+        Args:
+            stage (str): The pipeline stage.
+        """
+        trace = _active_trace.get()
+        if trace is not None:
+            trace.mark(stage)
+
+    def finish(self):
+        """
+        Add the active trace to the histograms and clear it.
+        """
+        trace = _active_trace.get()
+        if trace is None:
+            return
+        _active_trace.set(None)
+
+        marks = trace.marks
+        with self.lock:
+            previous = marks[STAGE_RECEIVED]
+            for stage in PIPELINE_STAGES[1:]:
+                if stage in marks:
+                    self.histograms[stage].add((marks[stage] - previous) * 1000)
+                    previous = marks[stage]
+            self.traces_finished += 1
+            if STAGE_PAINTED in marks:
+                self.histograms[STAGE_TOTAL].add((marks[STAGE_PAINTED] - marks[STAGE_RECEIVED]) * 1000)
+            else:
+                self.traces_unpainted += 1
+
+    def summary(self):
+        """
+        Return the percentile summary of each stage.
+
+        Returns:
+            dict: The summary of each stage that has data, keyed by stage, in pipeline order with the total last.
+        """
+        with self.lock:
+            return {stage: histogram.summary() for stage, histogram in self.histograms.items() if histogram.count}
+
+    def format_summary(self):
+        """
+        Format the percentile summary as one line per stage.
+
+        Returns:
+            str: The summary text.
+        """
+        summary = self.summary()
+        if not summary:
+            return "No traced events yet."
+        lines = [f"{self.traces_finished} events, {self.traces_unpainted} without repaint (ms)"]
+        for stage, values in summary.items():
+            percentiles = "  ".join(f"{key} {values[key]:.1f}" for key in values if key.startswith('p'))
+            lines.append(f"{stage:<9} n={values['count']:<5} {percentiles}  max {values['max']:.1f}")
+        return "\n".join(lines)
+
+    def log_summary(self):
+        """
+        Write the percentile summary to the log.
+        """
+        log_message(f"Event-to-paint latency:\n{self.format_summary()}", LOG_LEVEL_INFO)
+
+    def reset(self):
+        """
+        Clear the histograms.
+        """
+        with self.lock:
+            self.histograms = {stage: LatencyHistogram() for stage in self.histograms}
+            self.traces_finished = 0
+            self.traces_unpainted = 0
+
+# Instantiate the LatencyTracer class
+latency_tracer = LatencyTracer()
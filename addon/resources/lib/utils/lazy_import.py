@@ -0,0 +1,48 @@
+import importlib
+import threading
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Heavy dependencies (requests and urllib3, asyncio, the vendored telnetlib) are bound
+    to a LazyModule at module level instead of being imported, so loading the addon
+    does not pay for them until a code path actually uses them. Names looked up only in
+    except clauses resolve when the exception is matched, by which time the module is
+    loaded anyway.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Import the module if it is not imported yet.
+
+        Returns:
+            module: The imported module.
+        """
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+                module = self._module
+        return module
+
+    def is_loaded(self):
+        """
+        Check whether the module has been imported through this stand-in.
+
+        Returns:
+            bool: True if the module is loaded, False otherwise.
+        """
+        return self._module is not None
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+    def __repr__(self):
+        return f"LazyModule({self._name!r}, loaded={self.is_loaded()})"
@@ -1,27 +1,156 @@
 import xbmc
-import traceback
+import json
 import os
-from resources.lib.utils.constants import LOG_LEVEL_ERROR, LOG_MSG_FORMAT, LOG_ERROR_MSG_FORMAT
+import queue
+import sys
+import threading
+from resources.lib.utils.constants import (
+    LOG_LEVEL_DEBUG,
+    LOG_LEVEL_INFO,
+    LOG_LEVEL_ERROR,
+    LOG_MSG_FORMAT,
+    LOG_ERROR_MSG_FORMAT,
+    KODI_DEBUG_LOGGING_QUERY
+)
 
-def log_message(message, level=xbmc.LOGINFO):
+# Lowest level Kodi currently writes; debug until the active level is known, so nothing is lost
+min_level = LOG_LEVEL_DEBUG
+
+# Base names of source files, keyed by the code object's file name
+file_names = {}
+
+# Background writer, or None to write from the calling thread
+log_writer = None
+
+def log_message(message, level=xbmc.LOGINFO, *args):
     """
     Log a message to the Kodi log with the specified log level.
+
+    Messages below Kodi's active log level return before any work is done. Extra
+    arguments are %-formatted into the message only when it is actually written.
     
     Parameters:
-        message (str): The message to log.
+        message (str): The message to log, optionally with %-style placeholders.
         level (int): The log level for the message. Default is xbmc.LOGINFO.
+        *args: Values for the placeholders in the message.
     """
+    if level < min_level:
+        return
     try:
-        # Extract the current file name and line number
-        stack = traceback.extract_stack()
-        filename, lineno, _, _ = stack[-2]
-        filename = os.path.basename(filename)  # Get only the filename
-        
-        # Format the log message with file name and line number
-        formatted_message = LOG_MSG_FORMAT.format(filename=filename, lineno=lineno, message=message)
-        
-        xbmc.log(formatted_message, level=level)
+        # The caller's file name and line number, from its frame instead of a full stack extraction
+        frame = sys._getframe(1)
+        code_file = frame.f_code.co_filename
+        filename = file_names.get(code_file)
+        if filename is None:
+            filename = file_names[code_file] = os.path.basename(code_file)
+
+        writer = log_writer
+        if writer is not None:
+            writer.put(filename, frame.f_lineno, message, args, level)  # Formatted on the writer thread
+        else:
+            xbmc.log(format_log_line(filename, frame.f_lineno, message, args), level=level)
     except Exception as e:
         # Log any errors encountered during logging
         xbmc.log(LOG_ERROR_MSG_FORMAT.format(error=e), level=LOG_LEVEL_ERROR)
 
+def format_log_line(filename, lineno, message, args):
+    """
+    Format a log line with the file name and line number of the caller.
+
+    Args:
+        filename (str): The caller's file name.
+        lineno (int): The caller's line number.
+        message (str): The message, optionally with %-style placeholders.
+        args (tuple): Values for the placeholders.
+
+    Returns:
+        str: The formatted log line.
+    """
+    if args:
+        message = message % args
+    return LOG_MSG_FORMAT.format(filename=filename, lineno=lineno, message=message)
+
+def refresh_log_level():
+    """
+    Read Kodi's debug logging setting and skip debug messages while it is off.
+    """
+    global min_level
+    try:
+        response = json.loads(xbmc.executeJSONRPC(KODI_DEBUG_LOGGING_QUERY))
+        debug_logging = bool(response['result']['value'])
+    except (KeyError, TypeError, ValueError):
+        debug_logging = True  # Unknown: keep writing everything
+    min_level = LOG_LEVEL_DEBUG if debug_logging else LOG_LEVEL_INFO
+
+class LogWriter:
+    """
+    Writes log lines to the Kodi log from a background thread, so formatting and
+    the log call itself stay off the threads that handle events and the UI.
+    """
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name="klms-log")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def put(self, filename, lineno, message, args, level):
+        """
+        Queue a log line.
+
+        Args:
+            filename (str): The caller's file name.
+            lineno (int): The caller's line number.
+            message (str): The message, optionally with %-style placeholders.
+            args (tuple): Values for the placeholders.
+            level (int): The log level.
+        """
+        self.queue.put((filename, lineno, message, args, level))
+
+    def run(self):
+        """
+        Thread entry point: write queued lines until the stop marker arrives.
+        """
+        while True:
+            entry = self.queue.get()
+            if entry is None:
+                break
+            filename, lineno, message, args, level = entry
+            try:
+                xbmc.log(format_log_line(filename, lineno, message, args), level=level)
+            except Exception as e:
+                xbmc.log(LOG_ERROR_MSG_FORMAT.format(error=e), level=LOG_LEVEL_ERROR)
+
+    def stop(self, timeout=2):
+        """
+        Write the lines still queued and stop the thread.
+
+        Args:
+            timeout (float): The maximum time to wait for the thread in seconds.
+        """
+        self.queue.put(None)
+        self.thread.join(timeout=timeout)
+
+def configure_logging(async_logging):
+    """
+    Pick up Kodi's active log level and start or stop the background writer.
+
+    Args:
+        async_logging (bool): Whether log lines are written from a background thread.
+    """
+    global log_writer
+    refresh_log_level()
+    if async_logging and log_writer is None:
+        log_writer = LogWriter()
+    elif not async_logging:
+        stop_log_writer()
+
+def stop_log_writer():
+    """
+    Flush and stop the background writer, if it is running. Later messages are written directly.
+    """
+    global log_writer
+    writer = log_writer
+    log_writer = None
+    if writer is not None:
+        writer.stop()
@@ -1,21 +1,25 @@
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-import socket
-from contextlib import closing
 from resources.lib.utils.log_message import log_message
+from resources.lib.utils.lazy_import import LazyModule
 from resources.lib.utils.constants import (
     RETRY_COUNT,
     BACKOFF_FACTOR,
     STATUS_FORCE_LIST,
-    SOCKET_TIMEOUT,
+    HTTP_POOL_HOSTS,
+    HTTP_POOL_SIZE,
     LOG_LEVEL_ERROR,
     NETWORK_ISSUE_LOG_MSG
 )
 
+# requests and urllib3 take longer to import than the rest of the addon; they load with the first session
+requests = LazyModule('requests')
+requests_adapters = LazyModule('requests.adapters')
+urllib3_retry = LazyModule('requests.packages.urllib3.util.retry')
+
 def create_requests_session(retries=RETRY_COUNT, backoff_factor=BACKOFF_FACTOR, status_forcelist=STATUS_FORCE_LIST):
     """
     Create a requests session with retry logic.
+    The session's connection pool keeps connections to every configured server, so one
+    session can be shared by all of them.
 
     Args:
         retries (int): The number of retries.
@@ -30,14 +34,14 @@ def create_requests_session(retries=RETRY_COUNT, backoff_factor=BACKOFF_FACTOR,
     """
     try:
         session = requests.Session()
-        retry = Retry(
+        retry = urllib3_retry.Retry(
             total=retries,
             read=retries,
             connect=retries,
             backoff_factor=backoff_factor,
             status_forcelist=status_forcelist,
         )
-        adapter = HTTPAdapter(max_retries=retry)
+        adapter = requests_adapters.HTTPAdapter(max_retries=retry, pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE)
         session.mount('http://', adapter)
         session.mount('https://', adapter)
         return session
@@ -45,27 +49,6 @@ def create_requests_session(retries=RETRY_COUNT, backoff_factor=BACKOFF_FACTOR,
         log_network_issue(f"Failed to create requests session: {e}")
         raise
 
-def is_port_open(host, port, timeout=SOCKET_TIMEOUT):
-    """
-    Check if a port is open on a given host.
-
-    Args:
-        host (str): The host address.
-        port (int): The port number.
-        timeout (int): The timeout for the connection attempt in seconds.
-
-    Returns:
-        bool: True if the port is open, False otherwise.
-    """
-    try:
-        with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
-            sock.settimeout(timeout)
-            result = sock.connect_ex((host, port))
-            return result == 0
-    except socket.error as e:
-        log_network_issue(f"Socket error while checking port {port} on host {host}: {e}")
-        return False
-
 def log_network_issue(message):
     """
     Log a network-related issue.
@@ -0,0 +1,123 @@
+import threading
+import time
+from resources.lib.utils.constants import PLAYBACK_MODE_PLAY
+
+class PlaybackClock:
+    """
+    Local clock that extrapolates the playback position between status updates.
+
+    Each status update anchors the clock at the server's elapsed time; between
+    updates the position advances with the monotonic clock at the playback rate
+    while the player is playing, and stays frozen while it is paused or stopped.
+    The difference between the extrapolated and the reported position is kept
+    as the last observed drift.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.elapsed = 0.0  # Position at the anchor time, in seconds
+        self.anchor = time.monotonic()
+        self.duration = 0.0
+        self.rate = 0.0  # 0 while paused or stopped
+        self.track_key = None
+
+        # Counters
+        self.syncs = 0
+        self.last_drift = 0.0
+        self.max_drift = 0.0
+
+    def sync(self, elapsed, duration, mode, rate=1.0, track_key=None, received_at=None):
+        """
+        Re-anchor the clock at a position reported by the server.
+
+        Args:
+            elapsed (float): The elapsed time reported by LMS, in seconds.
+            duration (float): The track duration in seconds, or 0 if unknown (e.g. a stream).
+            mode (str): The player mode: 'play', 'pause' or 'stop'.
+            rate (float): The playback rate reported by LMS.
+            track_key (object): Identifies the track, so drift is only measured within one track.
+            received_at (float): The monotonic time the position was reported, or None for now.
+        """
+        anchor = time.monotonic() if received_at is None else received_at
+        with self.lock:
+            if track_key == self.track_key and self.rate:
+                drift = self.position_at(anchor) - elapsed
+                self.last_drift = drift
+                self.max_drift = max(self.max_drift, abs(drift))
+            self.elapsed = float(elapsed or 0.0)
+            self.anchor = anchor
+            self.duration = float(duration or 0.0)
+            self.rate = float(rate or 0.0) if mode == PLAYBACK_MODE_PLAY else 0.0
+            self.track_key = track_key
+            self.syncs += 1
+
+    def position_at(self, now):
+        """
+        Return the extrapolated position at a given time. Caller must hold the lock.
+
+        Args:
+            now (float): The monotonic time.
+
+        Returns:
+            float: The position in seconds, limited to the track duration if it is known.
+        """
+        position = self.elapsed + max(0.0, now - self.anchor) * self.rate
+        if self.duration:
+            position = min(position, self.duration)
+        return max(0.0, position)
+
+    def position(self):
+        """
+        Return the current extrapolated position.
+
+        Returns:
+            tuple: The position and the duration, in seconds.
+        """
+        with self.lock:
+            return self.position_at(time.monotonic()), self.duration
+
+    def is_running(self):
+        """
+        Check whether the position is currently advancing.
+
+        Returns:
+            bool: True while playing, False while paused or stopped.
+        """
+        with self.lock:
+            return self.rate != 0.0
+
+    def stop(self):
+        """
+        Freeze the clock at its current position, e.g. when no status is available.
+        """
+        with self.lock:
+            self.elapsed = self.position_at(time.monotonic())
+            self.anchor = time.monotonic()
+            self.rate = 0.0
+
+    def stats(self):
+        """
+        Return the sync counters.
+
+        Returns:
+            dict: The number of syncs and the last and largest observed drift in seconds.
+        """
+        with self.lock:
+            return {'syncs': self.syncs, 'last_drift': self.last_drift, 'max_drift': self.max_drift}
+
+def format_duration(seconds):
+    """
+    Format a duration as m:ss, or h:mm:ss for durations of an hour or more.
+
+    Args:
+        seconds (float): The duration in seconds.
+
+    Returns:
+        str: The formatted duration.
+    """
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
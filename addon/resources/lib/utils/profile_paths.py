@@ -0,0 +1,18 @@
+import os
+import xbmcaddon
+import xbmcvfs
+
+def get_profile_dir(*parts):
+    """
+    Return a directory inside the addon profile, creating it if needed.
+
+    Args:
+        *parts (str): Path components below the profile directory.
+
+    Returns:
+        str: The absolute path of the directory.
+    """
+    profile = xbmcvfs.translatePath(xbmcaddon.Addon().getAddonInfo('profile'))
+    path = os.path.join(profile, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
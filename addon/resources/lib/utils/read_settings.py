@@ -5,6 +5,19 @@ from resources.lib.utils.constants import (
     ADDON_SETTING_LMS_PORT,
     ADDON_SETTING_LMS_PLAYER_ID,
     ADDON_SETTING_LMS_TELNET_PORT,
+    ADDON_SETTING_LMS_EXTRA_SERVERS,
+    ADDON_SETTING_LMS_DISCOVERY,
+    ADDON_SETTING_DEBOUNCE_TIME,
+    ADDON_SETTING_DEBOUNCE_MAX_WAIT,
+    ADDON_SETTING_STATUS_TRANSPORT,
+    ADDON_SETTING_EVENT_ENGINE,
+    ADDON_SETTING_CLI_TRANSPORT,
+    ADDON_SETTING_ARTWORK_CACHE_MB,
+    ADDON_SETTING_ARTWORK_PREFETCH_COUNT,
+    ADDON_SETTING_ASYNC_LOGGING,
+    ADDON_SETTING_LATENCY_TRACING,
+    ADDON_SETTING_TRACE_RECORDING,
+    ADDON_SETTING_DASHBOARD_MODE,
     SETTINGS_ERROR_MSG,
     LOG_LEVEL_ERROR
 )
@@ -26,7 +39,20 @@ def read_settings():
             ADDON_SETTING_LMS_SERVER: addon.getSetting(ADDON_SETTING_LMS_SERVER),
             ADDON_SETTING_LMS_PORT: addon.getSetting(ADDON_SETTING_LMS_PORT),
             ADDON_SETTING_LMS_PLAYER_ID: addon.getSetting(ADDON_SETTING_LMS_PLAYER_ID),
-            ADDON_SETTING_LMS_TELNET_PORT: addon.getSetting(ADDON_SETTING_LMS_TELNET_PORT)
+            ADDON_SETTING_LMS_TELNET_PORT: addon.getSetting(ADDON_SETTING_LMS_TELNET_PORT),
+            ADDON_SETTING_LMS_EXTRA_SERVERS: addon.getSetting(ADDON_SETTING_LMS_EXTRA_SERVERS),
+            ADDON_SETTING_LMS_DISCOVERY: addon.getSetting(ADDON_SETTING_LMS_DISCOVERY),
+            ADDON_SETTING_DEBOUNCE_TIME: addon.getSetting(ADDON_SETTING_DEBOUNCE_TIME),
+            ADDON_SETTING_DEBOUNCE_MAX_WAIT: addon.getSetting(ADDON_SETTING_DEBOUNCE_MAX_WAIT),
+            ADDON_SETTING_STATUS_TRANSPORT: addon.getSetting(ADDON_SETTING_STATUS_TRANSPORT),
+            ADDON_SETTING_EVENT_ENGINE: addon.getSetting(ADDON_SETTING_EVENT_ENGINE),
+            ADDON_SETTING_CLI_TRANSPORT: addon.getSetting(ADDON_SETTING_CLI_TRANSPORT),
+            ADDON_SETTING_ARTWORK_CACHE_MB: addon.getSetting(ADDON_SETTING_ARTWORK_CACHE_MB),
+            ADDON_SETTING_ARTWORK_PREFETCH_COUNT: addon.getSetting(ADDON_SETTING_ARTWORK_PREFETCH_COUNT),
+            ADDON_SETTING_ASYNC_LOGGING: addon.getSetting(ADDON_SETTING_ASYNC_LOGGING),
+            ADDON_SETTING_LATENCY_TRACING: addon.getSetting(ADDON_SETTING_LATENCY_TRACING),
+            ADDON_SETTING_TRACE_RECORDING: addon.getSetting(ADDON_SETTING_TRACE_RECORDING),
+            ADDON_SETTING_DASHBOARD_MODE: addon.getSetting(ADDON_SETTING_DASHBOARD_MODE)
         }
         return settings
     except Exception as e:
@@ -34,3 +60,20 @@ def read_settings():
         log_message(SETTINGS_ERROR_MSG.format(error=e), LOG_LEVEL_ERROR)
         return {}
 
+
+def get_int_setting(settings, key, default):
+    """
+    Read an integer setting, falling back to a default when it is missing or invalid.
+
+    Args:
+        settings (dict): The settings dictionary.
+        key (str): The settings key.
+        default (int): The value to use when the setting cannot be parsed.
+
+    Returns:
+        int: The setting value.
+    """
+    try:
+        return int(settings.get(key) or default)
+    except (TypeError, ValueError):
+        return default
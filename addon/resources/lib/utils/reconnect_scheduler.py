@@ -0,0 +1,119 @@
+import random
+import threading
+import time
+from collections import deque
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.constants import (
+    LOG_LEVEL_INFO,
+    RECONNECT_BASE_DELAY,
+    RECONNECT_MAX_DELAY,
+    RECONNECT_HISTORY_SIZE
+)
+
+class ReconnectScheduler:
+    """
+    Schedules reconnection attempts with capped exponential backoff and jitter.
+
+    The n-th consecutive failed attempt waits a random time between half and all of
+    min(max_delay, base_delay * 2^n), so clients recovering from the same outage do
+    not retry in lockstep. A successful connection resets the backoff and records
+    how long it took to recover from the connection loss.
+    """
+
+    def __init__(self, base_delay=RECONNECT_BASE_DELAY, max_delay=RECONNECT_MAX_DELAY):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.attempt = 0
+        self.lost_at = None  # Monotonic time the connection was lost, None while connected
+        self.recovery_times = deque(maxlen=RECONNECT_HISTORY_SIZE)
+        self.wakeup = threading.Event()  # Set by retry_now() to end the current wait
+        self.on_wakeup = None  # Called by retry_now(), for waits that are not on the wakeup event
+
+        # Counters
+        self.failed_attempts = 0
+        self.reconnects = 0
+
+    def next_delay(self, minimum=0.0):
+        """
+        Return the delay before the next attempt and advance the backoff.
+
+        Args:
+            minimum (float): A lower bound for the delay in seconds, e.g. until the circuit breaker allows a probe.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        with self.lock:
+            ceiling = min(self.max_delay, self.base_delay * (2 ** self.attempt))
+            self.attempt += 1
+            self.failed_attempts += 1
+        return max(minimum, random.uniform(ceiling / 2, ceiling))
+
+    def wait(self, stop_event, minimum=0.0):
+        """
+        Wait before the next attempt, returning early when retry_now() is called.
+        Whoever sets the stop event calls retry_now() to end the wait.
+
+        Args:
+            stop_event (threading.Event): The event that signals shutdown.
+            minimum (float): A lower bound for the delay in seconds.
+
+        Returns:
+            bool: True if the stop event is set, False if the delay elapsed or a retry was requested.
+        """
+        delay = self.next_delay(minimum)
+        log_message(f"Retrying connection in {delay:.1f} seconds...")
+        self.wakeup.wait(delay)
+        self.wakeup.clear()
+        return stop_event.is_set()
+
+    def retry_now(self):
+        """
+        Reset the backoff and end the current wait, e.g. after the server address changed or on shutdown.
+        """
+        with self.lock:
+            self.attempt = 0
+            on_wakeup = self.on_wakeup
+        self.wakeup.set()
+        if on_wakeup is not None:
+            on_wakeup()
+
+    def connection_lost(self):
+        """
+        Start measuring the time to reconnect.
+        """
+        with self.lock:
+            if self.lost_at is None:
+                self.lost_at = time.monotonic()
+
+    def connected(self):
+        """
+        Reset the backoff and record the time to reconnect if the connection had been lost.
+        """
+        with self.lock:
+            self.attempt = 0
+            if self.lost_at is None:
+                return
+            recovery = time.monotonic() - self.lost_at
+            self.lost_at = None
+            self.recovery_times.append(recovery)
+            self.reconnects += 1
+        log_message(f"Reconnected to LMS after {recovery:.2f} seconds.", LOG_LEVEL_INFO)
+
+    def stats(self):
+        """
+        Return the reconnection counters and recovery times.
+
+        Returns:
+            dict: Failed attempts, reconnects, and the last, mean and worst time to reconnect in seconds.
+        """
+        with self.lock:
+            times = list(self.recovery_times)
+            return {
+                'failed_attempts': self.failed_attempts,
+                'reconnects': self.reconnects,
+                'last_recovery': times[-1] if times else None,
+                'mean_recovery': sum(times) / len(times) if times else None,
+                'max_recovery': max(times) if times else None
+            }
@@ -1,7 +1,19 @@
 import xbmc
-from resources.lib.api.fetch_lms_status import requests_session  # Import the global requests session
+from resources.lib.api.fetch_lms_status import close_requests_session  # Closes the global requests session, if created
 from resources.lib.api.telnet_handler import telnet_handler  # Import the telnet handler instance
-from resources.lib.utils.log_message import log_message  # Custom function for logging messages
+from resources.lib.api.player_tracker import player_tracker  # Import the multi-player dashboard tracker
+from resources.lib.api.lms_servers import server_manager  # Import the additional dashboard servers
+from resources.lib.api.worker_pool import worker_pool  # Import the worker pool shared by the dashboard servers
+from resources.lib.api.server_discovery import server_discovery  # Import the LMS server discovery
+import resources.lib.api.artwork_cache as artwork_cache  # Module access, the cache is created on first use
+import resources.lib.api.artwork_prefetcher as artwork_prefetcher  # Module access, created on first use
+from resources.lib.ui.progress_display import progress_display  # Import the progress ticker instance
+from resources.lib.ui.status_fingerprint import status_fingerprint  # Import the UI update skip counters
+from resources.lib.ui.state_snapshot import state_snapshot  # Import the saved NowPlaying state
+from resources.lib.utils.connection_health import connection_health  # Import the shared circuit breaker
+from resources.lib.utils.latency_tracer import latency_tracer  # Import the event-to-paint latency histograms
+from resources.lib.utils.trace_recorder import trace_recorder  # Import the CLI and JSON-RPC trace recorder
+from resources.lib.utils.log_message import log_message, stop_log_writer  # Custom function for logging messages
 from resources.lib.utils.constants import (
     LOG_LEVEL_INFO,
     LOG_LEVEL_ERROR,
@@ -18,16 +30,47 @@ def shutdown_addon():
         log_message(SHUTDOWN_MSG_START, LOG_LEVEL_INFO)
         
         # Close the requests session
-        if requests_session:
-            requests_session.close()
+        close_requests_session()
         
+        # Stop refreshing the dashboard players; the refresher queries over the telnet connection
+        if telnet_handler.player_tracker is not None:
+            player_tracker.stop()
+            log_message(f"Player tracking stats: {player_tracker.stats()}", LOG_LEVEL_INFO)
+            server_manager.stop()
+            worker_pool.shutdown()
+
         # Close the telnet connection
         telnet_handler.close_telnet_connection()
+        log_message(f"Connection health: {connection_health.stats()}", LOG_LEVEL_INFO)
+        log_message(f"Reconnect stats: {telnet_handler.get_reconnect_stats()}", LOG_LEVEL_INFO)
+        log_message(f"Server discovery stats: {server_discovery.stats()}", LOG_LEVEL_INFO)
+        log_message(f"Status fetch stats: {telnet_handler.get_fetch_stats()}", LOG_LEVEL_INFO)
+        log_message(f"UI update skip stats: {status_fingerprint.stats()}", LOG_LEVEL_INFO)
+        latency_tracer.log_summary()
+
+        # Finish the trace file, if one is being recorded
+        trace_recorder.stop()
+
+        # Stop the elapsed time ticker
+        progress_display.stop()
+
+        # Write the last rendered state, if a change is still waiting to be saved
+        state_snapshot.flush()
+        log_message(f"State snapshot stats: {state_snapshot.stats()}", LOG_LEVEL_INFO)
+
+        # Stop prefetching artwork and persist the artwork cache index
+        if artwork_prefetcher.artwork_prefetcher:
+            artwork_prefetcher.artwork_prefetcher.shutdown()
+        if artwork_cache.artwork_cache:
+            artwork_cache.artwork_cache.close()
         
         # Allow the screensaver to activate again
         xbmc.executebuiltin('InhibitScreensaver(false)')
         
         log_message(SHUTDOWN_MSG_COMPLETE, LOG_LEVEL_INFO)
+
+        # Write any log lines still queued by the background writer
+        stop_log_writer()
     except Exception as e:
         log_message(f"Shutdown error: {e}", LOG_LEVEL_ERROR)
 
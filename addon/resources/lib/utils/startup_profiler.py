@@ -0,0 +1,137 @@
+import builtins
+import sys
+import threading
+import time
+from resources.lib.utils.lazy_import import LazyModule
+
+# Imported by default.py after the profiler has started, so their import time is counted
+constants = LazyModule('resources.lib.utils.constants')
+log_module = LazyModule('resources.lib.utils.log_message')
+
+class StartupProfiler:
+    """
+    Measures the cold start, from the first line of default.py to the first render in onInit.
+
+    While it runs, module imports on the starting thread are timed through a wrapper
+    around __import__, like python -X importtime: each newly loaded module is charged
+    its own time and, separately, the time including the modules it imported. Named
+    milestones split the start into phases. The first render ends the measurement,
+    removes the wrapper and logs the report, with the slowest imports listed at info
+    level when the start took longer than COLD_START_TARGET_MS.
+    """
+
+    def __init__(self):
+        self.started = None
+        self.thread_id = None
+        self.original_import = None
+        self.marks = []  # (milestone, seconds since the start)
+        self.imports = {}  # Module name -> (seconds including the modules it imported, seconds on its own)
+        self.import_stack = []  # Time spent in nested imports, one entry per import in progress
+        self.summary = None
+
+    def start(self):
+        """
+        Start measuring and timing imports. Called first thing in default.py.
+        """
+        if self.started is not None:
+            return
+        self.started = time.perf_counter()
+        self.thread_id = threading.get_ident()
+        self.original_import = builtins.__import__
+        builtins.__import__ = self.timed_import
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """
+        Replacement for __import__ that times the modules loaded by the starting thread.
+        """
+        if level or name in sys.modules or threading.get_ident() != self.thread_id:
+            return self.original_import(name, globals, locals, fromlist, level)
+        self.import_stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = self.import_stack.pop()
+            if self.import_stack:
+                self.import_stack[-1] += elapsed
+            self.imports[name] = (elapsed, elapsed - nested)
+
+    def mark(self, milestone):
+        """
+        Record a milestone of the start.
+
+        Args:
+            milestone (str): The name of the phase that just ended.
+        """
+        if self.started is not None and self.summary is None:
+            self.marks.append((milestone, time.perf_counter() - self.started))
+
+    def finish(self, milestone):
+        """
+        Record the first render, stop timing imports and log the report. Later calls do nothing.
+
+        Args:
+            milestone (str): The name of the last phase, e.g. the window that rendered.
+        """
+        if self.started is None or self.summary is not None:
+            return
+        self.mark(milestone)
+        if builtins.__import__ == self.timed_import:
+            builtins.__import__ = self.original_import
+        self.summary = self.build_summary()
+        self.log_summary()
+
+    def build_summary(self):
+        """
+        Build the cold start report.
+
+        Returns:
+            dict: The total time, the time of each phase and of the slowest imports in
+                  milliseconds, and the deferred modules already loaded at the first render.
+        """
+        phases = []
+        previous = 0.0
+        for milestone, at in self.marks:
+            phases.append((milestone, (at - previous) * 1000))
+            previous = at
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)[:constants.STARTUP_REPORT_IMPORTS]
+        return {
+            'total_ms': previous * 1000,
+            'target_ms': constants.COLD_START_TARGET_MS,
+            'phases': phases,
+            'imports_ms': sum(own for _, own in self.imports.values()) * 1000,
+            'modules_imported': len(self.imports),
+            'slowest_imports': [(name, own * 1000, total * 1000) for name, (total, own) in slowest],
+            'deferred_loaded': [name for name in constants.STARTUP_DEFERRED_MODULES if name in sys.modules]
+        }
+
+    def log_summary(self):
+        """
+        Log the cold start report, in more detail when the target was missed.
+        """
+        summary = self.summary
+        over_target = summary['total_ms'] > summary['target_ms']
+        phases = ", ".join(f"{milestone} {ms:.0f} ms" for milestone, ms in summary['phases'])
+        log_module.log_message(
+            f"Cold start: {summary['total_ms']:.0f} ms to first render (target {summary['target_ms']} ms): {phases}; "
+            f"{summary['modules_imported']} modules imported in {summary['imports_ms']:.0f} ms",
+            constants.LOG_LEVEL_WARNING if over_target else constants.LOG_LEVEL_INFO
+        )
+        if summary['deferred_loaded']:
+            log_module.log_message(f"Loaded before the first render: {', '.join(summary['deferred_loaded'])}", constants.LOG_LEVEL_INFO)
+        level = constants.LOG_LEVEL_INFO if over_target else constants.LOG_LEVEL_DEBUG
+        for name, own, total in summary['slowest_imports']:
+            log_module.log_message("Import %s: %.1f ms, %.1f ms with its imports", level, name, own, total)
+
+    def report(self):
+        """
+        Return the cold start report.
+
+        Returns:
+            dict: The report, or None before the first render.
+        """
+        return self.summary
+
+# Instantiate the StartupProfiler class
+startup_profiler = StartupProfiler()
@@ -0,0 +1,136 @@
+import gzip
+import json
+import os
+import threading
+import time
+from resources.lib.utils.log_message import log_message
+from resources.lib.utils.constants import (
+    LOG_LEVEL_INFO,
+    LOG_LEVEL_WARNING,
+    TRACE_FILE_TEMPLATE,
+    TRACE_FORMAT_VERSION,
+    TRACE_MAX_RECORDS
+)
+
+# Record kinds
+RECORD_CLI_EVENT = "c"   # Line read from the CLI connection: notification or pushed status
+RECORD_CLI_REPLY = "r"   # Line read from the CLI connection in reply to a status query
+RECORD_HTTP = "h"        # JSON-RPC status response
+
+class TraceRecorder:
+    """
+    Records the raw CLI lines and JSON-RPC status responses the addon receives, with their timing.
+
+    The trace is a gzip-compressed file of JSON lines: a header object with the
+    format version and player ID, then one compact array per record:
+    [seconds since start, kind, CLI line] or [seconds since start, kind, status params, response].
+    CLI lines are stored as latin-1 text, so their bytes are reproduced exactly on replay.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.file = None
+        self.path = None
+        self.started = None
+        self.records = 0
+
+    @property
+    def active(self):
+        """
+        Whether a trace is being recorded.
+        """
+        return self.file is not None
+
+    def start(self, directory, player_id):
+        """
+        Start recording to a new trace file.
+
+        Args:
+            directory (str): The directory for the trace file.
+            player_id (str): The player the addon is following.
+
+        Returns:
+            str: The path of the trace file, or None if it could not be created.
+        """
+        path = os.path.join(directory, TRACE_FILE_TEMPLATE.format(timestamp=time.strftime("%Y%m%d-%H%M%S")))
+        header = {'version': TRACE_FORMAT_VERSION, 'player_id': player_id, 'started': time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with self.lock:
+            if self.file is not None:
+                return self.path
+            try:
+                self.file = gzip.open(path, 'wb')
+                self.file.write((json.dumps(header) + '\n').encode('utf-8'))
+            except OSError as e:
+                log_message(f"Failed to start trace recording: {e}", LOG_LEVEL_WARNING)
+                self.file = None
+                return None
+            self.path = path
+            self.started = time.monotonic()
+            self.records = 0
+        log_message(f"Recording CLI and JSON-RPC trace to {path}", LOG_LEVEL_INFO)
+        return path
+
+    def record_cli_line(self, line, reply=False):
+        """
+        Record a line read from the CLI connection.
+
+        Args:
+            line (bytes): The raw line.
+            reply (bool): Whether the line answered a status query.
+        """
+        if self.file is not None:
+            self.write([RECORD_CLI_REPLY if reply else RECORD_CLI_EVENT, line.decode('latin-1')])
+
+    def record_response(self, params, data):
+        """
+        Record a JSON-RPC status response.
+
+        Args:
+            params (list): The status query parameters.
+            data (dict): The decoded response.
+        """
+        if self.file is not None:
+            self.write([RECORD_HTTP, list(params), data])
+
+    def write(self, record):
+        """
+        Append a record, stamped with the time since the recording started.
+
+        Args:
+            record (list): The record kind and payload.
+        """
+        with self.lock:
+            if self.file is None:
+                return
+            try:
+                self.file.write((json.dumps([round(time.monotonic() - self.started, 4)] + record, separators=(',', ':')) + '\n').encode('utf-8'))
+            except (OSError, TypeError, ValueError) as e:
+                log_message(f"Failed to write trace record: {e}", LOG_LEVEL_WARNING)
+                return
+            self.records += 1
+            if self.records >= TRACE_MAX_RECORDS:
+                log_message(f"Trace reached {TRACE_MAX_RECORDS} records, stopping the recording.", LOG_LEVEL_WARNING)
+                self.close_file()
+
+    def stop(self):
+        """
+        Stop recording and close the trace file.
+        """
+        with self.lock:
+            if self.file is None:
+                return
+            self.close_file()
+        log_message(f"Trace recording stopped after {self.records} records: {self.path}", LOG_LEVEL_INFO)
+
+    def close_file(self):
+        """
+        Close the trace file. Caller must hold the lock.
+        """
+        try:
+            self.file.close()
+        except OSError as e:
+            log_message(f"Failed to close trace file: {e}", LOG_LEVEL_WARNING)
+        self.file = None
+
+# Instantiate the TraceRecorder class
+trace_recorder = TraceRecorder()
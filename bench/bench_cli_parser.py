@@ -0,0 +1,86 @@
+"""
+Microbenchmark: parse_cli_line versus the former TelnetHandler.format_event_response.
+
+The two are timed in alternation and the best of several rounds is reported, so a
+burst of load on the machine does not favour either. The former code dropped lines of
+fewer than three tokens without looking at them, so its time for 'rescan done' is
+that of an early return.
+
+Usage:
+    python bench/bench_cli_parser.py [--number N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "addon"))
+
+from resources.lib.api.cli_parser import parse_cli_line  # noqa: E402
+
+SAMPLES = {
+    "playlist newsong": b"ab%3A7a%3A56%3A8b%3Afd%3A0f playlist newsong Some%20Fairly%20Long%20Track%20Title%20(Remastered%202011) 3\n",
+    "mixer volume": b"ab%3A7a%3A56%3A8b%3Afd%3A0f mixer volume 35\n",
+    "pause": b"ab%3A7a%3A56%3A8b%3Afd%3A0f pause 1\n",
+    "client new": b"ab%3A7a%3A56%3A8b%3Afd%3A0f client new\n",
+    "prefset": b"ab%3A7a%3A56%3A8b%3Afd%3A0f prefset server volume 35\n",
+    "rescan done": b"rescan done\n",
+    "favorites changed": b"favorites changed\n",
+}
+
+def format_event_response(response):
+    """
+    The former TelnetHandler.format_event_response, kept verbatim for comparison.
+    """
+    parts = response.decode('utf-8').strip().split(' ')
+
+    if len(parts) >= 3:
+        query = parts[1]
+        param = parts[2]
+        data = ' '.join(parts[3:])
+        data_decoded = unquote(data)
+        return { 'query': query, 'param': param, 'data': data_decoded }
+    return None
+
+def legacy_dispatch(line):
+    """
+    Legacy path as used by the subscriber: format, then compare query and param.
+    """
+    event = format_event_response(line)
+    return event is not None and event['query'] == 'playlist' and event['param'] == 'newsong'
+
+def parser_dispatch(line):
+    """
+    New path as used by the subscriber: parse, then compare the command path.
+    """
+    event = parse_cli_line(line)
+    return event is not None and event.command == ('playlist', 'newsong')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200000)
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'notification':<18} {'legacy ns':>10} {'parser ns':>10} {'speedup':>8}")
+    for name, line in SAMPLES.items():
+        legacy_timer = timeit.Timer(lambda: legacy_dispatch(line))
+        parser_timer = timeit.Timer(lambda: parser_dispatch(line))
+        legacy = new = float("inf")
+        for _ in range(args.rounds):
+            legacy = min(legacy, legacy_timer.timeit(args.number) / args.number)
+            new = min(new, parser_timer.timeit(args.number) / args.number)
+        print(f"{name:<18} {legacy * 1e9:>10.0f} {new * 1e9:>10.0f} {legacy / new:>7.1f}x")
+
+    bad = b"ab%3A7a%3A56%3A8b%3Afd%3A0f playlist newsong Caf\xe9%20\xff 3\n"
+    try:
+        format_event_response(bad)
+        legacy_result = "ok"
+    except UnicodeDecodeError as e:
+        legacy_result = f"raises {type(e).__name__}"
+    print(f"\ninvalid UTF-8: legacy {legacy_result}, parser -> {parse_cli_line(bad).args}")
+
+if __name__ == "__main__":
+    main()
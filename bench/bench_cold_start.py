@@ -0,0 +1,130 @@
+"""
+Cold start benchmark: default.py from its first line to the first render of the window.
+
+Each run starts a fresh Python process with the stub xbmc modules already imported,
+as Kodi's are, and executes default.py as Kodi does, against a FakeLMS in a child
+process. The addon's own startup profiler measures the run; the report shows the
+median of each phase, the slowest imports, and which of the modules meant to load on
+first use were loaded before the first render. The exit status is 1 if the median
+cold start misses the target.
+
+All runs share one addon profile, so from the second run on the artwork is cached and
+the NowPlaying window paints the state saved by the previous run before any request,
+as on any start after the first. With --cold-cache each run gets an empty profile,
+waits for the server and downloads the artwork before the first render. With
+--server-delay every status reply of the server is delayed, which shows how much of
+the first render still depends on the network.
+
+Usage:
+    python bench/bench_cold_start.py [--runs N] [--transport cli http push] [--dashboard] [--cold-cache]
+                                     [--server-delay SECONDS] [--target MS]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from fake_lms import PLAYER_ID, FakeLMSProcess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.abspath(os.path.join(BENCH_DIR, "..", "addon"))
+RESULT_MARKER = "COLD_START "
+
+def run_child(cli_port, http_port, transport, dashboard):
+    """
+    Child process: run default.py once and print the startup report.
+    """
+    import runpy
+    sys.path[:0] = [os.path.join(BENCH_DIR, "stubs"), ADDON_DIR]
+    import xbmc
+    import xbmcaddon
+    import xbmcgui
+    import xbmcvfs  # noqa: F401 (preloaded, as in Kodi)
+
+    xbmcaddon.settings.update({
+        "lms_server": "127.0.0.1",
+        "lms_port": http_port,
+        "lms_telnet_port": cli_port,
+        "lms_player_id": PLAYER_ID,
+        "status_transport": transport,
+        "dashboard_mode": "true" if dashboard else "false",
+        "lms_discovery": "false",
+    })
+    xbmc.Monitor.waitForAbort = lambda self, timeout=None: True  # Exit right after the first render
+
+    # Control types of the windows, as in run_benchmarks.py; the constants module is tiny and imports
+    # nothing, so loading it ahead of default.py hardly changes the measurement
+    from resources.lib.utils import constants
+    xbmcgui.Window.control_types = {
+        constants.CONTROL_ID_ARTWORK_BACKGROUND: xbmcgui.ControlImage,
+        constants.CONTROL_ID_ARTWORK: xbmcgui.ControlImage,
+        constants.CONTROL_ID_PLAYLIST: xbmcgui.ControlList,
+        constants.CONTROL_ID_PROGRESS: xbmcgui.ControlProgress,
+        constants.CONTROL_ID_LATENCY_OVERLAY: xbmcgui.ControlTextBox,
+        constants.CONTROL_ID_DASHBOARD_PLAYERS: xbmcgui.ControlList,
+    }
+    runpy.run_path(os.path.join(ADDON_DIR, "default.py"), run_name="__main__")
+
+    from resources.lib.utils.startup_profiler import startup_profiler
+    from resources.lib.ui.state_snapshot import state_snapshot
+    report = dict(startup_profiler.report(), snapshot_painted=state_snapshot.stats()["loads"] > 0)
+    print(RESULT_MARKER + json.dumps(report), flush=True)
+
+def run_once(fake, transport, dashboard, profile_dir):
+    env = dict(os.environ, KLMS_BENCH_PROFILE=profile_dir or tempfile.mkdtemp(prefix="klms-bench-"))
+    command = [sys.executable, os.path.abspath(__file__), "--child", str(fake.cli_port), str(fake.http_port), "--transport", transport]
+    if dashboard:
+        command.append("--dashboard")
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, env=env)
+    lines = [line for line in completed.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+    if not lines:
+        raise RuntimeError((completed.stderr.strip().splitlines() or [f"exit code {completed.returncode}"])[-1])
+    return json.loads(lines[-1][len(RESULT_MARKER):])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--transport", choices=("cli", "http", "push"), default="cli")
+    parser.add_argument("--dashboard", action="store_true", help="Start the multi-player dashboard instead of NowPlaying")
+    parser.add_argument("--cold-cache", action="store_true", help="Start every run with an empty profile and artwork cache")
+    parser.add_argument("--server-delay", type=float, default=0.0, help="Seconds the server takes to answer each status request")
+    parser.add_argument("--target", type=float, help="Target in milliseconds; defaults to COLD_START_TARGET_MS")
+    parser.add_argument("--child", nargs=2, type=int, metavar=("CLI_PORT", "HTTP_PORT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.transport, args.dashboard)
+        return 0
+
+    profile_dir = None if args.cold_cache else tempfile.mkdtemp(prefix="klms-bench-")
+    fake = FakeLMSProcess(playlist_size=50, cli_delay=args.server_delay, http_delay=args.server_delay)
+    try:
+        reports = [run_once(fake, args.transport, args.dashboard, profile_dir) for _ in range(args.runs)]
+    finally:
+        fake.stop()
+
+    target = args.target if args.target is not None else reports[0]["target_ms"]
+    total = statistics.median(report["total_ms"] for report in reports)
+    print(f"cold start, median of {len(reports)} runs: {total:.1f} ms (target {target:.0f} ms)")
+    for index, (phase, _) in enumerate(reports[0]["phases"]):
+        print(f"  {phase:<20} {statistics.median(report['phases'][index][1] for report in reports):>7.1f} ms")
+    print(f"  {'imports (own time)':<20} {statistics.median(report['imports_ms'] for report in reports):>7.1f} ms, "
+          f"{reports[0]['modules_imported']} modules")
+
+    print("\nslowest imports (last run): own ms / with imports ms")
+    for name, own, with_imports in reports[-1]["slowest_imports"]:
+        print(f"  {name:<45} {own:>7.1f} {with_imports:>7.1f}")
+    painted = [report["total_ms"] for report in reports if report["snapshot_painted"]]
+    waited = [report["total_ms"] for report in reports if not report["snapshot_painted"]]
+    if painted:
+        print(f"\nsaved state painted first: {len(painted)} runs, median {statistics.median(painted):.1f} ms", end="")
+        print(f"; waited for the server: {len(waited)} runs, median {statistics.median(waited):.1f} ms" if waited else "")
+    loaded = sorted({name for report in reports[1:] or reports for name in report["deferred_loaded"]})
+    print(f"\nloaded before the first render{'' if args.cold_cache or len(reports) == 1 else ' after the first run'}: {', '.join(loaded) or 'none of the deferred modules'}")
+    return 0 if total <= target else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmark: lines per second read from the LMS CLI through LineConnection versus the vendored telnetlib.
+
+A local TCP server streams a fixed number of CLI notification lines and each
+transport reads them back with read_until(b"\\n"), as TelnetHandler does.
+
+Usage:
+    python bench/bench_line_transport.py [--lines N] [--repeat R]
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "addon"))
+
+from resources.lib.api.line_transport import LineConnection  # noqa: E402
+from resources.lib.deps import telnetlib  # noqa: E402
+
+SAMPLE_LINE = (b"ab%3A7a%3A56%3A8b%3Afd%3A0f playlist newsong "
+               b"Some%20Fairly%20Long%20Track%20Title%20(Remastered%202011) 3\n")
+
+def start_server(payload):
+    """
+    Start a one-shot TCP server that sends the payload to each client and closes.
+
+    Args:
+        payload (bytes): The data to send.
+
+    Returns:
+        int: The port the server listens on.
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+
+    def serve():
+        while True:
+            client, _ = server.accept()
+            client.sendall(payload)
+            client.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()[1]
+
+def read_all(connection, expected):
+    """
+    Read the expected number of lines from a connection.
+
+    Args:
+        connection: A LineConnection or telnetlib.Telnet instance.
+        expected (int): The number of lines to read.
+
+    Returns:
+        int: The number of lines read.
+    """
+    count = 0
+    try:
+        while count < expected:
+            if connection.read_until(b"\n", timeout=5):
+                count += 1
+    except EOFError:
+        pass
+    return count
+
+def run(name, factory, port, lines, repeat):
+    """
+    Time a transport and print its best lines-per-second figure.
+
+    Args:
+        name (str): The label to print.
+        factory (callable): Creates a connection given host and port.
+        port (int): The server port.
+        lines (int): Lines sent per run.
+        repeat (int): Number of runs.
+
+    Returns:
+        float: The best lines-per-second figure.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        connection = factory("127.0.0.1", port)
+        start = time.perf_counter()
+        count = read_all(connection, lines)
+        elapsed = time.perf_counter() - start
+        connection.close()
+        if count != lines:
+            raise RuntimeError(f"{name}: read {count} of {lines} lines")
+        best = max(best, lines / elapsed)
+    print(f"{name:<12} {best:>14,.0f} lines/s")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    port = start_server(SAMPLE_LINE * args.lines)
+    print(f"{args.lines} lines of {len(SAMPLE_LINE)} bytes, best of {args.repeat}")
+    telnet = run("telnetlib", lambda host, port: telnetlib.Telnet(host, port), port, args.lines, args.repeat)
+    line = run("socket", lambda host, port: LineConnection(host, port), port, args.lines, args.repeat)
+    print(f"speedup      {line / telnet:>14.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Microbenchmark: cost per log_message call, before and after the logging rework.
+
+Runs outside Kodi against bench/stubs/xbmc.py, with Kodi's debug logging off.
+Calls are made from a configurable stack depth, since the former implementation
+walked the whole stack on every call.
+
+Usage:
+    python bench/bench_log_message.py [--number N] [--depth D]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import traceback
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCH_DIR, "stubs"), os.path.join(BENCH_DIR, "..", "addon")]
+
+import xbmc  # noqa: E402
+import resources.lib.utils.log_message as log_module  # noqa: E402
+from resources.lib.utils.constants import LOG_LEVEL_ERROR, LOG_MSG_FORMAT, LOG_ERROR_MSG_FORMAT  # noqa: E402
+
+def legacy_log_message(message, level=xbmc.LOGINFO):
+    """
+    The former log_message, kept verbatim for comparison.
+    """
+    try:
+        # Extract the current file name and line number
+        stack = traceback.extract_stack()
+        filename, lineno, _, _ = stack[-2]
+        filename = os.path.basename(filename)  # Get only the filename
+
+        # Format the log message with file name and line number
+        formatted_message = LOG_MSG_FORMAT.format(filename=filename, lineno=lineno, message=message)
+
+        xbmc.log(formatted_message, level=level)
+    except Exception as e:
+        # Log any errors encountered during logging
+        xbmc.log(LOG_ERROR_MSG_FORMAT.format(error=e), level=LOG_LEVEL_ERROR)
+
+class Event:
+    """
+    Stand-in for a parsed CLI event with a non-trivial repr.
+    """
+
+    def __repr__(self):
+        return "CliEvent('ab:7a:56:8b:fd:0f', 'playlist newsong', 2 args)"
+
+EVENT = Event()
+
+CASES = {
+    "info, f-string": (
+        lambda: legacy_log_message(f"New event: {EVENT}", xbmc.LOGINFO),
+        lambda: log_module.log_message(f"New event: {EVENT}", xbmc.LOGINFO),
+    ),
+    "info, lazy args": (
+        lambda: legacy_log_message(f"New event: {EVENT}", xbmc.LOGINFO),
+        lambda: log_module.log_message("New event: %s", xbmc.LOGINFO, EVENT),
+    ),
+    "debug, gated": (
+        lambda: legacy_log_message(f"New event: {EVENT}", xbmc.LOGDEBUG),
+        lambda: log_module.log_message("New event: %s", xbmc.LOGDEBUG, EVENT),
+    ),
+}
+
+def at_depth(depth, func, *args):
+    """
+    Call func with depth extra frames on the stack.
+    """
+    if depth <= 0:
+        return func(*args)
+    return at_depth(depth - 1, func, *args)
+
+def measure(call, number, depth):
+    """
+    Return the best time per call in nanoseconds.
+    """
+    timer = lambda: at_depth(depth, lambda: [call() for _ in range(number)])
+    best = min(timeit.repeat(timer, number=1, repeat=3)) / number
+    xbmc.written.clear()
+    return best * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=15)
+    args = parser.parse_args()
+
+    log_module.refresh_log_level()  # Debug logging off in the stub
+
+    print(f"{'case':<18} {'legacy ns':>10} {'new ns':>10} {'speedup':>8}")
+    for name, (legacy, new) in CASES.items():
+        legacy_ns = measure(legacy, args.number, args.depth)
+        new_ns = measure(new, args.number, args.depth)
+        print(f"{name:<18} {legacy_ns:>10.0f} {new_ns:>10.0f} {legacy_ns / new_ns:>7.1f}x")
+
+    # Cost on the calling thread with the background writer enabled
+    log_module.configure_logging(True)
+    queued_ns = measure(lambda: log_module.log_message("New event: %s", xbmc.LOGINFO, EVENT), args.number, args.depth)
+    log_module.stop_log_writer()
+    xbmc.written.clear()
+    print(f"\ninfo, background writer: {queued_ns:.0f} ns on the calling thread")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: slotted TrackRecords versus the former per-track dicts built by get_playlist.
+
+Measures construction time and retained memory for playlists of 10 to 10,000 entries.
+
+Usage:
+    python bench/bench_records.py [--sizes 10 100 1000 10000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "addon"))
+
+from resources.lib.api.lms_records import tracks_from_loop  # noqa: E402
+
+SERVER_URL = "http://192.168.1.201:9000"
+
+def make_loop(size):
+    """
+    Build a playlist_loop as decoded from a JSON-RPC status response.
+    """
+    return [
+        {
+            "playlist index": index,
+            "id": 10000 + index,
+            "title": f"Track title number {index}",
+            "artist": f"Artist {index % 50}",
+            "album": f"Album {index % 200}",
+            "duration": 180.0 + index % 120,
+            "coverid": f"{index:08x}",
+        }
+        for index in range(size)
+    ]
+
+def legacy_artwork_url(track_info):
+    """
+    The artwork URL resolution of the former per-track dicts, with the server URL inlined.
+    """
+    artwork_url = track_info.get("artwork_url")
+    if not artwork_url:
+        cover_id = track_info.get("coverid")
+        if not cover_id:
+            return None
+        artwork_url = "/music/{cover_id}/cover.jpg".format(cover_id=cover_id)
+    if artwork_url.startswith(('http://', 'https://')):
+        return artwork_url
+    if not artwork_url.startswith('/'):
+        artwork_url = '/' + artwork_url
+    return f"{SERVER_URL}{artwork_url}"
+
+def legacy_playlist(playlist_loop):
+    """
+    The former get_playlist dict construction.
+    """
+    return [
+        {
+            'id': item.get("id"),
+            "playlist index": item.get("playlist index"),
+            'title': item['title'],
+            'artist': item['artist'],
+            'album': item['album'],
+            'duration': item['duration'],
+            'cover_id': item.get("coverid"),
+            'artwork_url': legacy_artwork_url(item)
+        }
+        for item in playlist_loop
+    ]
+
+def record_playlist(playlist_loop):
+    """
+    The current get_playlist record construction.
+    """
+    return tracks_from_loop(playlist_loop, SERVER_URL)
+
+def retained_bytes(build, playlist_loop):
+    """
+    Return the memory retained by the built playlist, excluding the input.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    playlist = build(playlist_loop)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del playlist
+    return after - before
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} {'dict us':>10} {'record us':>10} {'speedup':>8} {'dict KiB':>10} {'record KiB':>11} {'saved':>6}")
+    for size in args.sizes:
+        playlist_loop = make_loop(size)
+        number = max(1, 20000 // size)
+        legacy = min(timeit.repeat(lambda: legacy_playlist(playlist_loop), number=number, repeat=5)) / number
+        new = min(timeit.repeat(lambda: record_playlist(playlist_loop), number=number, repeat=5)) / number
+        legacy_mem = retained_bytes(legacy_playlist, playlist_loop)
+        new_mem = retained_bytes(record_playlist, playlist_loop)
+        print(f"{size:>8} {legacy * 1e6:>10.1f} {new * 1e6:>10.1f} {legacy / new:>7.2f}x "
+              f"{legacy_mem / 1024:>10.1f} {new_mem / 1024:>11.1f} {1 - new_mem / legacy_mem:>6.0%}")
+
+if __name__ == "__main__":
+    main()
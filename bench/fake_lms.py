@@ -0,0 +1,651 @@
+"""
+Fake Logitech Media Server for offline benchmarks.
+
+Serves one player over the CLI port (event subscriptions, status queries and status
+push subscriptions) and over HTTP (/jsonrpc.js status and serverstatus requests and
+/music/<id>/cover.jpg artwork). The player state is driven by the benchmark: skip tracks,
+load playlists, pause, or drop and refuse CLI connections. MultiPlayerLMS serves many
+players, each with its own current track, for the multi-player dashboard. With a
+discovery port, the fake also answers LMS discovery requests over UDP, as a local
+stand-in for the broadcast on port 3483.
+
+FakeLMS runs in the calling process. FakeLMSProcess runs it in a child process, so the
+server's CPU time and memory are not counted against the addon, and proxies method
+calls to it. Event times are taken from time.monotonic(), which is shared between
+processes on the same machine.
+
+Usage (standalone, for manual testing):
+    python bench/fake_lms.py [--cli-port 9090] [--http-port 9000] [--tracks 50]
+"""
+
+import argparse
+import json
+import multiprocessing
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+PLAYER_ID = "ab:7a:56:8b:fd:0f"
+PLAYER_NAME = "Bench Player"
+
+# Small but valid JPEG header, enough for the artwork cache to store
+COVER_BYTES = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00" + bytes(2048) + b"\xff\xd9"
+
+def make_tracks(size, generation=0):
+    """
+    Build a playlist with unique titles.
+
+    Args:
+        size (int): The number of tracks.
+        generation (int): Distinguishes the titles of successive playlists.
+
+    Returns:
+        list: The track dicts, in JSON-RPC field names.
+    """
+    return [
+        {
+            "id": 100000 * (generation + 1) + index,
+            "title": f"Track {index} of playlist {generation}",
+            "artist": f"Artist {index % 40}",
+            "album": f"Album {index % 150}",
+            "duration": 180.0 + index % 90,
+            "coverid": f"{generation:02x}{index % 500:06x}",
+        }
+        for index in range(size)
+    ]
+
+def encode_tokens(tokens):
+    """
+    Percent-encode CLI tokens and join them into a line.
+    """
+    return (" ".join(quote(str(token), safe="") for token in tokens) + "\n").encode("utf-8")
+
+class FakeLMS:
+    """
+    In-process fake LMS with one player.
+
+    Args:
+        playlist_size (int): The number of tracks in the initial playlist.
+        http_delay (float): Seconds added to each JSON-RPC response, to model a slow server.
+        cli_delay (float): Seconds added to each CLI status reply, to model a slow server.
+        cli_port (int): The CLI port, or 0 for a free port.
+        http_port (int): The HTTP port, or 0 for a free port.
+        discovery_port (int): The UDP port to answer discovery requests on, 0 for a free port, or None for none.
+    """
+
+    def __init__(self, playlist_size=20, http_delay=0.0, cli_delay=0.0, cli_port=0, http_port=0, discovery_port=None):
+        self.lock = threading.Lock()
+        self.http_delay = http_delay
+        self.cli_delay = cli_delay
+        self.generation = 0
+        self.tracks = make_tracks(playlist_size)
+        self.current = 0
+        self.mode = "play"
+        self.position_at = time.monotonic()  # Monotonic time at which the current track started
+        self.timestamp = time.time()
+        self.clients = {}  # socket -> {'events': bool, 'status': list of subscribed status params or None}
+        self.accepting = threading.Event()
+        self.stopped = threading.Event()
+        self.requested_cli_port = cli_port
+        self.requested_http_port = http_port
+        self.requested_discovery_port = discovery_port
+        self.listener = None
+        self.http_server = None
+        self.discovery_socket = None
+        self.discovery_port = None
+        self.counts = {"connections": 0, "cli_queries": 0, "http_requests": 0, "artwork_requests": 0, "events_sent": 0,
+                       "discovery_requests": 0}
+
+    # Lifecycle
+
+    def start(self):
+        """
+        Start the CLI and HTTP servers.
+
+        Returns:
+            dict: The CLI and HTTP ports.
+        """
+        self.listener = self.open_listener(self.requested_cli_port)
+        self.cli_port = self.listener.getsockname()[1]
+        self.accepting.set()
+        threading.Thread(target=self.accept_loop, name="fake-lms-cli", daemon=True).start()
+
+        self.http_server = ThreadingHTTPServer(("127.0.0.1", self.requested_http_port), self.make_http_handler())
+        self.http_server.daemon_threads = True
+        self.http_port = self.http_server.server_address[1]
+        threading.Thread(target=self.http_server.serve_forever, name="fake-lms-http", daemon=True).start()
+
+        if self.requested_discovery_port is not None:
+            self.discovery_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.discovery_socket.bind(("127.0.0.1", self.requested_discovery_port))
+            self.discovery_port = self.discovery_socket.getsockname()[1]
+            threading.Thread(target=self.discovery_loop, name="fake-lms-discovery", daemon=True).start()
+        return self.ports()
+
+    def ports(self):
+        """
+        Return the ports the servers listen on.
+        """
+        return {"cli_port": self.cli_port, "http_port": self.http_port, "discovery_port": self.discovery_port}
+
+    def stop(self):
+        """
+        Stop both servers and close all connections.
+        """
+        self.stopped.set()
+        self.close_clients()
+        self.close_listener()
+        if self.discovery_socket is not None:
+            self.discovery_socket.close()
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+
+    @staticmethod
+    def open_listener(port):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(("127.0.0.1", port))
+        listener.listen(16)
+        return listener
+
+    def close_listener(self):
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            try:
+                listener.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            listener.close()
+
+    # Discovery
+
+    def discovery_loop(self):
+        """
+        Answer discovery requests: 'e' followed by tags, answered with 'E' and the values of the known tags.
+        """
+        while not self.stopped.is_set():
+            try:
+                data, sender = self.discovery_socket.recvfrom(1024)
+            except OSError:
+                return
+            if not data.startswith(b"e"):
+                continue
+            self.counts["discovery_requests"] += 1
+            values = {
+                b"NAME": b"Bench LMS",
+                b"IPAD": b"127.0.0.1",
+                b"JSON": str(self.http_port).encode(),
+                b"CLIP": str(self.cli_port).encode(),
+                b"UUID": b"bench-%d" % self.cli_port,
+            }
+            reply = b"E"
+            offset = 1
+            while offset + 5 <= len(data):
+                tag, length = data[offset:offset + 4], data[offset + 4]
+                offset += 5 + length
+                if tag in values:
+                    reply += tag + bytes((len(values[tag]),)) + values[tag]
+            try:
+                self.discovery_socket.sendto(reply, sender)
+            except OSError:
+                pass
+
+    # Player control, called by benchmarks
+
+    def skip(self, steps=1):
+        """
+        Move to another track and notify subscribers.
+
+        Args:
+            steps (int): The number of tracks to move forward.
+
+        Returns:
+            tuple: The monotonic time the notifications were sent and the new title.
+        """
+        with self.lock:
+            self.current = (self.current + steps) % len(self.tracks)
+            self.mode = "play"
+            self.position_at = time.monotonic()
+            track = self.tracks[self.current]
+            sent_at = time.monotonic()
+            self.notify(["playlist", "newsong", track["title"], self.current])
+        return sent_at, track["title"]
+
+    def pause(self, paused=True):
+        """
+        Pause or resume playback and notify subscribers.
+
+        Returns:
+            float: The monotonic time the notifications were sent.
+        """
+        with self.lock:
+            self.mode = "pause" if paused else "play"
+            sent_at = time.monotonic()
+            self.notify(["playlist", "pause", 1 if paused else 0])
+        return sent_at
+
+    def load_playlist(self, size):
+        """
+        Replace the playlist and start playing its first track.
+
+        Returns:
+            tuple: The monotonic time the notifications were sent and the new title.
+        """
+        with self.lock:
+            self.generation += 1
+            self.tracks = make_tracks(size, self.generation)
+            self.current = 0
+            self.position_at = time.monotonic()
+            self.timestamp = time.time()
+            sent_at = time.monotonic()
+            self.notify(["playlist", "load_done"])
+        return sent_at, self.tracks[0]["title"]
+
+    def drop_connections(self, refuse_for=0.0):
+        """
+        Close all CLI connections, optionally refusing new ones for a while.
+
+        Args:
+            refuse_for (float): Seconds during which the CLI port is closed.
+        """
+        if refuse_for > 0:
+            self.accepting.clear()
+            self.close_listener()
+        self.close_clients()
+        if refuse_for > 0:
+            time.sleep(refuse_for)
+            self.listener = self.open_listener(self.cli_port)
+            self.accepting.set()
+
+    def client_count(self):
+        """
+        Return the number of open CLI connections.
+        """
+        with self.lock:
+            return len(self.clients)
+
+    def stats(self):
+        """
+        Return the request counters.
+        """
+        with self.lock:
+            return dict(self.counts, clients=len(self.clients))
+
+    # Status
+
+    def status_result(self, start, count, player_id=PLAYER_ID):
+        """
+        Build the 'result' of a status query. Caller must hold the lock.
+
+        Args:
+            start: The first playlist index, or '-' for the current track.
+            count (int): The maximum number of playlist entries.
+            player_id (str): The player queried; FakeLMS answers for its one player whatever the ID.
+
+        Returns:
+            dict: The status result in JSON-RPC field names.
+        """
+        first = self.current if start in ("-", None) else int(start)
+        entries = []
+        for index in range(first, min(len(self.tracks), first + int(count))):
+            entry = {"playlist index": index}
+            entry.update(self.tracks[index])
+            entries.append(entry)
+        elapsed = time.monotonic() - self.position_at if self.mode == "play" else 0.0
+        return {
+            "player_name": PLAYER_NAME,
+            "player_connected": 1,
+            "power": 1,
+            "mode": self.mode,
+            "time": round(elapsed, 3),
+            "rate": 1,
+            "playlist_cur_index": self.current,
+            "playlist_timestamp": self.timestamp,
+            "playlist_tracks": len(self.tracks),
+            "playlist_loop": entries,
+        }
+
+    def player_ids(self):
+        """
+        Return the IDs of the players served. Caller must hold the lock.
+        """
+        return [PLAYER_ID]
+
+    def serverstatus_result(self):
+        """
+        Build the 'result' of a serverstatus request. Caller must hold the lock.
+
+        Returns:
+            dict: The player count and the players_loop, in JSON-RPC field names.
+        """
+        players = []
+        for player_id in self.player_ids():
+            status = self.status_result("-", 0, player_id)
+            players.append({
+                "playerid": player_id,
+                "name": status["player_name"],
+                "connected": 1,
+                "power": 1,
+                "isplaying": 1 if status["mode"] == "play" else 0,
+            })
+        return {"player count": len(players), "players_loop": players}
+
+    def rpc_result(self, params, player_id=PLAYER_ID):
+        """
+        Build the 'result' of a JSON-RPC request. Caller must hold the lock.
+
+        Args:
+            params (list): The request parameters, starting with 'status' or 'serverstatus'.
+            player_id (str): The player the request is for.
+
+        Returns:
+            dict: The status or serverstatus result.
+        """
+        if params and params[0] == "serverstatus":
+            return self.serverstatus_result()
+        return self.status_result(params[1] if len(params) > 1 else "-", params[2] if len(params) > 2 else 1, player_id)
+
+    def cli_status_line(self, params, player_id=PLAYER_ID):
+        """
+        Build the CLI reply to a status query. Caller must hold the lock.
+
+        Args:
+            params (list): The decoded query tokens after the player ID, starting with 'status'.
+            player_id (str): The player the query is for.
+
+        Returns:
+            bytes: The reply line.
+        """
+        start = params[1] if len(params) > 1 else "-"
+        count = params[2] if len(params) > 2 else 1
+        result = self.status_result(start, count, player_id)
+        tokens = [player_id] + list(params)
+        for key, value in result.items():
+            if key == "playlist_loop":
+                for entry in value:
+                    tokens.extend(f"{field}:{entry_value}" for field, entry_value in entry.items())
+            else:
+                tokens.append(f"{key}:{value}")
+        return encode_tokens(tokens)
+
+    def notify(self, event_tokens):
+        """
+        Send a change to every subscriber: the event to event subscribers, the status to status subscribers.
+        A connection subscribed to both gets both, as from LMS.
+        Caller must hold the lock.
+        """
+        event_line = encode_tokens([PLAYER_ID] + event_tokens)
+        for client, subscription in list(self.clients.items()):
+            lines = []
+            if subscription["events"]:
+                lines.append(event_line)
+            if subscription["status"] is not None:
+                lines.append(self.cli_status_line(subscription["status"]))
+            if not lines:
+                continue
+            try:
+                client.sendall(b"".join(lines))
+                self.counts["events_sent"] += len(lines)
+            except OSError:
+                self.clients.pop(client, None)
+
+    # CLI server
+
+    def accept_loop(self):
+        while not self.stopped.is_set():
+            self.accepting.wait()
+            listener = self.listener
+            if listener is None:
+                time.sleep(0.01)
+                continue
+            try:
+                client, _ = listener.accept()
+            except OSError:
+                continue  # Listener closed to refuse connections, or shutting down
+            with self.lock:
+                self.clients[client] = {"events": False, "status": None}
+                self.counts["connections"] += 1
+            threading.Thread(target=self.serve_client, args=(client,), name="fake-lms-client", daemon=True).start()
+
+    def serve_client(self, client):
+        buffer = b""
+        try:
+            while not self.stopped.is_set():
+                data = client.recv(65536)
+                if not data:
+                    break
+                buffer += data
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    self.handle_command(client, [unquote(token) for token in line.decode("utf-8").strip().split(" ") if token])
+        except OSError:
+            pass
+        finally:
+            with self.lock:
+                self.clients.pop(client, None)
+            client.close()
+
+    def handle_command(self, client, tokens):
+        if not tokens:
+            return
+        if self.cli_delay and len(tokens) > 1 and tokens[1] == "status":
+            time.sleep(self.cli_delay)  # Replies on this connection queue up behind the slow one
+        with self.lock:
+            subscription = self.clients.get(client)
+            if subscription is None:
+                return
+            if tokens[0] == "subscribe":
+                subscription["events"] = len(tokens) > 1 and tokens[1] != "0"
+                reply = encode_tokens(tokens)
+            elif len(tokens) > 1 and tokens[1] == "status":
+                params = tokens[1:]
+                self.counts["cli_queries"] += 1
+                if "subscribe:-" in params:
+                    subscription["status"] = None
+                elif any(param.startswith("subscribe:") for param in params):
+                    subscription["status"] = params
+                reply = self.cli_status_line(params, tokens[0])
+            else:
+                reply = encode_tokens(tokens)  # Echo unknown commands, as LMS does
+        try:
+            client.sendall(reply)
+        except OSError:
+            pass
+
+    def close_clients(self):
+        with self.lock:
+            clients = list(self.clients)
+            self.clients.clear()
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            client.close()
+
+    # HTTP server
+
+    def make_http_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Headers and body are written separately
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path != "/jsonrpc.js":
+                    return self.reply(404, b"")
+                request = json.loads(body)
+                params = request["params"][1]
+                if server.http_delay:
+                    time.sleep(server.http_delay)
+                with server.lock:
+                    server.counts["http_requests"] += 1
+                    result = server.rpc_result(params, request["params"][0])
+                payload = {"id": request.get("id"), "method": "slim.request", "params": request["params"], "result": result}
+                self.reply(200, json.dumps(payload).encode("utf-8"), "application/json")
+
+            def do_GET(self):
+                if not self.path.startswith("/music/"):
+                    return self.reply(404, b"")
+                with server.lock:
+                    server.counts["artwork_requests"] += 1
+                self.reply(200, COVER_BYTES, "image/jpeg")
+
+            def reply(self, status, body, content_type="text/plain"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+class MultiPlayerLMS(FakeLMS):
+    """
+    FakeLMS with several players sharing one playlist, each at its own position.
+    The first player is PLAYER_ID; status pushes follow it as in FakeLMS.
+
+    Args:
+        players (int): The number of players.
+        **kwargs: Passed to FakeLMS.
+    """
+
+    def __init__(self, players=20, **kwargs):
+        super().__init__(**kwargs)
+        self.players = [PLAYER_ID] + [f"00:04:20:00:{index // 256:02x}:{index % 256:02x}" for index in range(1, players)]
+        self.positions = {player_id: index * 7 % len(self.tracks) for index, player_id in enumerate(self.players[1:], 1)}
+
+    def player_ids(self):
+        return list(self.players)
+
+    def status_result(self, start, count, player_id=PLAYER_ID):
+        player_id = player_id.lower()
+        if player_id == PLAYER_ID or player_id not in self.positions:
+            return super().status_result(start, count, player_id)
+        current, self.current = self.current, self.positions[player_id]
+        try:
+            result = super().status_result(start, count, player_id)
+        finally:
+            self.current = current
+        result["player_name"] = f"Player {self.players.index(player_id)}"
+        return result
+
+    def skip_player(self, index, steps=1):
+        """
+        Move one player to another track and send the event to event subscribers.
+
+        Args:
+            index (int): The player's position in the player list; 0 is PLAYER_ID.
+            steps (int): The number of tracks to move forward.
+
+        Returns:
+            tuple: The monotonic time the notification was sent, the player ID and the new title.
+        """
+        if index == 0:
+            sent_at, title = self.skip(steps)
+            return sent_at, PLAYER_ID, title
+        with self.lock:
+            player_id = self.players[index]
+            self.positions[player_id] = (self.positions[player_id] + steps) % len(self.tracks)
+            track = self.tracks[self.positions[player_id]]
+            line = encode_tokens([player_id, "playlist", "newsong", track["title"], self.positions[player_id]])
+            sent_at = time.monotonic()
+            for client, subscription in list(self.clients.items()):
+                if not subscription["events"]:
+                    continue
+                try:
+                    client.sendall(line)
+                    self.counts["events_sent"] += 1
+                except OSError:
+                    self.clients.pop(client, None)
+        return sent_at, player_id, track["title"]
+
+def serve_process(connection, server_class, kwargs):
+    """
+    Child process entry point: run a server and execute method calls sent over the pipe.
+    """
+    server = server_class(**kwargs)
+    connection.send(server.start())
+    while True:
+        name, args = connection.recv()
+        if name == "stop":
+            server.stop()
+            connection.send(None)
+            return
+        connection.send(getattr(server, name)(*args))
+
+class FakeLMSProcess:
+    """
+    Runs a FakeLMS in a child process and proxies its player control methods.
+
+    Args:
+        server_class (type): FakeLMS or a subclass of it.
+        **kwargs: The arguments for the server class.
+    """
+
+    def __init__(self, server_class=FakeLMS, **kwargs):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=serve_process, args=(child, server_class, kwargs), daemon=True)
+        self.process.start()
+        ports = self.connection.recv()
+        self.cli_port = ports["cli_port"]
+        self.http_port = ports["http_port"]
+        self.discovery_port = ports["discovery_port"]
+
+    def call(self, name, *args):
+        self.connection.send((name, args))
+        return self.connection.recv()
+
+    def skip(self, steps=1):
+        return self.call("skip", steps)
+
+    def pause(self, paused=True):
+        return self.call("pause", paused)
+
+    def load_playlist(self, size):
+        return self.call("load_playlist", size)
+
+    def drop_connections(self, refuse_for=0.0):
+        return self.call("drop_connections", refuse_for)
+
+    def client_count(self):
+        return self.call("client_count")
+
+    def stats(self):
+        return self.call("stats")
+
+    def stop(self):
+        if self.process.is_alive():
+            self.call("stop")
+        self.process.join(timeout=5)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake LMS server for offline benchmarks.")
+    parser.add_argument("--cli-port", type=int, default=9090)
+    parser.add_argument("--http-port", type=int, default=9000)
+    parser.add_argument("--tracks", type=int, default=50)
+    parser.add_argument("--skip-every", type=float, default=0.0, help="Skip to the next track every N seconds")
+    args = parser.parse_args()
+
+    server = FakeLMS(playlist_size=args.tracks, cli_port=args.cli_port, http_port=args.http_port)
+    print(f"Fake LMS for player {PLAYER_ID}: {server.start()}")
+    try:
+        while True:
+            if args.skip_every > 0:
+                time.sleep(args.skip_every)
+                print("Now playing:", server.skip()[1])
+            else:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Replay a recorded CLI and JSON-RPC trace into the addon, at recorded speed, faster, or as fast as possible.
+
+Traces are recorded by the addon when the "Debug: Record CLI and JSON-RPC traces" setting
+is on (in the addon profile, under traces/), or by `run_benchmarks.py --record`.
+
+A ReplayLMS stands in for the server: it sends the recorded notifications and status
+pushes to the addon with their recorded spacing divided by the speed, and answers status
+queries over the CLI and JSON-RPC with the first response recorded at or after the
+notification last sent. The same trace therefore drives the addon through the same
+sequence of states on every run, and the latency and CPU figures can be compared
+between code versions.
+
+Usage:
+    python bench/replay_trace.py TRACE [--speed 1|10|max] [--engine threads|asyncio]
+                                       [--transport cli|http|push] [--json FILE]
+"""
+
+import argparse
+import bisect
+import gzip
+import json
+import os
+import time
+from urllib.parse import unquote
+
+from fake_lms import PLAYER_ID, FakeLMS, FakeLMSProcess
+from run_benchmarks import Harness, add_import_paths, resource_usage
+
+# Record kinds, as written by resources/lib/utils/trace_recorder.py
+RECORD_CLI_EVENT = "c"
+RECORD_CLI_REPLY = "r"
+RECORD_HTTP = "h"
+
+# Leading status parameters that identify a query, as in the addon's cli_request_key()
+QUERY_KEY_PARAMS = 3
+
+# Seconds to wait after the last event for the addon to finish updating
+SETTLE_TIME = 2.0
+
+def load_trace(path):
+    """
+    Read a trace file.
+
+    Args:
+        path (str): The trace file, gzip-compressed or plain JSON lines.
+
+    Returns:
+        tuple: The header dict and the list of records.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        records = [json.loads(line) for line in f if line.strip()]
+    return header, records
+
+def status_line_key(line):
+    """
+    Return the query key of a CLI status line, or None if the line is not a status line.
+    """
+    tokens = line.rstrip(b"\r\n").split(b" ", QUERY_KEY_PARAMS + 1)
+    if len(tokens) < 2 or tokens[1] != b"status":
+        return None
+    return tuple(unquote(token.decode("latin-1")) for token in tokens[1:QUERY_KEY_PARAMS + 1])
+
+def query_key(params):
+    """
+    Return the query key of status query parameters.
+    """
+    return tuple(str(param) for param in params[:QUERY_KEY_PARAMS])
+
+class ResponseTimeline:
+    """
+    Responses recorded for one query key, in trace order.
+    """
+
+    def __init__(self):
+        self.times = []
+        self.responses = []
+
+    def add(self, at, response):
+        self.times.append(at)
+        self.responses.append(response)
+
+    def at(self, trace_time):
+        """
+        Return the first response recorded at or after the trace time, or the last one.
+        """
+        index = bisect.bisect_left(self.times, trace_time)
+        return self.responses[min(index, len(self.responses) - 1)]
+
+class ReplayLMS(FakeLMS):
+    """
+    FakeLMS that plays back a recorded trace instead of simulating a player.
+
+    Args:
+        trace_path (str): The trace file.
+        **kwargs: Passed to FakeLMS.
+    """
+
+    def __init__(self, trace_path, **kwargs):
+        super().__init__(playlist_size=1, **kwargs)
+        self.header, records = load_trace(trace_path)
+        self.events = []  # (trace time, raw line) of notifications and status pushes
+        self.cli_responses = {}
+        self.rpc_responses = {}
+        for record in records:
+            at, kind = record[0], record[1]
+            if kind in (RECORD_CLI_EVENT, RECORD_CLI_REPLY):
+                line = record[2].encode("latin-1")
+                if kind == RECORD_CLI_EVENT:
+                    self.events.append((at, line))
+                key = status_line_key(line)
+                if key is not None:
+                    self.cli_responses.setdefault(key, ResponseTimeline()).add(at, line)
+            elif kind == RECORD_HTTP:
+                self.rpc_responses.setdefault(query_key(record[2]), ResponseTimeline()).add(at, record[3])
+        self.trace_time = self.events[0][0] if self.events else 0.0
+
+    def cli_status_line(self, params, player_id=PLAYER_ID):
+        timeline = self.cli_responses.get(query_key(params))
+        if timeline is None:
+            return super().cli_status_line(params, player_id)
+        return timeline.at(self.trace_time)
+
+    def rpc_result(self, params, player_id=PLAYER_ID):
+        timeline = self.rpc_responses.get(query_key(params))
+        if timeline is None:
+            return super().rpc_result(params, player_id)
+        return timeline.at(self.trace_time).get("result")
+
+    def replay(self, speed):
+        """
+        Send the recorded notifications to the connected clients.
+
+        Args:
+            speed (float): The playback speed, e.g. 1 or 10, or 0 for as fast as possible.
+
+        Returns:
+            dict: The number of lines sent, the recorded span and the replay time in seconds.
+        """
+        started = time.monotonic()
+        first = self.events[0][0] if self.events else 0.0
+        for at, line in self.events:
+            if speed > 0:
+                delay = started + (at - first) / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            with self.lock:
+                self.trace_time = at
+                for client, subscription in list(self.clients.items()):
+                    if not subscription["events"] and subscription["status"] is None:
+                        continue
+                    try:
+                        client.sendall(line)
+                        self.counts["events_sent"] += 1
+                    except OSError:
+                        self.clients.pop(client, None)
+        return {
+            "lines": len(self.events),
+            "trace_span_s": self.events[-1][0] - first if self.events else 0.0,
+            "replay_s": time.monotonic() - started
+        }
+
+def parse_speed(value):
+    """
+    Parse a --speed value: a positive factor, or 'max' for as fast as possible.
+    """
+    if value == "max":
+        return 0.0
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive, or 'max'")
+    return speed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="Playback speed: 1, 10, ... or 'max'")
+    parser.add_argument("--engine", choices=("threads", "asyncio"), default="threads")
+    parser.add_argument("--transport", choices=("cli", "http", "push"), default="cli")
+    parser.add_argument("--debounce-ms", type=int, default=300)
+    parser.add_argument("--json", help="Write the result to this file")
+    args = parser.parse_args()
+
+    add_import_paths()
+    header, _ = load_trace(args.trace)
+    fake = FakeLMSProcess(server_class=ReplayLMS, trace_path=os.path.abspath(args.trace))
+    try:
+        harness = Harness(fake, args.engine, args.transport, args.debounce_ms, player_id=header["player_id"])
+        harness.start()
+        from resources.lib.api.telnet_handler import telnet_handler
+        from resources.lib.ui.status_fingerprint import status_fingerprint
+        from resources.lib.utils.latency_tracer import latency_tracer
+        latency_tracer.reset()
+
+        cpu_before, _ = resource_usage()
+        renders_before = harness.render_count
+        replayed = fake.call("replay", args.speed)
+        time.sleep(SETTLE_TIME)
+        cpu_after, peak_rss = resource_usage()
+
+        result = {
+            "trace": args.trace,
+            "speed": args.speed or "max",
+            "engine": args.engine,
+            "transport": args.transport,
+            "replay": replayed,
+            "title_renders": harness.render_count - renders_before,
+            "events": telnet_handler.get_event_stats(),
+            "fetches": telnet_handler.get_fetch_stats(),
+            "ui_skips": status_fingerprint.stats(),
+            "latency": latency_tracer.summary(),
+            "cpu_s": cpu_after - cpu_before,
+            "peak_rss_mb": peak_rss,
+            "server": fake.stats(),
+        }
+        harness.stop()
+    finally:
+        fake.stop()
+
+    print(f"Replayed {replayed['lines']} lines spanning {replayed['trace_span_s']:.1f} s in {replayed['replay_s']:.1f} s "
+          f"({args.engine}, {args.transport}, speed {result['speed']})")
+    print(f"Title renders: {result['title_renders']}  events: {result['events']}  fetches: {result['fetches']}")
+    print(f"CPU: {result['cpu_s']:.2f} s  peak RSS: {peak_rss:.1f} MB")
+    print(latency_tracer.format_summary())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,604 @@
+"""
+Headless end-to-end benchmarks: the addon against a fake LMS, outside Kodi.
+
+Each scenario runs in a fresh Python process with the stub xbmc modules from
+bench/stubs, the real TelnetHandler, status fetching and NowPlaying window, and a
+FakeLMS in a separate child process. Event-to-render latency is measured from the
+moment the fake server sends a notification until the title control shows the new
+track; the addon's own latency tracer is reported next to it.
+
+Scenarios:
+    steady_play      Track changes spaced well apart, each rendered on its own.
+    rapid_skipping   Bursts of skips a few milliseconds apart, coalesced by the addon.
+    large_playlist   A 10,000-track playlist with skips and scrolling through the list.
+    reconnect_storm  CLI connections dropped repeatedly, sometimes with the port refusing connections.
+    http_fetch       Back-to-back fetch_lms_status() calls over HTTP.
+    dashboard        The multi-player dashboard following 30 players, with single changes and bursts across players.
+    multi_server     The dashboard following three servers, one of them slow; changes on the others must not wait for it.
+    discovery        Startup with a wrong server address and no cache: the first connect fails and discovery finds the fake.
+    discovery_cached Startup with a wrong server address and a discovery cache from an earlier run.
+    snapshot         Opening the window against a slow server with the state saved by an earlier run: the saved
+                     state must be painted at once, the live status once it arrives.
+
+Usage:
+    python bench/run_benchmarks.py [--scenario NAME ...] [--engine threads asyncio]
+                                   [--transport cli http push] [--quick] [--record] [--json FILE]
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from fake_lms import PLAYER_ID, FakeLMS, FakeLMSProcess, MultiPlayerLMS
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR = os.path.join(BENCH_DIR, "..", "addon")
+
+SCENARIOS = ("steady_play", "rapid_skipping", "large_playlist", "reconnect_storm", "http_fetch", "dashboard", "multi_server",
+             "discovery", "discovery_cached", "snapshot")
+DASHBOARD_PLAYERS = 30
+MULTI_SERVER_PLAYERS = 10
+SLOW_SERVER_DELAY = 0.3  # Seconds per CLI status reply and per JSON-RPC response
+SNAPSHOT_TITLE = "Saved by an earlier run"
+SCROLL_STALL_MS = 1000  # A page load slower than this is a stall, e.g. the pager waiting on the event loop
+RESULT_MARKER = "BENCH_RESULT "
+
+def percentile(values, fraction):
+    """
+    Return the nearest-rank percentile of a list of values, or None if it is empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+def resource_usage():
+    """
+    Return the CPU time used by this process so far and its peak RSS in MB.
+    """
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return time.process_time(), None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    peak_kb = usage.ru_maxrss / 1024 if sys.platform == "darwin" else usage.ru_maxrss  # Bytes on macOS
+    return usage.ru_utime + usage.ru_stime, peak_kb / 1024
+
+# Scenario process
+
+class Harness:
+    """
+    The addon wired to a fake LMS, with a title control that records when each title is rendered.
+    """
+
+    def __init__(self, fake, engine, transport, debounce_ms, player_id=PLAYER_ID, record_trace=False, dashboard=False, extra_fakes=(),
+                 discovery=None, snapshot=False):
+        import xbmcaddon
+        import xbmcgui
+        from resources.lib.utils import constants
+
+        self.fake = fake
+        self.dashboard = dashboard
+        self.extra_fakes = list(extra_fakes)
+        self.rendered = {}  # Title -> monotonic time it was first shown
+        self.render_count = 0
+        self.condition = threading.Condition()
+        harness = self
+
+        class TitleRecorder(xbmcgui.ControlLabel):
+            def setLabel(self, label):
+                super().setLabel(label)
+                with harness.condition:
+                    harness.render_count += 1
+                    harness.rendered.setdefault(label, time.monotonic())
+                    harness.condition.notify_all()
+
+        xbmcgui.Window.control_types = {
+            constants.CONTROL_ID_ARTWORK_BACKGROUND: xbmcgui.ControlImage,
+            constants.CONTROL_ID_ARTWORK: xbmcgui.ControlImage,
+            constants.CONTROL_ID_NOW_PLAYING_TITLE: TitleRecorder,
+            constants.CONTROL_ID_PLAYLIST: xbmcgui.ControlList,
+            constants.CONTROL_ID_PROGRESS: xbmcgui.ControlProgress,
+            constants.CONTROL_ID_LATENCY_OVERLAY: xbmcgui.ControlTextBox,
+            constants.CONTROL_ID_DASHBOARD_PLAYERS: xbmcgui.ControlList,
+        }
+        xbmcaddon.settings.update({
+            constants.ADDON_SETTING_LMS_SERVER: "127.0.0.1",
+            constants.ADDON_SETTING_LMS_PORT: fake.http_port,
+            constants.ADDON_SETTING_LMS_TELNET_PORT: fake.cli_port,
+            constants.ADDON_SETTING_LMS_PLAYER_ID: player_id,
+            constants.ADDON_SETTING_STATUS_TRANSPORT: transport,
+            constants.ADDON_SETTING_EVENT_ENGINE: engine,
+            constants.ADDON_SETTING_DEBOUNCE_TIME: debounce_ms,
+            constants.ADDON_SETTING_DEBOUNCE_MAX_WAIT: max(debounce_ms, 1000),
+            constants.ADDON_SETTING_LATENCY_TRACING: "true",
+            constants.ADDON_SETTING_TRACE_RECORDING: "true" if record_trace else "false",
+            constants.ADDON_SETTING_DASHBOARD_MODE: "true" if dashboard else "false",
+            constants.ADDON_SETTING_LMS_EXTRA_SERVERS: ",".join(f"127.0.0.1:{extra.http_port}:{extra.cli_port}" for extra in extra_fakes),
+            constants.ADDON_SETTING_LMS_DISCOVERY: "false",
+        })
+        self.constants = constants
+        if discovery:
+            self.configure_discovery(discovery == "cached")
+        if snapshot:
+            self.save_snapshot()
+
+    def configure_discovery(self, cached):
+        """
+        Point the settings at ports nothing listens on and aim discovery at the fake's responder.
+
+        Args:
+            cached (bool): Whether to leave a discovery cache entry for the fake, as an earlier run would.
+        """
+        import xbmcaddon
+        from resources.lib.api.server_discovery import server_discovery
+        from resources.lib.utils.profile_paths import get_profile_dir
+        from resources.lib.utils import constants
+
+        xbmcaddon.settings.update({
+            constants.ADDON_SETTING_LMS_PORT: unused_port(),
+            constants.ADDON_SETTING_LMS_TELNET_PORT: unused_port(),
+            constants.ADDON_SETTING_LMS_DISCOVERY: "true",
+        })
+        server_discovery.address = "127.0.0.1"
+        server_discovery.port = self.fake.discovery_port
+        if cached:
+            settings = xbmcaddon.settings
+            server_discovery.cache_path = os.path.join(get_profile_dir(), constants.DISCOVERY_CACHE_FILE)
+            server_discovery.configured = [settings[constants.ADDON_SETTING_LMS_SERVER], str(settings[constants.ADDON_SETTING_LMS_PORT]),
+                                           str(settings[constants.ADDON_SETTING_LMS_TELNET_PORT])]
+            server_discovery.save_cache({"name": "Bench LMS", "host": "127.0.0.1", "http_port": self.fake.http_port,
+                                         "cli_port": self.fake.cli_port, "uuid": None})
+
+    def save_snapshot(self):
+        """
+        Leave a saved NowPlaying state in the profile, with its artwork in the cache, as an earlier run would.
+        """
+        from resources.lib.ui.state_snapshot import state_snapshot
+        from resources.lib.utils.profile_paths import get_profile_dir
+        from resources.lib.utils import constants
+
+        artwork = os.path.join(get_profile_dir(constants.ARTWORK_CACHE_DIR), "saved.jpg")
+        with open(artwork, "wb") as f:
+            f.write(b"\xff\xd8\xff\xd9")
+        state_snapshot.path = os.path.join(get_profile_dir(), constants.STATE_SNAPSHOT_FILE)
+        state_snapshot.player_id = PLAYER_ID
+        row = {"playlist index": 0, "id": 1, "title": SNAPSHOT_TITLE, "artist": "Saved", "album": "Saved", "duration": 180.0}
+        state_snapshot.record({"result": {"mode": "play", "time": 42.0, "playlist_tracks": 1, "playlist_cur_index": 0,
+                                          "playlist_loop": [row]}}, artwork)
+        state_snapshot.flush()
+
+    def start(self):
+        """
+        Initialise the addon as AddonMonitor does, wait for its CLI connection and open the window.
+        """
+        from resources.lib.utils.addon_monitor import AddonMonitor
+        from resources.lib.ui.now_playing import NowPlaying
+        from resources.lib.ui.dashboard import Dashboard
+
+        started = time.monotonic()
+        self.monitor = AddonMonitor()
+        wait_until(lambda: self.fake.client_count() > 0, 10, 0.001)
+        self.connect_ms = (time.monotonic() - started) * 1000
+        if self.dashboard:
+            self.window = Dashboard(self.constants.DASHBOARD_XML, ADDON_DIR)
+        else:
+            self.window = NowPlaying(self.constants.NOW_PLAYING_XML, ADDON_DIR)
+        self.opened_at = time.monotonic()
+        self.window.doModal()
+
+    def stop(self):
+        from resources.lib.utils.shutdown_handler import shutdown_addon
+        shutdown_addon()
+
+    def wait_for_title(self, title, timeout=10.0):
+        """
+        Wait until a title has been rendered.
+
+        Returns:
+            float: The monotonic time it was first rendered, or None if it was not rendered in time.
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while title not in self.rendered:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+            return self.rendered[title]
+
+    def skip_and_measure(self, steps=1, timeout=10.0):
+        """
+        Skip tracks on the server and return the event-to-render latency in milliseconds, or None on timeout.
+        """
+        sent_at, title = self.fake.skip(steps)
+        rendered_at = self.wait_for_title(title, timeout)
+        return None if rendered_at is None else (rendered_at - sent_at) * 1000
+
+def unused_port():
+    """
+    Return a local TCP port that nothing listens on.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until(predicate, timeout, interval=0.01):
+    """
+    Poll a predicate until it is true or the timeout passes.
+
+    Returns:
+        bool: Whether the predicate became true.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+    return False
+
+def scenario_steady_play(harness, quick):
+    """
+    Track changes spaced further apart than the debounce ceiling.
+    """
+    latencies = []
+    for _ in range(4 if quick else 15):
+        time.sleep(0.8)
+        latencies.append(harness.skip_and_measure())
+    return {"events": len(latencies), "latencies": latencies}
+
+def scenario_rapid_skipping(harness, quick):
+    """
+    Bursts of skips; latency is measured from the last skip of a burst to its title being shown.
+    """
+    latencies = []
+    events = 0
+    for _ in range(2 if quick else 5):
+        time.sleep(1.2)
+        for _ in range(39):
+            harness.fake.skip()
+            time.sleep(0.01)
+        latencies.append(harness.skip_and_measure())
+        events += 40
+    return {"events": events, "latencies": latencies}
+
+def scenario_large_playlist(harness, quick):
+    """
+    Load a 10,000-track playlist, then skip far ahead and scroll through the playlist after each skip.
+    """
+    import xbmcgui
+    from resources.lib.ui.playlist_pager import playlist_pager
+
+    sent_at, title = harness.fake.load_playlist(10000)
+    rendered_at = harness.wait_for_title(title)
+    latencies = [None if rendered_at is None else (rendered_at - sent_at) * 1000]
+    scroll_times = []
+    window = harness.window
+    playlist = window.getControl(harness.constants.CONTROL_ID_PLAYLIST)
+    window.setFocusId(harness.constants.CONTROL_ID_PLAYLIST)
+
+    for _ in range(3 if quick else 10):
+        time.sleep(0.8)
+        latencies.append(harness.skip_and_measure(397))
+        for step in range(60):  # Scroll down past the loaded rows, one page at a time
+            if step == 30:
+                harness.fake.skip()  # A status update arriving while pages load must not stall the scrolling
+            playlist.selectItem(min(playlist.size() - 1, playlist.getSelectedPosition() + 10))
+            started = time.perf_counter()
+            window.onAction(xbmcgui.ACTION_PAGE_DOWN)
+            scroll_times.append((time.perf_counter() - started) * 1000)
+    stalls = [ms for ms in scroll_times if ms > SCROLL_STALL_MS]
+    assert not stalls, f"{len(stalls)} scroll(s) stalled, the slowest for {max(stalls):.0f} ms"
+    return {
+        "events": len(latencies),
+        "latencies": latencies,
+        "extra": {
+            "scroll_p50_ms": percentile(scroll_times, 0.5),
+            "scroll_p99_ms": percentile(scroll_times, 0.99),
+            "pager": playlist_pager.stats(),
+        }
+    }
+
+def scenario_reconnect_storm(harness, quick):
+    """
+    Drop the CLI connections repeatedly; every other time the port refuses connections for a second.
+    Measures how long the addon takes to reconnect and the latency of the first change afterwards.
+    """
+    from resources.lib.api.telnet_handler import telnet_handler
+
+    latencies = []
+    recoveries = []
+    for drop in range(4 if quick else 10):
+        time.sleep(0.3)
+        dropped_at = time.monotonic()
+        harness.fake.drop_connections(1.0 if drop % 2 else 0.0)
+        if wait_until(lambda: harness.fake.client_count() > 0, 30):
+            recoveries.append((time.monotonic() - dropped_at) * 1000)
+        time.sleep(0.1)  # Let the subscription settle before the change
+        latencies.append(harness.skip_and_measure(timeout=15))
+    return {
+        "events": len(latencies),
+        "latencies": latencies,
+        "extra": {
+            "recovery_p50_ms": percentile(recoveries, 0.5),
+            "recovery_max_ms": max(recoveries) if recoveries else None,
+            "reconnect_stats": telnet_handler.get_reconnect_stats(),
+        }
+    }
+
+def scenario_http_fetch(harness, quick):
+    """
+    Back-to-back JSON-RPC status fetches, bypassing the CLI.
+    """
+    from resources.lib.api.fetch_lms_status import fetch_lms_status
+
+    latencies = []
+    for _ in range(100 if quick else 1000):
+        started = time.perf_counter()
+        fetch_lms_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {"events": len(latencies), "latencies": latencies}
+
+def scenario_dashboard(harness, quick):
+    """
+    Change the track of single players, then of every player at once, on a server with many players.
+    Latency is measured until the player's row shows the new title; the extra figures show how
+    many status queries the tracker needed and how they were batched.
+    """
+    from resources.lib.api.player_tracker import player_tracker
+
+    def shows(player_id, title):
+        return row_shows(harness.window, player_tracker, player_id, title)
+
+    wait_until(lambda: len(harness.window.items) == DASHBOARD_PLAYERS, 10)
+    queries_before = harness.fake.stats()
+    tracker_before = player_tracker.stats()
+    latencies = []
+    events = 0
+    for round_index in range(3 if quick else 10):
+        time.sleep(0.8)
+        sent_at, player_id, title = harness.fake.call("skip_player", (round_index * 11) % DASHBOARD_PLAYERS)
+        events += 1
+        latencies.append((time.monotonic() - sent_at) * 1000 if wait_until(lambda: shows(player_id, title), 10, 0.001) else None)
+
+        time.sleep(0.8)
+        changes = [harness.fake.call("skip_player", index) for index in range(DASHBOARD_PLAYERS)]
+        events += len(changes)
+        if wait_until(lambda: all(shows(player_id, title) for _, player_id, title in changes), 10, 0.001):
+            latencies.append((time.monotonic() - changes[-1][0]) * 1000)
+        else:
+            latencies.append(None)
+
+    queries_after = harness.fake.stats()
+    tracker_after = player_tracker.stats()
+    batches = tracker_after["batches"] - tracker_before["batches"]
+    queried = tracker_after["players_queried"] - tracker_before["players_queried"]
+    return {
+        "events": events,
+        "latencies": latencies,
+        "extra": {
+            "status_queries": queries_after["cli_queries"] - queries_before["cli_queries"],
+            "http_requests": queries_after["http_requests"] - queries_before["http_requests"],
+            "query_batches": batches,
+            "players_per_batch": queried / batches if batches else None,
+        }
+    }
+
+def scenario_multi_server(harness, quick):
+    """
+    Three servers on one dashboard; the last one answers every status query slowly and keeps
+    changing tracks. Latency is measured on the two healthy servers, whose refreshes share the
+    worker pool with the slow server's.
+    """
+    from resources.lib.api.player_tracker import player_tracker
+    from resources.lib.api.lms_servers import server_manager
+    from resources.lib.api.worker_pool import worker_pool
+
+    fast_tracker, slow_tracker = server_manager.trackers()
+    healthy = [(harness.fake, player_tracker), (harness.extra_fakes[0], fast_tracker)]
+    slow_fake = harness.extra_fakes[1]
+    wait_until(lambda: len(harness.window.items) == 3 * MULTI_SERVER_PLAYERS, 30)
+
+    latencies = []
+    events = 0
+    for round_index in range(3 if quick else 10):
+        time.sleep(0.5)
+        slow_fake.call("skip_player", round_index % MULTI_SERVER_PLAYERS)  # The slow server is busy refreshing from here on
+        time.sleep(0.4)
+        for fake, tracker in healthy:
+            sent_at, player_id, title = fake.call("skip_player", (round_index * 3 + 1) % MULTI_SERVER_PLAYERS)
+            shown = wait_until(lambda: row_shows(harness.window, tracker, player_id, title), 10, 0.001)
+            latencies.append((time.monotonic() - sent_at) * 1000 if shown else None)
+        events += 3
+
+    sent_at, player_id, title = slow_fake.call("skip_player", 1)
+    slow_shown = wait_until(lambda: row_shows(harness.window, slow_tracker, player_id, title), 30, 0.001)
+    return {
+        "events": events + 1,
+        "latencies": latencies,
+        "extra": {
+            "slow_server_ms": (time.monotonic() - sent_at) * 1000 if slow_shown else None,
+            "slow_server_busy_s": worker_pool.stats(slow_tracker)["busy_s"],
+            "healthy_server_busy_s": worker_pool.stats(fast_tracker)["busy_s"],
+        }
+    }
+
+def scenario_discovery(harness, quick):
+    """
+    Track changes after a startup that had to find the server; the time to connect is measured by the harness.
+    """
+    from resources.lib.api.server_discovery import server_discovery
+
+    measured = scenario_steady_play(harness, True)
+    measured["extra"] = dict(connect_ms=harness.connect_ms, discovery_requests=harness.fake.stats()["discovery_requests"],
+                             cache_hits=server_discovery.stats()["cache_hits"])
+    return measured
+
+scenario_discovery_cached = scenario_discovery
+
+def scenario_snapshot(harness, quick):
+    """
+    Time from opening the window to the saved state and to the live status being shown; the latency is the latter.
+    """
+    def live_title_shown():
+        return any(title and title != SNAPSHOT_TITLE for title in harness.rendered)
+
+    wait_until(live_title_shown, 10, 0.001)
+    with harness.condition:
+        saved_at = harness.rendered.get(SNAPSHOT_TITLE)
+        live_at = min((at for title, at in harness.rendered.items() if title and title != SNAPSHOT_TITLE), default=None)
+    live_ms = None if live_at is None else (live_at - harness.opened_at) * 1000
+    measured = scenario_steady_play(harness, True)  # Updates after the reconciliation render as usual
+    measured["extra"] = dict(first_paint_ms=None if saved_at is None else (saved_at - harness.opened_at) * 1000, live_paint_ms=live_ms)
+    return measured
+
+def row_shows(window, tracker, player_id, title):
+    """
+    Check whether a dashboard row shows a title.
+    """
+    item = window.items.get((tracker, player_id))
+    return item is not None and title in item.getLabel2()
+
+def add_import_paths():
+    """
+    Make the stub xbmc modules and the addon importable.
+    """
+    sys.path[:0] = [os.path.join(BENCH_DIR, "stubs"), ADDON_DIR]
+
+def run_scenario(name, engine, transport, debounce_ms, quick, record_trace=False):
+    """
+    Run one scenario in this process and return its measurements.
+    """
+    add_import_paths()
+    dashboard = name in ("dashboard", "multi_server")
+    extra_fakes = []
+    if name == "multi_server":
+        fake = FakeLMSProcess(server_class=MultiPlayerLMS, players=MULTI_SERVER_PLAYERS, playlist_size=1000)
+        extra_fakes.append(FakeLMSProcess(server_class=MultiPlayerLMS, players=MULTI_SERVER_PLAYERS, playlist_size=1000))
+        extra_fakes.append(FakeLMSProcess(server_class=MultiPlayerLMS, players=MULTI_SERVER_PLAYERS, playlist_size=1000,
+                                          cli_delay=SLOW_SERVER_DELAY, http_delay=SLOW_SERVER_DELAY))
+    elif dashboard:
+        fake = FakeLMSProcess(server_class=MultiPlayerLMS, players=DASHBOARD_PLAYERS, playlist_size=1000)
+    elif name.startswith("discovery"):
+        fake = FakeLMSProcess(server_class=FakeLMS, playlist_size=1000, discovery_port=0)
+    elif name == "snapshot":
+        fake = FakeLMSProcess(server_class=FakeLMS, playlist_size=1000, cli_delay=SLOW_SERVER_DELAY, http_delay=SLOW_SERVER_DELAY)
+    else:
+        fake = FakeLMSProcess(server_class=FakeLMS, playlist_size=1000)  # Enough tracks that no scenario shows a title twice
+    try:
+        harness = Harness(fake, engine, transport, debounce_ms, record_trace=record_trace, dashboard=dashboard, extra_fakes=extra_fakes,
+                          discovery={"discovery": "cold", "discovery_cached": "cached"}.get(name), snapshot=name == "snapshot")
+        harness.start()
+        from resources.lib.utils.latency_tracer import latency_tracer, STAGE_TOTAL
+        latency_tracer.reset()
+
+        cpu_before, _ = resource_usage()
+        renders_before = harness.render_count
+        started = time.monotonic()
+        measured = globals()["scenario_" + name](harness, quick)
+        wall = time.monotonic() - started
+        cpu_after, peak_rss = resource_usage()
+
+        traced = latency_tracer.summary().get(STAGE_TOTAL, {})
+        latencies = [latency for latency in measured["latencies"] if latency is not None]
+        result = {
+            "scenario": name,
+            "engine": engine,
+            "transport": transport,
+            "events": measured["events"],
+            "renders": harness.render_count - renders_before,
+            "missed": len(measured["latencies"]) - len(latencies),
+            "wall_s": wall,
+            "events_per_s": measured["events"] / wall,
+            "p50_ms": percentile(latencies, 0.5),
+            "p99_ms": percentile(latencies, 0.99),
+            "traced_p50_ms": traced.get("p50"),
+            "traced_p99_ms": traced.get("p99"),
+            "cpu_s": cpu_after - cpu_before,
+            "cpu_pct": 100 * (cpu_after - cpu_before) / wall,
+            "peak_rss_mb": peak_rss,
+            "server": fake.stats(),
+        }
+        result.update(measured.get("extra", {}))
+        harness.stop()
+        if record_trace:
+            from resources.lib.utils.trace_recorder import trace_recorder
+            result["trace"] = trace_recorder.path
+        return result
+    finally:
+        fake.stop()
+        for extra in extra_fakes:
+            extra.stop()
+
+# Driver
+
+def format_ms(value):
+    return "-" if value is None else f"{value:.1f}"
+
+def print_table(results):
+    print(f"\n{'scenario':<16} {'engine':<8} {'transport':<9} {'events':>6} {'renders':>7} {'ev/s':>7} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'tr p50':>7} {'tr p99':>7} {'cpu s':>6} {'cpu %':>6} {'rss MB':>7}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['scenario']:<16} {r['engine']:<8} {r['transport']:<9} failed: {r['error']}")
+            continue
+        print(f"{r['scenario']:<16} {r['engine']:<8} {r['transport']:<9} {r['events']:>6} {r['renders']:>7} "
+              f"{r['events_per_s']:>7.1f} {format_ms(r['p50_ms']):>7} {format_ms(r['p99_ms']):>7} "
+              f"{format_ms(r['traced_p50_ms']):>7} {format_ms(r['traced_p99_ms']):>7} "
+              f"{r['cpu_s']:>6.2f} {r['cpu_pct']:>6.1f} {format_ms(r['peak_rss_mb']):>7}")
+        if r["missed"]:
+            print(f"{'':<16} {r['missed']} change(s) never rendered")
+        for key in ("scroll_p50_ms", "scroll_p99_ms", "recovery_p50_ms", "recovery_max_ms",
+                    "status_queries", "http_requests", "query_batches", "players_per_batch",
+                    "slow_server_ms", "slow_server_busy_s", "healthy_server_busy_s",
+                    "connect_ms", "discovery_requests", "cache_hits", "first_paint_ms", "live_paint_ms"):
+            if key in r:
+                print(f"{'':<16} {key}: {format_ms(r[key])}")
+        if r.get("trace"):
+            print(f"{'':<16} trace: {r['trace']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--engine", nargs="+", choices=("threads", "asyncio"), default=["threads"])
+    parser.add_argument("--transport", nargs="+", choices=("cli", "http", "push"), default=["cli"])
+    parser.add_argument("--debounce-ms", type=int, default=300)
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for a smoke test")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--record", action="store_true", help="Record a CLI and JSON-RPC trace of each run, for replay_trace.py")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_scenario(args.scenario[0], args.engine[0], args.transport[0], args.debounce_ms, args.quick, args.record)
+        print(RESULT_MARKER + json.dumps(result), flush=True)
+        return
+
+    results = []
+    for name in args.scenario:
+        for engine in args.engine:
+            for transport in args.transport:
+                command = [sys.executable, os.path.abspath(__file__), "--child", "--scenario", name, "--engine", engine,
+                           "--transport", transport, "--debounce-ms", str(args.debounce_ms)]
+                command += [flag for flag, enabled in (("--quick", args.quick), ("--record", args.record)) if enabled]
+                print(f"Running {name} ({engine}, {transport})...", flush=True)
+                completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+                lines = [line for line in completed.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+                if lines:
+                    results.append(json.loads(lines[-1][len(RESULT_MARKER):]))
+                else:
+                    error = (completed.stderr.strip().splitlines() or [f"exit code {completed.returncode}"])[-1]
+                    results.append({"scenario": name, "engine": engine, "transport": transport, "error": error})
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any("error" in result for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
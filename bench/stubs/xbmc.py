@@ -0,0 +1,44 @@
+"""
+Minimal stand-in for Kodi's xbmc module, so benchmarks can import addon code outside Kodi.
+"""
+
+LOGDEBUG = 0
+LOGINFO = 1
+LOGWARNING = 2
+LOGERROR = 3
+LOGFATAL = 4
+
+# Log lines written, most recent last; benchmarks may clear it between runs
+written = []
+
+def log(msg, level=LOGDEBUG):
+    written.append((level, msg))
+
+def executebuiltin(function, wait=False):
+    pass
+
+def executeJSONRPC(jsonrpccommand):
+    # Debug logging off, as on a typical installation
+    return '{"id": 1, "jsonrpc": "2.0", "result": {"value": false}}'
+
+class Monitor:
+    """
+    Stand-in for xbmc.Monitor; abort is requested by calling request_abort().
+    """
+
+    def __init__(self):
+        import threading
+        self._abort = threading.Event()
+
+    def abortRequested(self):
+        return self._abort.is_set()
+
+    def waitForAbort(self, timeout=None):
+        return self._abort.wait(timeout)
+
+    def request_abort(self):
+        self._abort.set()
+        self.onAbortRequested()
+
+    def onAbortRequested(self):
+        pass
@@ -0,0 +1,28 @@
+"""
+Minimal stand-in for Kodi's xbmcaddon module.
+
+Settings are read from the module-level `settings` dict, and the profile directory
+is a temporary directory unless KLMS_BENCH_PROFILE is set.
+"""
+
+import os
+import tempfile
+
+# Addon settings returned by Addon.getSetting(); benchmarks fill this in
+settings = {}
+
+_profile = os.environ.get("KLMS_BENCH_PROFILE") or tempfile.mkdtemp(prefix="klms-bench-")
+_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "addon"))
+
+class Addon:
+    def __init__(self, id=None):
+        self.id = id
+
+    def getSetting(self, key):
+        return str(settings.get(key, ""))
+
+    def setSetting(self, key, value):
+        settings[key] = value
+
+    def getAddonInfo(self, key):
+        return {"profile": _profile, "path": _path, "id": "plugin.program.klmsaddon"}.get(key, "")
@@ -0,0 +1,174 @@
+"""
+Minimal stand-in for Kodi's xbmcgui module.
+
+Controls keep their state in plain attributes so benchmarks can inspect what was
+drawn. A window creates controls on first access; benchmarks may pre-populate
+Window.controls with their own (e.g. recording) controls.
+"""
+
+ACTION_MOVE_UP = 3
+ACTION_MOVE_DOWN = 4
+ACTION_PAGE_UP = 5
+ACTION_PAGE_DOWN = 6
+ACTION_PREVIOUS_MENU = 10
+ACTION_SHOW_INFO = 11
+ACTION_SHOW_CODEC = 27
+ACTION_NAV_BACK = 92
+
+class InfoTagMusic:
+    def __init__(self):
+        self.tags = {}
+
+    def setTitle(self, value):
+        self.tags["title"] = value
+
+    def setArtist(self, value):
+        self.tags["artist"] = value
+
+    def setAlbum(self, value):
+        self.tags["album"] = value
+
+    def setDuration(self, value):
+        self.tags["duration"] = value
+
+class ListItem:
+    def __init__(self, label="", label2="", path="", offscreen=False):
+        self.label = label
+        self.label2 = label2
+        self.properties = {}
+        self.info_tag = InfoTagMusic()
+
+    def setLabel(self, label):
+        self.label = label
+
+    def getLabel(self):
+        return self.label
+
+    def setLabel2(self, label):
+        self.label2 = label
+
+    def getLabel2(self):
+        return self.label2
+
+    def setProperty(self, key, value):
+        self.properties[key] = value
+
+    def getProperty(self, key):
+        return self.properties.get(key, "")
+
+    def getMusicInfoTag(self):
+        return self.info_tag
+
+class Control:
+    def __init__(self, control_id=0):
+        self.control_id = control_id
+        self.visible = True
+
+    def getId(self):
+        return self.control_id
+
+    def setVisible(self, visible):
+        self.visible = visible
+
+class ControlLabel(Control):
+    def __init__(self, control_id=0):
+        super().__init__(control_id)
+        self.label = ""
+
+    def setLabel(self, label):
+        self.label = label
+
+    def getLabel(self):
+        return self.label
+
+class ControlImage(Control):
+    def __init__(self, control_id=0):
+        super().__init__(control_id)
+        self.image = ""
+
+    def setImage(self, image, useCache=True):
+        self.image = image
+
+class ControlProgress(Control):
+    def __init__(self, control_id=0):
+        super().__init__(control_id)
+        self.percent = 0.0
+
+    def setPercent(self, percent):
+        self.percent = percent
+
+    def getPercent(self):
+        return self.percent
+
+class ControlTextBox(Control):
+    def __init__(self, control_id=0):
+        super().__init__(control_id)
+        self.text = ""
+
+    def setText(self, text):
+        self.text = text
+
+class ControlList(Control):
+    def __init__(self, control_id=0):
+        super().__init__(control_id)
+        self.items = []
+        self.selected = 0
+
+    def reset(self):
+        self.items = []
+        self.selected = 0
+
+    def addItem(self, item):
+        self.items.append(item)
+
+    def addItems(self, items):
+        self.items.extend(items)
+
+    def removeItem(self, index):
+        del self.items[index]
+
+    def size(self):
+        return len(self.items)
+
+    def getListItem(self, index):
+        return self.items[index]
+
+    def getSelectedPosition(self):
+        return self.selected if self.items else -1
+
+    def selectItem(self, index):
+        self.selected = index
+
+class Window:
+    # Control type created on first access, by control ID; anything else is a label
+    control_types = {}
+
+    def __init__(self, *args, **kwargs):
+        self.controls = {}
+        self.focus_id = 0
+
+    def getControl(self, control_id):
+        if control_id not in self.controls:
+            self.controls[control_id] = self.control_types.get(control_id, ControlLabel)(control_id)
+        return self.controls[control_id]
+
+    def getFocusId(self):
+        return self.focus_id
+
+    def setFocusId(self, control_id):
+        self.focus_id = control_id
+
+    def show(self):
+        self.onInit()
+
+    def doModal(self):
+        self.onInit()
+
+    def close(self):
+        pass
+
+    def onInit(self):
+        pass
+
+class WindowXML(Window):
+    pass